@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Agent Actions
+Custom browser-use controller actions the agent calls to report its result.
+
+The report actions take structured arguments and end the run immediately,
+so the agent spends no extra steps writing a formatted final answer and
+process_property reads typed values instead of searching the history text.
+request_screenshot lets a DOM-only agent ask for a look at the page
+(see vision_policy.py).
+"""
+
+from typing import Optional
+
+from browser_use import ActionResult, Controller
+from pydantic import BaseModel, Field
+
+
+class PdfUrlReport(BaseModel):
+    pdf_url: str = Field(description="Complete URL of the PDF shown in the address bar, starting with https://")
+
+
+class DownloadStartedReport(BaseModel):
+    link_text: str = Field("", description="Text of the link or button that started the download")
+
+
+class AgentReport:
+    def __init__(self):
+        """Typed results reported by one agent run"""
+        self.pdf_url: Optional[str] = None
+        self.download_started = False
+        self.link_text = ""
+
+
+class ReportingController(Controller):
+    def __init__(self, vision_policy=None):
+        """Controller with report_pdf_url / report_download_started actions that finish the run,
+        plus request_screenshot when the vision policy sends screenshots on demand"""
+        super().__init__()
+        self.report = AgentReport()
+        self.vision_policy = vision_policy
+
+        if vision_policy and vision_policy.mode == "dom":
+            @self.registry.action("Request a screenshot of the page in the next step - use this only when you "
+                                  "cannot find the element you need in the element list")
+            async def request_screenshot():
+                vision_policy.request_screenshot()
+                return ActionResult(extracted_content="A screenshot will be included in the next step",
+                                    include_in_memory=True)
+
+        @self.registry.action("Report the PDF URL once the PDF is open - this completes the task",
+                              param_model=PdfUrlReport)
+        async def report_pdf_url(params: PdfUrlReport):
+            self.report.pdf_url = params.pdf_url.strip()
+            return ActionResult(is_done=True, extracted_content=f"PDF URL reported: {self.report.pdf_url}",
+                                include_in_memory=True)
+
+        @self.registry.action("Report that the marketing package download was started - this completes the task",
+                              param_model=DownloadStartedReport)
+        async def report_download_started(params: DownloadStartedReport):
+            self.report.download_started = True
+            self.report.link_text = params.link_text
+            return ActionResult(is_done=True, extracted_content="Download started", include_in_memory=True)
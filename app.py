@@ -4,7 +4,7 @@ Marketing Package Agent Web Interface
 Beautiful frontend for managing marketing package downloads with real-time database integration
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, url_for
+from flask import Flask, render_template, request, jsonify, send_file, url_for, Response
 from flask_socketio import SocketIO, emit
 import psycopg2
 import os
@@ -17,12 +17,17 @@ from pathlib import Path
 from dotenv import load_dotenv
 import glob
 
+import metrics
+from create_supabase_table import COMMAND_CHANNEL
+from tracing import Tracer
+
 # Load environment variables
 load_dotenv("marketing_agent.env")
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'marketing_agent_secret_key'
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+tracer = Tracer("marketing-dashboard")
 
 # Global variables for tracking
 active_processes = {}
@@ -120,6 +125,35 @@ class DatabaseManager:
             print(f"Database error: {e}")
             return {}
 
+    def get_queue_depth(self):
+        """Get property counts by download status and website group"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT download_status, website_group, COUNT(*)
+                FROM marketing_checklist 
+                GROUP BY download_status, website_group;
+            """)
+            
+            results = cursor.fetchall()
+            cursor.close()
+            conn.close()
+            return results
+        except Exception as e:
+            print(f"Database error: {e}")
+            return []
+    
+    def send_daemon_command(self, command):
+        """Hand a command to running daemon-mode agents via NOTIFY"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_notify(%s, %s);", (COMMAND_CHANNEL, json.dumps(command)))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
 db_manager = DatabaseManager()
 
 def get_local_pdfs():
@@ -181,9 +215,20 @@ def api_pdfs():
     """API endpoint for local PDFs"""
     return jsonify(get_local_pdfs())
 
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus metrics for the app and all agent subprocesses"""
+    body, content_type = metrics.render_metrics(db_manager, active_processes)
+    return Response(body, content_type=content_type)
+
 @app.route('/api/submit_job', methods=['POST'])
 def submit_job():
     """Submit marketing package job"""
+    with tracer.span("submit_job") as span:
+        return _submit_job(span)
+
+def _submit_job(span):
+    """Build the agent command and start it in a background thread"""
     data = request.json
     
     website_group = data.get('website_group')
@@ -211,25 +256,50 @@ def submit_job():
     
     # Generate job ID
     job_id = f"job_{int(time.time())}"
+    span.set_attribute("job_id", job_id)
+    span.set_attribute("command", ' '.join(cmd))
     
-    # Start the process in a thread
+    # A warm daemon-mode agent picks the job up without a process start
+    if os.getenv('AGENT_DAEMON', 'false').lower() == 'true':
+        db_manager.send_daemon_command({
+            'command': 'run',
+            'group': website_group if website_group and website_group != 'ALL' else None,
+            'max_properties': max_properties if max_properties and max_properties > 0 else None,
+            'job_id': job_id,
+            # The daemon opens its run span under this one, so trace_id below covers the job
+            'traceparent': span.traceparent
+        })
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'command': 'daemon run',
+            'trace_id': span.trace_id
+        })
+    
+    # Start the process in a thread (the thread continues this span's trace)
     thread = threading.Thread(
         target=run_marketing_agent,
-        args=(cmd, job_id, headless)
+        args=(cmd, job_id, headless, span.traceparent)
     )
     thread.start()
     
     return jsonify({
         'success': True,
         'job_id': job_id,
-        'command': ' '.join(cmd)
+        'command': ' '.join(cmd),
+        'trace_id': span.trace_id
     })
 
-def run_marketing_agent(cmd, job_id, headless):
+def run_marketing_agent(cmd, job_id, headless, traceparent=None):
     """Run marketing agent in separate thread"""
+    with tracer.span("run_marketing_agent", traceparent=traceparent, job_id=job_id):
+        _run_marketing_agent(cmd, job_id, headless)
+
+def _run_marketing_agent(cmd, job_id, headless):
+    """Spawn the agent subprocess and stream its output to the dashboard"""
     try:
-        # Set environment for headless mode
-        env = os.environ.copy()
+        # Set environment for headless mode; TRACEPARENT links the agent's spans to this job
+        env = tracer.child_env()
         if headless:
             env['BROWSER_HEADLESS'] = 'true'
         
@@ -241,15 +311,16 @@ def run_marketing_agent(cmd, job_id, headless):
         })
         
         # Run the process with combined stdout and stderr
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,  # Redirect stderr to stdout to avoid duplication
-            text=True,
-            env=env,
-            bufsize=1,  # Line buffered
-            universal_newlines=True
-        )
+        with tracer.span("agent_subprocess_start"):
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,  # Redirect stderr to stdout to avoid duplication
+                text=True,
+                env=env,
+                bufsize=1,  # Line buffered
+                universal_newlines=True
+            )
         
         active_processes[job_id] = process
         
@@ -264,6 +335,7 @@ def run_marketing_agent(cmd, job_id, headless):
         
         # Wait for completion
         process.wait()
+        tracer.current_span().set_attribute("return_code", process.returncode)
         
         # Emit completion
         socketio.emit('job_completed', {
@@ -320,6 +392,9 @@ if __name__ == '__main__':
     os.makedirs('static/css', exist_ok=True)
     os.makedirs('static/js', exist_ok=True)
     
+    # Shared directory where agent subprocesses write their Prometheus samples
+    metrics.setup_multiprocess_dir(os.path.abspath(os.getenv('PROMETHEUS_MULTIPROC_DIR', 'metrics_data')))
+    
     print("🚀 Starting Marketing Package Agent Web Interface")
     print("📱 Open your browser to: http://localhost:5001")
     print("🎨 Theme: Neon Purple & White")
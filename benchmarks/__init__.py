@@ -0,0 +1 @@
+"""Offline benchmark harness: mock property sites and throughput reports"""
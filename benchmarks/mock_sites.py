@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Mock Property Sites
+Local HTTP fixtures that mimic the download flow of each website group.
+
+- Levy Retail: red VIEW PACKAGE button -> modal with Your Name / Your Email /
+  Your Phone -> "Thank you!" page with "TO DOWNLOAD THE PACKAGE DIRECTLY,
+  CLICK HERE." -> PDF attachment
+- Tag Industrial: Marketing Package button -> six-field form with the
+  Principal contact type dropdown and terms checkbox -> Download Marketing
+  Package button -> PDF attachment
+- Net Lease Advisory Group: DOWNLOAD BROCHURE button -> popup with DOWNLOAD
+  NOW -> redirect to a wp-content/uploads PDF opened in the browser
+
+Usage:
+    python3 -m benchmarks.mock_sites --port 8765
+"""
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# URL prefix per website group on the mock server
+SITE_PREFIXES = {
+    "www.levyretail.com": "levyretail",
+    "tag-industrial.com": "tag-industrial",
+    "netleaseadvisorygroup.com": "netlease"
+}
+
+
+def build_pdf(title: str, min_size: int = 4096) -> bytes:
+    """Minimal valid single-page PDF, padded so it passes the agent's size check"""
+    stream = f"BT /F1 18 Tf 72 720 Td ({title}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    body = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(body))
+        body += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    # Comment padding keeps the file valid while reaching the minimum size
+    if len(body) < min_size:
+        body += b"%" + b"0" * (min_size - len(body)) + b"\n"
+    xref_offset = len(body)
+    body += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        body += b"%010d 00000 n \n" % offset
+    body += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return body
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>{title}</title>
+<style>
+  body {{ font-family: sans-serif; margin: 0; }}
+  .hero {{ height: 500px; background: #ddd; }}
+  .btn {{ background: #c00; color: #fff; padding: 12px 24px; border: 0; cursor: pointer; }}
+  .modal {{ display: none; position: fixed; top: 10%; left: 25%; width: 50%; background: #fff;
+           border: 1px solid #333; padding: 24px; }}
+  .filler {{ height: 1500px; }}
+</style></head>
+<body>
+<h1>{title}</h1>
+<div class="hero">Property photos</div>
+{body}
+<div class="filler">Property description, demographics, maps</div>
+<script>
+function openModal() {{ document.getElementById('modal').style.display = 'block'; }}
+</script>
+</body></html>"""
+
+
+def levy_property_page(slug: str) -> str:
+    body = f"""
+<button class="btn" onclick="openModal()">VIEW PACKAGE</button>
+<div class="modal" id="modal">
+  <form method="post" action="/levyretail/lead/{slug}">
+    <label>Your Name <input name="your-name" required></label><br>
+    <label>Your Email <input name="your-email" type="email" required></label><br>
+    <label>Your Phone <input name="your-phone" required></label><br>
+    <button type="submit">Submit</button>
+  </form>
+</div>"""
+    return PAGE_TEMPLATE.format(title=f"Levy Retail - {slug}", body=body)
+
+
+def tag_property_page(slug: str) -> str:
+    body = f"""
+<p>Available: industrial warehouse</p>
+<button class="btn" onclick="openModal()">Marketing Package</button>
+<div class="modal" id="modal">
+  <form method="post" action="/tag-industrial/lead/{slug}">
+    <label>First Name <input name="first_name" required></label><br>
+    <label>Last Name <input name="last_name" required></label><br>
+    <label>Company Name <input name="company" required></label><br>
+    <label>Phone Number <input name="phone" required></label><br>
+    <label>Email Address <input name="email" type="email" required></label><br>
+    <label>Contact Type
+      <select name="contact_type" required>
+        <option value="">Select...</option>
+        <option>Broker</option>
+        <option>Principal</option>
+        <option>Investor</option>
+      </select>
+    </label><br>
+    <label><input type="checkbox" name="terms" required> I accept the Terms and Conditions</label><br>
+    <button type="submit">Submit</button>
+  </form>
+</div>"""
+    return PAGE_TEMPLATE.format(title=f"Tag Industrial - {slug}", body=body)
+
+
+def netlease_property_page(slug: str) -> str:
+    body = f"""
+<button class="btn" onclick="openModal()">DOWNLOAD BROCHURE</button>
+<div class="modal" id="modal">
+  <form method="get" action="/netlease/brochure/{slug}">
+    <label>First Name <input name="first_name"></label><br>
+    <label>Last Name <input name="last_name"></label><br>
+    <label>Email <input name="email"></label><br>
+    <button type="submit">DOWNLOAD NOW</button>
+  </form>
+</div>"""
+    return PAGE_TEMPLATE.format(title=f"Net Lease Advisory Group - {slug}", body=body)
+
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    """Routes for all three mock sites; `server.latency` adds a per-request delay"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "text/html", headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _html(self, html: str):
+        self._send(200, html.encode())
+
+    def _pdf(self, slug: str, attachment: bool):
+        disposition = "attachment" if attachment else "inline"
+        self._send(200, build_pdf(slug), "application/pdf",
+                   {"Content-Disposition": f'{disposition}; filename="{slug}.pdf"'})
+
+    def _route(self):
+        time.sleep(self.server.latency)
+        parts = [part for part in urlparse(self.path).path.split("/") if part]
+        self.server.request_count += 1
+
+        if len(parts) >= 3 and parts[1] == "property":
+            site, slug = parts[0], parts[2]
+            pages = {"levyretail": levy_property_page, "tag-industrial": tag_property_page,
+                     "netlease": netlease_property_page}
+            if site in pages:
+                return self._html(pages[site](slug))
+
+        if parts[:2] == ["levyretail", "lead"] and self.command == "POST":
+            slug = parts[2]
+            return self._html(f"""<html><body><h2>Thank you!</h2>
+<p><a href="/levyretail/files/{slug}.pdf">TO DOWNLOAD THE PACKAGE DIRECTLY, CLICK HERE.</a></p>
+</body></html>""")
+
+        if parts[:2] == ["tag-industrial", "lead"] and self.command == "POST":
+            slug = parts[2]
+            fields = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+            if fields.get("contact_type") != ["Principal"] or "terms" not in fields:
+                return self._send(400, b"Please complete all required fields")
+            return self._html(f"""<html><body><h2>Thank you for your interest</h2>
+<a class="btn" href="/tag-industrial/files/{slug}.pdf">Download Marketing Package</a>
+</body></html>""")
+
+        if parts[:2] == ["netlease", "brochure"]:
+            slug = parts[2]
+            return self._send(302, headers={"Location": f"/wp-content/uploads/2024/01/{slug}.pdf"})
+
+        if parts[:1] == ["wp-content"] and parts[-1].endswith(".pdf"):
+            return self._pdf(parts[-1][:-4], attachment=False)
+
+        if len(parts) == 3 and parts[1] == "files" and parts[2].endswith(".pdf"):
+            return self._pdf(parts[2][:-4], attachment=True)
+
+        self._send(404, b"Not found")
+
+    def do_GET(self):
+        self._route()
+
+    def do_HEAD(self):
+        self._route()
+
+    def do_POST(self):
+        self._route()
+
+
+class MockSiteServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        """Threaded fixture server; port 0 picks a free port"""
+        self.httpd = ThreadingHTTPServer((host, port), MockSiteHandler)
+        self.httpd.latency = latency
+        self.httpd.request_count = 0
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def property_url(self, website_group: str, slug: str) -> str:
+        """Listing URL on the mock server for a website group"""
+        return f"{self.base_url}/{SITE_PREFIXES[website_group]}/property/{slug}/"
+
+    def start(self) -> "MockSiteServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve mock property sites for benchmarking")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of delay added to every response")
+    args = parser.parse_args()
+
+    server = MockSiteServer(port=args.port, latency=args.latency)
+    print(f"🏠 Mock sites running at {server.base_url}")
+    for group in SITE_PREFIXES:
+        print(f"   {group}: {server.property_url(group, 'example-property')}")
+    server.httpd.serve_forever()
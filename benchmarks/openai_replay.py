@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+OpenAI Record/Replay Server
+Local OpenAI-compatible /v1/chat/completions endpoint for deterministic benchmarks.
+
+- record: forwards each request to the real API, returns the response and
+  stores it in the cassette directory
+- replay: answers from the cassette with simulated latency, never touching the
+  network (misses return 404 so they show up clearly in the run)
+- auto:   replays when a recording exists, records otherwise
+
+Requests are keyed on a normalized prompt (whitespace collapsed, timestamps,
+local ports and temp paths masked) plus a SHA-256 hash of every screenshot.
+
+Usage:
+    python3 -m benchmarks.openai_replay --mode record --cassette benchmarks/cassettes/default
+    python3 -m benchmarks.openai_replay --mode replay --latency 1.5
+    OPENAI_BASE_URL=http://127.0.0.1:8766/v1 python3 -m benchmarks.run_benchmark ...
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from dotenv import load_dotenv
+
+UPSTREAM_URL = "https://api.openai.com/v1"
+
+# Values that change between otherwise identical runs
+VOLATILE_PATTERNS = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?"), "<TIMESTAMP>"),
+    (re.compile(r"(127\.0\.0\.1|localhost):\d+"), r"\1:<PORT>"),
+    (re.compile(r"/[\w/.-]*marketing_benchmark_\w+"), "<BENCH_DIR>"),
+    (re.compile(r"\b[0-9a-f]{16,}\b"), "<HEX>"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_text(text: str) -> str:
+    for pattern, replacement in VOLATILE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def normalize_content(content, ignore_images: bool):
+    """Normalize message content; screenshots are replaced by their hash"""
+    if isinstance(content, str):
+        return normalize_text(content)
+    parts = []
+    for part in content or []:
+        if part.get("type") == "image_url":
+            if not ignore_images:
+                url = part.get("image_url", {}).get("url", "")
+                parts.append({"image_sha256": hashlib.sha256(url.encode()).hexdigest()})
+        elif part.get("type") == "text":
+            parts.append(normalize_text(part.get("text", "")))
+        else:
+            parts.append(part)
+    return parts
+
+
+def request_key(body: dict, ignore_images: bool = False) -> str:
+    """Stable cassette key for a chat completion request"""
+    canonical = {
+        "model": body.get("model"),
+        "messages": [
+            {"role": message.get("role"), "content": normalize_content(message.get("content"), ignore_images),
+             "tool_calls": message.get("tool_calls")}
+            for message in body.get("messages", [])
+        ],
+        "tools": body.get("tools"),
+        "functions": body.get("functions"),
+        "response_format": body.get("response_format"),
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+
+class Cassette:
+    def __init__(self, directory: str):
+        """One JSON file per recorded request"""
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key: str):
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, key: str, request_body: dict, response_body: dict, status: int, elapsed: float):
+        entry = {"status": status, "elapsed": elapsed, "response": response_body,
+                 "request_preview": normalize_text(json.dumps(request_body.get("messages", [])[-1:]))[:500]}
+        tmp_path = self._path(key) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(key))
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _forward(self, key: str, body: dict):
+        config = self.server.config
+        headers = {"Content-Type": "application/json",
+                   "Authorization": self.headers.get("Authorization") or f"Bearer {config['api_key']}"}
+        started = time.perf_counter()
+        response = requests.post(f"{config['upstream']}/chat/completions", json=body, headers=headers, timeout=300)
+        elapsed = time.perf_counter() - started
+        response_body = response.json()
+        if response.status_code == 200:
+            self.server.cassette.save(key, body, response_body, response.status_code, elapsed)
+            with self.server.cassette.lock:
+                self.server.cassette.recorded += 1
+        return self._send_json(response.status_code, response_body)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": f"Unsupported path {self.path}", "type": "not_found"}})
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if body.get("stream"):
+            return self._send_json(400, {"error": {"message": "Streaming is not supported by the replay server",
+                                                   "type": "invalid_request_error"}})
+
+        config = self.server.config
+        cassette = self.server.cassette
+        key = request_key(body, config["ignore_images"])
+
+        if config["mode"] == "record":
+            return self._forward(key, body)
+
+        entry = cassette.load(key)
+        if entry is None:
+            if config["mode"] == "auto":
+                return self._forward(key, body)
+            with cassette.lock:
+                cassette.misses += 1
+            print(f"❓ Replay miss {key[:12]}")
+            return self._send_json(404, {"error": {"message": f"No recording for request {key}",
+                                                   "type": "replay_miss"}})
+
+        with cassette.lock:
+            cassette.hits += 1
+        latency = config["latency"] if config["latency"] is not None else entry["elapsed"] * config["latency_scale"]
+        time.sleep(latency)
+        return self._send_json(entry["status"], entry["response"])
+
+
+class ReplayServer:
+    def __init__(self, cassette_dir: str, mode: str = "replay", host: str = "127.0.0.1", port: int = 8766,
+                 latency: float = None, latency_scale: float = 1.0, ignore_images: bool = False,
+                 upstream: str = UPSTREAM_URL, api_key: str = None):
+        """latency=None replays each response after its recorded upstream time (times latency_scale)"""
+        self.httpd = ThreadingHTTPServer((host, port), ReplayHandler)
+        self.httpd.cassette = Cassette(cassette_dir)
+        self.httpd.config = {"mode": mode, "latency": latency, "latency_scale": latency_scale,
+                             "ignore_images": ignore_images, "upstream": upstream.rstrip("/"),
+                             "api_key": api_key or os.getenv("OPENAI_API_KEY")}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "ReplayServer":
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def get_summary(self) -> str:
+        cassette = self.httpd.cassette
+        return f"{cassette.hits} replayed, {cassette.misses} missed, {cassette.recorded} recorded"
+
+
+if __name__ == "__main__":
+    load_dotenv("marketing_agent.env")
+    parser = argparse.ArgumentParser(description="OpenAI-compatible record/replay server")
+    parser.add_argument("--mode", choices=["record", "replay", "auto"], default="replay")
+    parser.add_argument("--cassette", default=os.path.join("benchmarks", "cassettes", "default"),
+                        help="Directory holding recorded request/response pairs")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=None,
+                        help="Fixed seconds per replayed response (default: recorded latency)")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Multiplier applied to recorded latency when --latency is not set")
+    parser.add_argument("--ignore-images", action="store_true",
+                        help="Key requests on text only (tolerates screenshot rendering noise)")
+    parser.add_argument("--upstream", default=os.getenv("OPENAI_UPSTREAM_URL", UPSTREAM_URL))
+    args = parser.parse_args()
+
+    server = ReplayServer(args.cassette, mode=args.mode, port=args.port, latency=args.latency,
+                          latency_scale=args.latency_scale, ignore_images=args.ignore_images,
+                          upstream=args.upstream)
+    print(f"📼 OpenAI {args.mode} server at {server.base_url} (cassette: {args.cassette})")
+    print(f"💡 Point the agent at it with OPENAI_BASE_URL={server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📼 {server.get_summary()}")
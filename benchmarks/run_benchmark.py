@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Offline Benchmark Harness
+Runs MarketingPackageAgent against local mock sites and a local PostgreSQL
+database, then reports throughput, per-phase latency and resource usage.
+
+Every performance change can be compared run to run:
+    python3 -m benchmarks.run_benchmark --label baseline
+    python3 -m benchmarks.run_benchmark --label my-change --compare benchmarks/results/<baseline>.json
+
+Add --openai-replay record once, then --openai-replay replay for deterministic
+runs that never call the live API (see benchmarks/openai_replay.py).
+
+--engines chromium webkit firefox runs every website group's flow on each
+engine and reports success rate and latency per (group, engine) pair, to pick
+BROWSER_ENGINE_<CODE> per group.
+
+--prompt-variant compact runs the shorter task prompts; compare its report
+against a full-variant run with --compare (prompt tokens, success rate).
+
+The HTTP fast path is off unless --fast-path is given (and always off in
+--engines runs), so a recipe learned from the first Levy Retail property
+doesn't turn the rest of the run into browser-free downloads. When it is on,
+fast-path properties are timed as fast_path_total, not property_total.
+
+Requires BENCHMARK_DATABASE_URL pointing at a disposable local database
+(the marketing_checklist table in it is truncated on every run).
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+import psycopg2
+from dotenv import load_dotenv
+
+from benchmarks.mock_sites import SITE_PREFIXES, MockSiteServer
+from benchmarks.openai_replay import ReplayServer
+from browser_engines import BROWSER_ENGINES
+from create_supabase_table import CREATE_FILES_TABLE_SQL, CREATE_INDEXES_SQL, CREATE_TABLE_SQL
+from prompt_templates import PROMPT_VARIANTS
+
+RESULTS_FOLDER = os.path.join("benchmarks", "results")
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1", "")
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def seed_database(database_url: str, server: MockSiteServer, groups, per_group: int) -> int:
+    """Recreate marketing_checklist with mock-site listings for each website group"""
+    conn = psycopg2.connect(database_url)
+    cursor = conn.cursor()
+    cursor.execute(CREATE_TABLE_SQL)
+    for index_sql in CREATE_INDEXES_SQL:
+        cursor.execute(index_sql)
+    cursor.execute(CREATE_FILES_TABLE_SQL)
+    cursor.execute("TRUNCATE marketing_checklist, marketing_files RESTART IDENTITY;")
+
+    property_number = 0
+    for i in range(per_group):
+        for group in groups:
+            property_number += 1
+            slug = f"bench-{SITE_PREFIXES[group]}-{i + 1}"
+            cursor.execute("""
+                INSERT INTO marketing_checklist (website_group, property_number, property_name, property_url)
+                VALUES (%s, %s, %s, %s)
+            """, (group, property_number, f"Bench {SITE_PREFIXES[group]} {i + 1}", server.property_url(group, slug)))
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return property_number
+
+
+def get_status_counts(database_url: str) -> dict:
+    conn = psycopg2.connect(database_url)
+    cursor = conn.cursor()
+    cursor.execute("SELECT download_status, COUNT(*) FROM marketing_checklist GROUP BY download_status;")
+    counts = dict(cursor.fetchall())
+    cursor.close()
+    conn.close()
+    return counts
+
+
+def get_resource_usage() -> dict:
+    """CPU time and peak RSS for this process and its finished children (browsers, subprocesses)"""
+    rss_divisor = 1024 * 1024 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KB on Linux
+    usage = {}
+    for name, who in (("self", resource.RUSAGE_SELF), ("children", resource.RUSAGE_CHILDREN)):
+        ru = resource.getrusage(who)
+        usage[name] = {
+            "cpu_user_seconds": round(ru.ru_utime, 2),
+            "cpu_system_seconds": round(ru.ru_stime, 2),
+            "max_rss_mb": round(ru.ru_maxrss / rss_divisor, 1)
+        }
+    return usage
+
+
+def summarize_phases(phase_timings: dict) -> dict:
+    return {
+        phase: {
+            "count": len(durations),
+            "p50": round(percentile(durations, 50), 3),
+            "p95": round(percentile(durations, 95), 3),
+            "mean": round(statistics.mean(durations), 3)
+        }
+        for phase, durations in sorted(phase_timings.items()) if durations
+    }
+
+
+GROUP_CODES = {"LR": "www.levyretail.com", "TI": "tag-industrial.com", "NLAG": "netleaseadvisorygroup.com"}
+
+
+async def run_benchmark(args, groups=None, engine: str = None) -> dict:
+    """One benchmark session; `engine` overrides the browser engine for every group"""
+    from marketing_package_agent import MarketingPackageAgent
+
+    groups = groups or [group for code, group in GROUP_CODES.items() if code in args.groups]
+
+    # Mock sites use fixed ports so recorded prompts stay identical between runs
+    server = MockSiteServer(port=args.mock_port, latency=args.latency).start()
+    print(f"🏠 Mock sites running at {server.base_url}")
+
+    replay_server = None
+    if args.openai_replay:
+        replay_server = ReplayServer(args.cassette, mode=args.openai_replay, port=0,
+                                     latency=args.llm_latency, ignore_images=args.ignore_images).start()
+        os.environ["OPENAI_BASE_URL"] = replay_server.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "replay-only")
+        print(f"📼 OpenAI {args.openai_replay} server at {replay_server.base_url}")
+    try:
+        total = seed_database(args.database_url, server, groups, args.properties_per_group)
+        print(f"🌱 Seeded {total} properties across {len(groups)} website groups")
+
+        # The agent reads DATABASE_URL at startup; point it at the benchmark database
+        os.environ["DATABASE_URL"] = args.database_url
+        agent = MarketingPackageAgent(headless=args.headless, pipeline=args.pipeline)
+        if args.prompt_variant:
+            agent.prompt_variant = args.prompt_variant
+        if engine:
+            agent.browser_engines = dict.fromkeys(agent.browser_engines, engine)
+        # Engine and prompt comparisons must measure the browser agent on every property
+        agent.http_fast_path = args.fast_path and not engine
+        agent.download_folder = tempfile.mkdtemp(prefix="marketing_benchmark_")
+        # Mock-site cookies must never replace the saved state of the real sites
+        agent.browser_state_folder = os.path.join(agent.download_folder, "browser_state")
+        agent._setup_directories()
+
+        started = time.perf_counter()
+        await agent.run_download_session(max_properties=total)
+        wall_seconds = time.perf_counter() - started
+        await agent.async_db.close()
+    finally:
+        server.stop()
+        if replay_server:
+            print(f"📼 {replay_server.get_summary()}")
+            replay_server.stop()
+
+    status_counts = get_status_counts(args.database_url)
+    successful = status_counts.get("SUCCESS", 0)
+    return {
+        "label": args.label,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "groups": groups,
+        "properties": total,
+        "successful": successful,
+        "success_rate": round(successful / total, 3) if total else 0.0,
+        "wall_seconds": round(wall_seconds, 1),
+        "properties_per_hour": round(total / wall_seconds * 3600, 1) if wall_seconds else 0.0,
+        "status_counts": status_counts,
+        "phases": summarize_phases(agent.phase_timings),
+        "llm": {"calls": agent.llm_governor.total_calls,
+                "budget_wait_seconds": round(agent.llm_governor.total_wait_seconds, 1),
+                "prompt_tokens": agent.llm_governor.total_prompt_tokens,
+                "cached_prompt_tokens": agent.llm_governor.total_cached_tokens},
+        "prompt_variant": agent.prompt_variant,
+        "vision": dict(agent.vision_stats),
+        "fast_path": dict(agent.fast_path_stats),
+        "resources": get_resource_usage(),
+        "mock_requests": server.httpd.request_count,
+        "openai_replay": args.openai_replay,
+        "pipeline": args.pipeline,
+        "http_fast_path": agent.http_fast_path,
+        "engines": agent.browser_engines
+    }
+
+
+async def run_engine_matrix(args) -> dict:
+    """Run each website group's flow on each engine as separate sessions"""
+    runs = []
+    for code in args.groups:
+        for engine in args.engines:
+            print(f"\n🧭 {code} on {engine}")
+            report = await run_benchmark(args, groups=[GROUP_CODES[code]], engine=engine)
+            property_total = report["phases"].get("property_total", {})
+            runs.append({
+                "group": code,
+                "engine": engine,
+                "success_rate": report["success_rate"],
+                "p50": property_total.get("p50", 0.0),
+                "p95": property_total.get("p95", 0.0),
+                "properties_per_hour": report["properties_per_hour"],
+                "status_counts": report["status_counts"]
+            })
+
+    # Fastest engine among those with the best success rate
+    recommended = {}
+    for code in args.groups:
+        candidates = [run for run in runs if run["group"] == code]
+        best_rate = max(run["success_rate"] for run in candidates)
+        recommended[code] = min((run for run in candidates if run["success_rate"] == best_rate),
+                                key=lambda run: run["p50"])["engine"]
+
+    return {
+        "label": args.label,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "engine_matrix": runs,
+        "recommended_engines": recommended
+    }
+
+
+def print_engine_report(report: dict):
+    print("\n" + "=" * 70)
+    print(f"🧭 ENGINE BENCHMARK: {report['label']}")
+    print("=" * 70)
+    print(f"{'Group':<6} {'Engine':<10} {'Success':>8} {'p50 (s)':>10} {'p95 (s)':>10} {'Props/h':>9}")
+    print("-" * 58)
+    for run in report["engine_matrix"]:
+        print(f"{run['group']:<6} {run['engine']:<10} {run['success_rate'] * 100:>7.0f}% {run['p50']:>10.1f} "
+              f"{run['p95']:>10.1f} {run['properties_per_hour']:>9.1f}")
+    print("\n✅ Recommended: " + ", ".join(f"BROWSER_ENGINE_{code}={engine}"
+                                         for code, engine in report["recommended_engines"].items()))
+
+
+def print_report(report: dict, baseline: dict = None):
+    def delta(value, key_path):
+        if not baseline:
+            return ""
+        base = baseline
+        for key in key_path:
+            base = base.get(key, {}) if isinstance(base, dict) else {}
+        if not isinstance(base, (int, float)) or not base:
+            return ""
+        return f"  ({(value - base) / base * 100:+.1f}% vs {baseline['label']})"
+
+    print("\n" + "=" * 70)
+    print(f"📊 BENCHMARK REPORT: {report['label']}")
+    print("=" * 70)
+    print(f"🏠 Properties: {report['properties']} ({report['successful']} successful, "
+          f"{report['success_rate'] * 100:.0f}%)")
+    print(f"⏱️  Wall time: {report['wall_seconds']}s{delta(report['wall_seconds'], ['wall_seconds'])}")
+    print(f"🚀 Throughput: {report['properties_per_hour']} properties/hour"
+          f"{delta(report['properties_per_hour'], ['properties_per_hour'])}")
+    print(f"🚦 LLM: {report['llm']['calls']} calls, {report['llm']['budget_wait_seconds']}s waiting on budget")
+    prompt_tokens = report["llm"].get("prompt_tokens", 0)
+    print(f"📝 Prompt ({report.get('prompt_variant', 'full')}): {prompt_tokens:,} tokens"
+          f"{delta(prompt_tokens, ['llm', 'prompt_tokens'])}, "
+          f"{report['llm'].get('cached_prompt_tokens', 0):,} served from the prompt cache")
+    vision = report.get("vision", {})
+    print(f"🖼️  Vision: {vision.get('images_dropped', 0)} screenshots dropped, "
+          f"{vision.get('images_low_detail', 0)} low-detail, {vision.get('images_full', 0)} full, "
+          f"~{vision.get('image_tokens_saved', 0):,} image tokens saved")
+    fast_path = report.get("fast_path", {})
+    print(f"⚡ HTTP fast path: {fast_path.get('hits', 0)} downloads without a browser, "
+          f"{fast_path.get('fallbacks', 0)} fallbacks")
+    print(f"\n{'Phase':<18} {'Count':>6} {'p50 (s)':>10} {'p95 (s)':>10}")
+    print("-" * 48)
+    for phase, stats in report["phases"].items():
+        print(f"{phase:<18} {stats['count']:>6} {stats['p50']:>10.3f} {stats['p95']:>10.3f}"
+              f"{delta(stats['p95'], ['phases', phase, 'p95'])}")
+    print("\n💻 Resources:")
+    for name, usage in report["resources"].items():
+        print(f"   {name:<9} user {usage['cpu_user_seconds']}s, system {usage['cpu_system_seconds']}s, "
+              f"peak RSS {usage['max_rss_mb']} MB")
+
+
+def parse_arguments():
+    load_dotenv("marketing_agent.env")
+    parser = argparse.ArgumentParser(description="Offline benchmark for the marketing package agent")
+    parser.add_argument("--database-url", default=os.getenv("BENCHMARK_DATABASE_URL"),
+                        help="Disposable local PostgreSQL database (default: BENCHMARK_DATABASE_URL)")
+    parser.add_argument("--groups", nargs="+", default=["LR", "TI", "NLAG"], choices=["LR", "TI", "NLAG"])
+    parser.add_argument("--properties-per-group", "-n", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock site response delay in seconds")
+    parser.add_argument("--mock-port", type=int, default=8765, help="Port for the mock sites")
+    parser.add_argument("--openai-replay", choices=["record", "replay", "auto"],
+                        help="Route LLM calls through the local record/replay server")
+    parser.add_argument("--cassette", default=os.path.join("benchmarks", "cassettes", "default"),
+                        help="Recorded OpenAI responses for --openai-replay")
+    parser.add_argument("--llm-latency", type=float, default=None,
+                        help="Fixed simulated LLM latency in seconds (default: recorded latency)")
+    parser.add_argument("--ignore-images", action="store_true",
+                        help="Match recordings on prompt text only")
+    parser.add_argument("--headless", action="store_true", help="Run browsers in headless mode")
+    parser.add_argument("--pipeline", action="store_true", help="Prefetch the next property while one runs")
+    parser.add_argument("--prompt-variant", choices=list(PROMPT_VARIANTS),
+                        help="Task prompt variant to benchmark (default: PROMPT_VARIANT or full)")
+    parser.add_argument("--fast-path", action="store_true",
+                        help="Let learned HTTP recipes replace the browser agent (never in --engines runs)")
+    parser.add_argument("--engines", nargs="+", choices=list(BROWSER_ENGINES),
+                        help="Compare browser engines per website group instead of a single run")
+    parser.add_argument("--label", default="run", help="Name for this run in the report")
+    parser.add_argument("--compare", help="Previous report JSON to compare against")
+    parser.add_argument("--allow-remote-database", action="store_true",
+                        help="Allow a non-local database (its marketing_checklist table is truncated!)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    if not args.database_url:
+        print("❌ Set BENCHMARK_DATABASE_URL (or pass --database-url) to a disposable local database")
+        sys.exit(1)
+    if urlparse(args.database_url).hostname not in LOCAL_HOSTS and not args.allow_remote_database:
+        print("❌ Refusing to truncate marketing_checklist on a non-local database "
+              "(pass --allow-remote-database to override)")
+        sys.exit(1)
+
+    if args.engines:
+        report = asyncio.run(run_engine_matrix(args))
+        print_engine_report(report)
+    else:
+        report = asyncio.run(run_benchmark(args))
+
+        baseline = None
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+        print_report(report, baseline)
+
+    os.makedirs(RESULTS_FOLDER, exist_ok=True)
+    output_file = os.path.join(RESULTS_FOLDER, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{args.label}.json")
+    with open(output_file, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Report saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
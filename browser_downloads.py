@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Browser Downloads
+Per-attempt download staging for browser agents.
+
+Each attempt gets its own browser context whose downloads - and PDFs the
+browser merely displays, captured from its network responses - are saved into
+a private staging directory (under the download folder, next to the website
+group subfolders). After the run the PDF is verified and atomically renamed to
+its final name, so concurrent attempts never clobber or misattribute files
+and half-written downloads never appear in the group folders.
+"""
+
+import asyncio
+import os
+import shutil
+import uuid
+from typing import Dict, Optional
+from urllib.parse import unquote, urlparse
+
+from browser_use.browser.context import BrowserContext
+
+from browser_state import apply_storage_state
+from http_client import cache_validators
+from listing_changes import listing_snapshot
+from marketing_documents import find_document_links
+
+STAGING_FOLDER = ".staging"
+MIN_PDF_BYTES = 1000
+
+
+def create_staging_dir(download_folder: str, attempt_name: str) -> str:
+    """Unique staging directory for one download attempt"""
+    staging_dir = os.path.join(download_folder, STAGING_FOLDER, f"{attempt_name}_{uuid.uuid4().hex[:8]}")
+    os.makedirs(staging_dir, exist_ok=True)
+    return os.path.abspath(staging_dir)
+
+
+def is_valid_pdf(path: str) -> bool:
+    """Complete-looking PDF: big enough and starts with the PDF header"""
+    try:
+        if os.path.getsize(path) <= MIN_PDF_BYTES:
+            return False
+        with open(path, "rb") as f:
+            return f.read(5) == b"%PDF-"
+    except OSError:
+        return False
+
+
+def find_staged_pdf(staging_dir: str) -> Optional[str]:
+    """Largest valid PDF in a staging directory"""
+    candidates = []
+    for name in os.listdir(staging_dir):
+        path = os.path.join(staging_dir, name)
+        if not name.endswith(".part") and os.path.isfile(path) and is_valid_pdf(path):
+            candidates.append(path)
+    return max(candidates, key=os.path.getsize, default=None)
+
+
+def promote_staged_pdf(staging_dir: str, final_path: str) -> Optional[str]:
+    """Atomically move the attempt's PDF to its final name; returns the final path"""
+    staged = find_staged_pdf(staging_dir)
+    if not staged:
+        return None
+    os.makedirs(os.path.dirname(final_path) or ".", exist_ok=True)
+    os.replace(staged, final_path)
+    return final_path
+
+
+def remove_staging_dir(staging_dir: str):
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+class StagingBrowserContext(BrowserContext):
+    def __init__(self, browser, staging_dir: str, storage_state: Optional[Dict] = None, listing_url: str = None):
+        """Browser context saving every download of its pages into `staging_dir`,
+        optionally starting from a site's saved storage state (see browser_state.py).
+        The first load of `listing_url` is snapshotted for change detection (see listing_changes.py), and
+        document links on every page it loads are collected (see marketing_documents.py)"""
+        super().__init__(browser=browser)
+        self.staging_dir = staging_dir
+        self.storage_state = storage_state
+        self.listing_url = listing_url
+        self.listing_snapshot = None
+        self.pending_downloads = set()
+        self.captured_pdf_urls = []
+        self.pdf_responses = {}  # PDF URL -> cache validators (ETag / Last-Modified), for refresh runs
+        self.download_urls = []
+        self.staged_urls = {}  # Staged file path -> URL it came from
+        self.document_links = {}  # Document URL -> link found on the listing / form result pages
+        self.host_responses = []  # (HTTP status, seconds to first byte) of page loads on the listing's host, for the rate limiter
+        self.form_posts = []  # Form submissions, for learning the HTTP fast path (http_fast_path.py)
+        self.prefetched_at = None  # time.monotonic() of the pipelined prefetch navigation, if any
+        self.screenshots_wanted = None  # Returns whether a step needs a screenshot (see vision_policy.py); None: always
+
+    async def take_screenshot(self, full_page: bool = False) -> Optional[str]:
+        # DOM-only steps skip the capture and base64 encoding entirely
+        if self.screenshots_wanted is not None and not self.screenshots_wanted():
+            return None
+        return await super().take_screenshot(full_page)
+
+    async def _create_context(self, browser):
+        context = await super()._create_context(browser)
+        if self.storage_state:
+            await apply_storage_state(context, self.storage_state)
+        context.on("request", self._on_request)
+        context.on("response", self._on_response)
+        context.on("page", self._watch_page)
+        for page in context.pages:
+            self._watch_page(page)
+        return context
+
+    def _watch_page(self, page):
+        page.on("download", self._on_download)
+
+    def _track(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self.pending_downloads.add(task)
+        task.add_done_callback(self.pending_downloads.discard)
+
+    def _on_download(self, download):
+        self.download_urls.append(download.url)
+        self._track(self._save_download(download))
+
+    def _on_request(self, request):
+        content_type = request.headers.get("content-type", "")
+        if request.method == "POST" and "application/x-www-form-urlencoded" in content_type:
+            self.form_posts.append({"url": request.url, "content_type": content_type, "post_data": request.post_data})
+
+    def _on_response(self, response):
+        if self.listing_url and self.listing_snapshot is None and self._is_listing_document(response):
+            self.listing_snapshot = {}  # Claimed; filled in once the body is read
+            self._track(self._snapshot_listing(response))
+        if response.ok and response.request.resource_type in ("document", "xhr", "fetch") \
+                and "text/html" in response.headers.get("content-type", ""):
+            self._track(self._collect_document_links(response))
+        if response.request.resource_type == "document" and self._on_listing_host(response.url):
+            self.host_responses.append((response.status, self._seconds_to_first_byte(response)))
+        content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        is_pdf_url = urlparse(response.url).path.lower().endswith(".pdf")
+        if response.ok and (content_type == "application/pdf" or is_pdf_url):
+            self.pdf_responses[response.url] = cache_validators(response.headers)
+            self._track(self._capture_pdf(response))
+
+    def _on_listing_host(self, url: str) -> bool:
+        if not self.listing_url:
+            return False
+        host = (urlparse(url).hostname or "").lower()
+        listing_host = (urlparse(self.listing_url).hostname or "").lower()
+        return host.removeprefix("www.") == listing_host.removeprefix("www.")
+
+    @staticmethod
+    def _seconds_to_first_byte(response) -> Optional[float]:
+        # Resource timing is in milliseconds relative to the request start (-1 when unavailable)
+        response_start = response.request.timing.get("responseStart", -1)
+        return response_start / 1000 if response_start >= 0 else None
+
+    def _is_listing_document(self, response) -> bool:
+        request = response.request
+        if request.resource_type != "document" or not response.ok:
+            return False
+        while request is not None:
+            if request.url == self.listing_url:
+                return True
+            request = request.redirected_from
+        return False
+
+    async def _snapshot_listing(self, response):
+        try:
+            self.listing_snapshot = listing_snapshot(await response.text(), response.headers)
+        except Exception:
+            self.listing_snapshot = None
+
+    async def _collect_document_links(self, response):
+        try:
+            html = await response.text()
+        except Exception:
+            return
+        for document in find_document_links(html, response.url):
+            self.document_links.setdefault(document["url"], document)
+
+    async def _capture_pdf(self, response):
+        """Save a PDF the browser loaded (e.g. displayed inline) so it is not fetched a second time"""
+        try:
+            body = await response.body()
+        except Exception:
+            # Attachments have no readable body here - the download handler saves those
+            return
+        if not body.startswith(b"%PDF-"):
+            return
+        name = os.path.basename(unquote(urlparse(response.url).path)) or f"{uuid.uuid4().hex}.pdf"
+        if not name.lower().endswith(".pdf"):
+            name += ".pdf"
+        # Write under a temporary name so a partial file is never picked up
+        target = os.path.join(self.staging_dir, name)
+        with open(target + ".part", "wb") as f:
+            f.write(body)
+        os.replace(target + ".part", target)
+        self.captured_pdf_urls.append(response.url)
+        self.staged_urls[target] = response.url
+        print(f"📡 Captured PDF response: {response.url} ({len(body):,} bytes)")
+
+    async def _save_download(self, download):
+        # Playwright writes to a temp file first; save_as copies the finished file
+        target = os.path.join(self.staging_dir, download.suggested_filename or f"{uuid.uuid4().hex}.pdf")
+        try:
+            await download.save_as(target)
+            self.staged_urls[target] = download.url
+            print(f"📥 Download saved to staging: {os.path.basename(target)}")
+        except Exception as e:
+            print(f"⚠️  Download failed: {e}")
+
+    async def wait_for_downloads(self, timeout: float = 30.0):
+        """Wait for downloads and captured responses that are still being written"""
+        if self.pending_downloads:
+            await asyncio.wait(set(self.pending_downloads), timeout=timeout)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Browser Engines
+Per-browser Playwright engine selection (chromium, webkit or firefox).
+
+The engine is part of each Browser's config (browser-use's `browser_class`)
+instead of process-wide state, so properties for different website groups can
+be set up concurrently, each on its own engine.
+"""
+
+from browser_use.browser.browser import BrowserConfig
+
+BROWSER_ENGINES = ("chromium", "webkit", "firefox")
+
+
+def engine_config(config: BrowserConfig, engine: str = "chromium") -> BrowserConfig:
+    """Copy of a browser config that launches the given Playwright engine"""
+    if engine not in BROWSER_ENGINES:
+        raise ValueError(f"Unknown browser engine {engine!r} (expected one of {', '.join(BROWSER_ENGINES)})")
+    update = {"browser_class": engine}
+    if engine != "chromium":
+        # Chromium command line switches don't apply to WebKit/Firefox
+        update["extra_browser_args"] = []
+    return config.model_copy(update=update)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Browser State
+Per-site browser storage state (cookies and localStorage) persisted between
+browser contexts.
+
+The lead forms on Levy Retail and Tag Industrial are filled once; the first
+successful property of a website group saves its context's storage state,
+and later contexts for that group start with it loaded. When a site remembers
+the submitted lead it goes straight to the download and the agent skips the
+form steps.
+"""
+
+import json
+import os
+import tempfile
+from typing import Dict, Optional
+
+
+def storage_state_path(state_folder: str, website_group: str) -> str:
+    return os.path.join(state_folder, f"{website_group}.json")
+
+
+def load_storage_state(path: str) -> Optional[Dict]:
+    """Saved Playwright storage state, or None if missing or unreadable"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+async def apply_storage_state(context, state: Dict):
+    """Load cookies and per-origin localStorage into an already created Playwright context"""
+    if state.get("cookies"):
+        await context.add_cookies(state["cookies"])
+
+    local_storage = {
+        origin["origin"]: [[item["name"], item["value"]] for item in origin.get("localStorage", [])]
+        for origin in state.get("origins", [])
+    }
+    if local_storage:
+        # Runs before any page script; values the page already set itself are kept
+        await context.add_init_script(script=f"""
+            (() => {{
+                const items = {json.dumps(local_storage)}[window.location.origin] || [];
+                for (const [name, value] of items) {{
+                    if (window.localStorage.getItem(name) === null) window.localStorage.setItem(name, value);
+                }}
+            }})();
+        """)
+
+
+async def save_storage_state(context, path: str):
+    """Write the context's storage state atomically (concurrent workers may save the same site)"""
+    state = await context.storage_state()
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    # A temp file of its own per writer, so two saves never interleave before the rename
+    fd, part_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".part")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(part_path, path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Checklist Data Access
+Query builders for marketing_checklist plus an async (psycopg 3) connection
+pool, so database round trips never block the agent's event loop.
+
+Lists are bound as arrays (= ANY / <> ALL) because psycopg 3 does not expand
+tuples for IN.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from psycopg_pool import AsyncConnectionPool
+
+from retry_scheduler import RETRYABLE_STATUSES
+
+PROPERTY_COLUMNS = "id, website_group, property_number, property_name, property_url, attempt_count"
+
+
+def _eligible_rows_query(max_attempts: int, website_group_filter: str = None) -> Tuple[str, list]:
+    """Pending rows, and failed rows whose retry backoff has expired"""
+    query = f"""
+        SELECT {PROPERTY_COLUMNS}
+        FROM marketing_checklist
+        WHERE (
+            (UPPER(visited) = 'NO' AND UPPER(download_status) = 'PENDING')
+            OR (UPPER(download_status) = ANY(%s)
+                AND COALESCE(attempt_count, 0) < %s
+                AND (next_attempt_at IS NULL OR next_attempt_at <= %s))
+        )
+    """
+    params = [list(RETRYABLE_STATUSES), max_attempts, datetime.now()]
+
+    if website_group_filter:
+        query += " AND website_group = %s"
+        params.append(website_group_filter)
+    return query, params
+
+
+def _shard_filter(query: str, params: list, shard: Tuple[int, int]) -> str:
+    # Only rows belonging to this machine's shard
+    shard_index, shard_count = shard
+    if shard_count > 1:
+        query += " AND MOD(id, %s) = %s"
+        params.extend([shard_count, shard_index - 1])
+    return query
+
+
+def build_next_property_query(max_attempts: int, website_group_filter: str = None, exclude_groups: List[str] = None,
+                              exclude_ids: List[int] = None, shard: Tuple[int, int] = (1, 1)) -> Tuple[str, list]:
+    """Next pending row, or failed row whose retry backoff has expired"""
+    query, params = _eligible_rows_query(max_attempts, website_group_filter)
+
+    # Skip website groups whose circuit breaker is open
+    if exclude_groups:
+        query += " AND website_group <> ALL(%s)"
+        params.append(list(exclude_groups))
+
+    # Skip rows already handed to pool workers
+    if exclude_ids:
+        query += " AND id <> ALL(%s)"
+        params.append(list(exclude_ids))
+
+    query = _shard_filter(query, params, shard)
+    query += " ORDER BY property_number LIMIT 1"
+    return query, params
+
+
+def build_shard_progress_query(website_group_filter: str = None, shard: Tuple[int, int] = (1, 1)) -> Tuple[str, list]:
+    """Row counts by download status within one shard"""
+    query = "SELECT UPPER(download_status), COUNT(*) FROM marketing_checklist WHERE TRUE"
+    params = []
+    if website_group_filter:
+        query += " AND website_group = %s"
+        params.append(website_group_filter)
+    query = _shard_filter(query, params, shard)
+    query += " GROUP BY UPPER(download_status)"
+    return query, params
+
+
+def build_preflight_query(max_attempts: int, checked_before: datetime, website_group_filter: str = None,
+                          shard: Tuple[int, int] = (1, 1)) -> Tuple[str, list]:
+    """Rows the session could pick up whose listing was not HTTP-checked since `checked_before`"""
+    query, params = _eligible_rows_query(max_attempts, website_group_filter)
+    query += " AND (listing_checked_at IS NULL OR listing_checked_at < %s)"
+    params.append(checked_before)
+    query = _shard_filter(query, params, shard)
+    query += " ORDER BY property_number"
+    return query, params
+
+
+def build_refresh_query(website_group_filter: str = None, shard: Tuple[int, int] = (1, 1)) -> Tuple[str, list]:
+    """Downloaded rows with their cached PDF URL and listing page snapshot (either may be NULL)"""
+    query = f"""
+        SELECT {PROPERTY_COLUMNS}, pdf_url, pdf_etag, pdf_last_modified, page_hash, page_etag, page_last_modified
+        FROM marketing_checklist
+        WHERE UPPER(download_status) = 'SUCCESS'
+    """
+    params = []
+    if website_group_filter:
+        query += " AND website_group = %s"
+        params.append(website_group_filter)
+    query = _shard_filter(query, params, shard)
+    query += " ORDER BY property_number"
+    return query, params
+
+
+def build_requeue_query(ids: List[int], notes: str) -> Tuple[str, list]:
+    """Send rows back to the browser agent as fresh pending work"""
+    query = """
+        UPDATE marketing_checklist
+        SET visited = 'NO', download_status = 'PENDING', attempt_count = 0, next_attempt_at = NULL,
+            notes = %s, updated_at = %s
+        WHERE id = ANY(%s)
+    """
+    return query, [notes, datetime.now(), list(ids)]
+
+
+def build_discovery_watermark_query(website_group: str) -> Tuple[str, list]:
+    """Newest sitemap lastmod already stored for a website group"""
+    return "SELECT MAX(sitemap_lastmod) FROM marketing_checklist WHERE website_group = %s", [website_group]
+
+
+# Serialises property_number assignment between concurrent discovery transactions
+PROPERTY_NUMBER_LOCK = 7301
+
+
+def normalized_url_sql(column: str) -> str:
+    """SQL for a URL column without query string, fragment or trailing slash, lowercased
+    (the key listing_discovery.normalize_listing_url produces, compared case-insensitively)"""
+    return f"LOWER(RTRIM(SPLIT_PART(SPLIT_PART({column}, '#', 1), '?', 1), '/'))"
+
+
+def build_upsert_listings_statements(website_group: str, listings: List[Dict]) -> List[Tuple[str, list]]:
+    """Statements for one transaction: insert unseen listings as PENDING rows with the next property
+    numbers, and record the sitemap lastmod of listings that are already in the table (by row id).
+    Listings are matched on their normalized URL (see listing_discovery.normalize_listing_url)"""
+    urls = [listing['url'] for listing in listings]
+    names = [listing['name'] for listing in listings]
+    lastmods = [listing['lastmod'] for listing in listings]
+    insert_query = f"""
+        INSERT INTO marketing_checklist (website_group, property_number, property_name, property_url, sitemap_lastmod)
+        SELECT %s,
+               (SELECT COALESCE(MAX(property_number), 0) FROM marketing_checklist)
+                   + ROW_NUMBER() OVER (ORDER BY listing.position),
+               listing.name, listing.url, listing.lastmod
+        FROM UNNEST(%s::text[], %s::text[], %s::timestamp[]) WITH ORDINALITY AS listing(url, name, lastmod, position)
+        WHERE NOT EXISTS (
+            SELECT 1 FROM marketing_checklist existing
+            WHERE {normalized_url_sql('existing.property_url')} = {normalized_url_sql('listing.url')}
+        )
+    """
+    # One row per listing (the oldest, should the table hold duplicates), updated by id
+    update_query = f"""
+        UPDATE marketing_checklist existing
+        SET sitemap_lastmod = matched.lastmod, updated_at = %s
+        FROM (
+            SELECT DISTINCT ON (listing.url) candidate.id, listing.lastmod
+            FROM UNNEST(%s::text[], %s::timestamp[]) AS listing(url, lastmod)
+            JOIN marketing_checklist candidate
+              ON {normalized_url_sql('candidate.property_url')} = {normalized_url_sql('listing.url')}
+            WHERE listing.lastmod IS NOT NULL
+            ORDER BY listing.url, candidate.id
+        ) matched
+        WHERE existing.id = matched.id
+          AND (existing.sitemap_lastmod IS NULL OR existing.sitemap_lastmod < matched.lastmod)
+    """
+    return [
+        ("SELECT pg_advisory_xact_lock(%s)", [PROPERTY_NUMBER_LOCK]),
+        (insert_query, [website_group, urls, names, lastmods]),
+        (update_query, [datetime.now(), urls, lastmods])
+    ]
+
+
+def build_record_files_query(property_id: int, files: List[Dict]) -> Tuple[str, list]:
+    """Upsert a property's captured documents into marketing_files (one row per file URL)"""
+    query = """
+        INSERT INTO marketing_files (property_id, file_name, file_url, file_size, sha256, document_type, downloaded_at)
+        SELECT %s, file.name, file.url, file.size, file.sha256, file.document_type, %s
+        FROM UNNEST(%s::text[], %s::text[], %s::bigint[], %s::text[], %s::text[])
+            AS file(name, url, size, sha256, document_type)
+        ON CONFLICT (property_id, file_url) DO UPDATE
+        SET file_name = EXCLUDED.file_name, file_size = EXCLUDED.file_size, sha256 = EXCLUDED.sha256,
+            document_type = EXCLUDED.document_type, downloaded_at = EXCLUDED.downloaded_at
+    """
+    return query, [
+        property_id, datetime.now(),
+        [file['file_name'] for file in files], [file['file_url'] for file in files],
+        [file['file_size'] for file in files], [file['sha256'] for file in files],
+        [file['document_type'] for file in files]
+    ]
+
+
+def build_listing_checked_query(ids: List[int]) -> Tuple[str, list]:
+    """Stamp rows whose listing passed the preflight"""
+    return "UPDATE marketing_checklist SET listing_checked_at = %s WHERE id = ANY(%s)", [datetime.now(), list(ids)]
+
+
+def row_to_property(row) -> Optional[Dict]:
+    if not row:
+        return None
+    return {
+        'id': row[0],
+        'website_group': row[1],
+        'property_number': row[2],
+        'property_name': row[3],
+        'property_url': row[4],
+        'attempt_count': row[5] or 0
+    }
+
+
+def build_update_query(property_info: Dict, visited: bool = False, downloaded: bool = False,
+                       marketing_files: str = "", status: str = "", notes: str = "", error: str = "",
+                       attempt_count: Optional[int] = None, next_attempt_at: Optional[datetime] = None,
+                       listing_checked_at: Optional[datetime] = None, pdf_source: Optional[Dict] = None,
+                       page_snapshot: Optional[Dict] = None) -> Tuple[str, list]:
+    """UPDATE for one property's processing results (only the fields that are set), by row id"""
+    update_fields = []
+    values = []
+
+    if visited:
+        update_fields.append("visited = %s")
+        values.append('YES')
+    if downloaded:
+        update_fields.append("downloaded = %s")
+        values.append('YES')
+    if marketing_files:
+        update_fields.append("marketing_files_found = %s")
+        values.append(str(marketing_files))
+    if status:
+        update_fields.append("download_status = %s")
+        values.append(str(status))
+    if notes:
+        update_fields.append("notes = %s")
+        values.append(str(notes))
+    if error:
+        update_fields.append("error_message = %s")
+        values.append(str(error))
+    if attempt_count is not None:
+        update_fields.append("attempt_count = %s")
+        values.append(attempt_count)
+        # next_attempt_at is always written with the attempt count so a give-up clears it
+        update_fields.append("next_attempt_at = %s")
+        values.append(next_attempt_at)
+    if listing_checked_at:
+        update_fields.append("listing_checked_at = %s")
+        values.append(listing_checked_at)
+    if pdf_source:
+        # Resolved download URL and its validators, for conditional GETs in refresh runs
+        update_fields.extend(["pdf_url = %s", "pdf_etag = %s", "pdf_last_modified = %s"])
+        values.extend([pdf_source['url'], pdf_source.get('etag'), pdf_source.get('last_modified')])
+    if page_snapshot:
+        # Listing page state when it was last handled, for change detection in refresh runs
+        update_fields.extend(["page_hash = %s", "page_etag = %s", "page_last_modified = %s"])
+        values.extend([page_snapshot['hash'], page_snapshot.get('etag'), page_snapshot.get('last_modified')])
+
+    # Always update timestamp and updated_at
+    update_fields.append("last_attempt = %s")
+    update_fields.append("updated_at = %s")
+    values.extend([datetime.now(), datetime.now()])
+
+    # Rows are keyed on id, like marketing_files (names derived from listing slugs need not be unique)
+    values.append(property_info['id'])
+
+    query = f"""
+        UPDATE marketing_checklist
+        SET {', '.join(update_fields)}
+        WHERE id = %s
+    """
+    return query, values
+
+
+class AsyncChecklistDB:
+    def __init__(self, database_url: str, max_size: int = 5):
+        """psycopg 3 connection pool, opened on first use inside the running event loop"""
+        self.database_url = database_url
+        self.max_size = max_size
+        self.pool = None
+
+    async def _get_pool(self) -> AsyncConnectionPool:
+        if self.pool is None:
+            self.pool = AsyncConnectionPool(self.database_url, min_size=1, max_size=self.max_size, open=False)
+            await self.pool.open()
+        return self.pool
+
+    async def fetch_one(self, query: str, params: list = None):
+        pool = await self._get_pool()
+        async with pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, params)
+                return await cursor.fetchone()
+
+    async def fetch_all(self, query: str, params: list = None) -> list:
+        pool = await self._get_pool()
+        async with pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, params)
+                return await cursor.fetchall()
+
+    async def execute(self, query: str, params: list = None):
+        pool = await self._get_pool()
+        async with pool.connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, params)
+            await conn.commit()
+
+    async def execute_transaction(self, statements: List[Tuple[str, list]]) -> List[int]:
+        """Run statements in one transaction; returns each statement's row count"""
+        pool = await self._get_pool()
+        row_counts = []
+        async with pool.connection() as conn:
+            async with conn.transaction():
+                async with conn.cursor() as cursor:
+                    for query, params in statements:
+                        await cursor.execute(query, params)
+                        row_counts.append(cursor.rowcount)
+        return row_counts
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
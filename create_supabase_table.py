@@ -6,6 +6,120 @@ from datetime import datetime
 # This script connects to Railway PostgreSQL database and creates a marketing_checklist table
 # with proper schema and imports all data from the CSV file
 
+# Table schema (also used by the benchmark harness to seed a local database)
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS marketing_checklist (
+    id SERIAL PRIMARY KEY,
+    website_group VARCHAR(100) NOT NULL,
+    property_number INTEGER,
+    property_name VARCHAR(200) NOT NULL,
+    property_url TEXT NOT NULL,
+    visited VARCHAR(10) DEFAULT 'NO',
+    downloaded VARCHAR(10) DEFAULT 'NO',
+    marketing_files_found TEXT,
+    download_status VARCHAR(50) DEFAULT 'PENDING',
+    notes TEXT,
+    last_attempt TIMESTAMP,
+    error_message TEXT,
+    attempt_count INTEGER DEFAULT 0,
+    next_attempt_at TIMESTAMP,
+    listing_checked_at TIMESTAMP,
+    pdf_url TEXT,
+    pdf_etag TEXT,
+    pdf_last_modified TEXT,
+    page_hash VARCHAR(64),
+    page_etag TEXT,
+    page_last_modified TEXT,
+    sitemap_lastmod TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+CREATE_INDEXES_SQL = [
+    "CREATE INDEX IF NOT EXISTS idx_website_group ON marketing_checklist(website_group);",
+    "CREATE INDEX IF NOT EXISTS idx_download_status ON marketing_checklist(download_status);",
+    "CREATE INDEX IF NOT EXISTS idx_property_name ON marketing_checklist(property_name);",
+    "CREATE INDEX IF NOT EXISTS idx_next_attempt_at ON marketing_checklist(next_attempt_at);"
+]
+
+# Every marketing document captured per property (main package, OMs, flyers, site plans, rent rolls)
+CREATE_FILES_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS marketing_files (
+    id SERIAL PRIMARY KEY,
+    property_id INTEGER NOT NULL REFERENCES marketing_checklist(id) ON DELETE CASCADE,
+    file_name TEXT NOT NULL,
+    file_url TEXT NOT NULL,
+    file_size BIGINT,
+    sha256 VARCHAR(64),
+    document_type VARCHAR(50),
+    downloaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (property_id, file_url)
+);
+"""
+
+# Columns added after the first release: (name, type), for tables created before they existed
+MIGRATION_COLUMNS = [
+    ("attempt_count", "INTEGER DEFAULT 0"),
+    ("next_attempt_at", "TIMESTAMP"),
+    ("listing_checked_at", "TIMESTAMP"),
+    ("pdf_url", "TEXT"),
+    ("pdf_etag", "TEXT"),
+    ("pdf_last_modified", "TEXT"),
+    ("page_hash", "VARCHAR(64)"),
+    ("page_etag", "TEXT"),
+    ("page_last_modified", "TEXT"),
+    ("sitemap_lastmod", "TIMESTAMP")
+]
+
+
+def apply_migrations(cursor) -> list:
+    """Add missing columns and the marketing_files table; returns what was added.
+    Checks information_schema first so an up-to-date schema costs no ACCESS EXCLUSIVE lock
+    (every agent and pool worker calls this on start)"""
+    cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'marketing_checklist'
+    """)
+    existing = {row[0] for row in cursor.fetchall()}
+    missing = [(name, column_type) for name, column_type in MIGRATION_COLUMNS if name not in existing]
+    if missing:
+        cursor.execute("ALTER TABLE marketing_checklist "
+                       + ", ".join(f"ADD COLUMN IF NOT EXISTS {name} {column_type}" for name, column_type in missing))
+
+    added = [name for name, _ in missing]
+    cursor.execute("""
+        SELECT EXISTS (
+            SELECT FROM information_schema.tables
+            WHERE table_schema = current_schema() AND table_name = 'marketing_files'
+        )
+    """)
+    if not cursor.fetchone()[0]:
+        cursor.execute(CREATE_FILES_TABLE_SQL)
+        added.append("marketing_files")
+    return added
+
+
+# LISTEN/NOTIFY channels for daemon-mode agents
+PENDING_CHANNEL = "marketing_checklist_pending"
+COMMAND_CHANNEL = "marketing_agent_commands"
+
+# Notifies daemon-mode agents when rows become PENDING
+CREATE_NOTIFY_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION notify_marketing_checklist_pending() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('{PENDING_CHANNEL}', NEW.website_group);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS marketing_checklist_pending_notify ON marketing_checklist;
+CREATE TRIGGER marketing_checklist_pending_notify
+    AFTER INSERT OR UPDATE OF download_status ON marketing_checklist
+    FOR EACH ROW WHEN (NEW.download_status = 'PENDING')
+    EXECUTE FUNCTION notify_marketing_checklist_pending();
+"""
+
 def create_railway_table():
     """
     Connect to Railway database and create marketing_checklist table with data
@@ -25,41 +139,23 @@ def create_railway_table():
         conn = psycopg2.connect(database_url)
         cursor = conn.cursor()
         
-        # Create table SQL
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS marketing_checklist (
-            id SERIAL PRIMARY KEY,
-            website_group VARCHAR(100) NOT NULL,
-            property_number INTEGER,
-            property_name VARCHAR(200) NOT NULL,
-            property_url TEXT NOT NULL,
-            visited VARCHAR(10) DEFAULT 'NO',
-            downloaded VARCHAR(10) DEFAULT 'NO',
-            marketing_files_found TEXT,
-            download_status VARCHAR(50) DEFAULT 'PENDING',
-            notes TEXT,
-            last_attempt TIMESTAMP,
-            error_message TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        """
-        
         print("🏗️  Creating marketing_checklist table...")
-        cursor.execute(create_table_sql)
+        cursor.execute(CREATE_TABLE_SQL)
         
         # Create indexes for better performance
-        create_indexes_sql = [
-            "CREATE INDEX IF NOT EXISTS idx_website_group ON marketing_checklist(website_group);",
-            "CREATE INDEX IF NOT EXISTS idx_download_status ON marketing_checklist(download_status);",
-            "CREATE INDEX IF NOT EXISTS idx_property_name ON marketing_checklist(property_name);"
-        ]
-        
-        for index_sql in create_indexes_sql:
+        for index_sql in CREATE_INDEXES_SQL:
             cursor.execute(index_sql)
         
         print("📊 Creating indexes...")
         
+        # Bring a table from an earlier release up to date (and create marketing_files)
+        for added in apply_migrations(cursor):
+            print(f"🧱 Added {added}")
+        
+        # Wake daemon-mode agents when new pending rows arrive
+        cursor.execute(CREATE_NOTIFY_TRIGGER_SQL)
+        print("🔔 Creating pending-row notification trigger...")
+        
         # Clear existing data (optional)
         cursor.execute("DELETE FROM marketing_checklist;")
         print("🧹 Cleared existing data...")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+HTTP Client
+Pooled requests session for the browser-free code paths (HTTP fast path,
+PDF fetches), with browser-like headers so sites serve the same pages the
+browser agent sees. Given a HostRateLimiter, every request to a listing host
+waits for that host's token and feeds its status and response time back.
+"""
+
+import os
+import time
+import uuid
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'DNT': '1',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+
+def _bare_host(host: str) -> str:
+    host = host.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class RateLimitedSession(requests.Session):
+    def __init__(self, rate_limiter, hosts: Iterable[str],
+                 on_response: Callable[[str, Optional[int], Optional[float]], None] = None):
+        """Session taking a rate limiter token before each request to one of `hosts` (with or without
+        www., subdomains included; the token is taken under the host as given) and reporting each
+        response through `on_response(host, status, elapsed)`, by default the limiter's record_response"""
+        super().__init__()
+        self.rate_limiter = rate_limiter
+        self.hosts = {_bare_host(host): host for host in hosts}
+        self.on_response = on_response or (
+            lambda host, status, elapsed: rate_limiter.record_response(host, status=status, elapsed=elapsed))
+
+    def limiter_host(self, url: str) -> Optional[str]:
+        """Rate limiter key for a URL, or None when it isn't on a listing host"""
+        host = _bare_host(urlparse(url).hostname or "")
+        for bare, limiter_host in self.hosts.items():
+            if host == bare or host.endswith("." + bare):
+                return limiter_host
+        return None
+
+    def send(self, request, **kwargs):
+        # Redirect hops come back through send(), so each hop is limited and reported once
+        host = self.limiter_host(request.url)
+        if host is None:
+            return super().send(request, **kwargs)
+        self.rate_limiter.acquire_blocking(host)
+        started = time.monotonic()
+        try:
+            response = super().send(request, **kwargs)
+        except requests.RequestException:
+            self.on_response(host, None, time.monotonic() - started)
+            raise
+        first = response.history[0] if response.history else response
+        self.on_response(host, first.status_code, first.elapsed.total_seconds())
+        return response
+
+
+def create_http_session(pool_size: int = 10, rate_limiter=None, hosts: Iterable[str] = (),
+                        on_response: Callable[[str, Optional[int], Optional[float]], None] = None
+                        ) -> requests.Session:
+    """Session keeping up to `pool_size` connections alive per host, rate limited per listing host
+    when a HostRateLimiter is given (see RateLimitedSession)"""
+    session = RateLimitedSession(rate_limiter, hosts, on_response) if rate_limiter else requests.Session()
+    session.headers.update(BROWSER_HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def cache_validators(headers) -> Dict:
+    """ETag / Last-Modified of a response, for conditional re-downloads"""
+    return {"etag": headers.get("etag"), "last_modified": headers.get("last-modified")}
+
+
+def download_file(session: requests.Session, url: str, target_dir: str, timeout: float = 60,
+                  headers: Dict = None, cookies=None) -> Tuple[Optional[str], requests.Response]:
+    """Stream a URL into target_dir under a temporary name, then rename it; returns the path and response
+    (no path when a conditional request came back 304 Not Modified)"""
+    response = session.get(url, stream=True, timeout=timeout, headers=headers, cookies=cookies)
+    response.raise_for_status()
+    if response.status_code == 304:
+        response.close()
+        return None, response
+    name = os.path.basename(unquote(urlparse(response.url).path)) or f"{uuid.uuid4().hex}.pdf"
+    target = os.path.join(target_dir, name)
+    with open(target + ".part", "wb") as f:
+        for chunk in response.iter_content(chunk_size=65536):
+            f.write(chunk)
+    os.replace(target + ".part", target)
+    return target, response
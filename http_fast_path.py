@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+HTTP Fast Path
+Browser-free downloads for sites whose lead form and download link are plain
+HTTP interactions.
+
+One successful browser run records the form POST the page made; the adapter
+learns which form fields carry the contact details (a "recipe", saved per
+website group). Later properties fetch the listing page, fill the same form
+with its own hidden fields plus the contact details, submit it and follow the
+download link with the pooled HTTP client - no browser and no LLM. Anything
+that does not match the recipe raises FastPathMismatch and the property goes
+to the browser agent as usual.
+"""
+
+import json
+import os
+import tempfile
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urljoin
+
+import requests
+
+from browser_downloads import is_valid_pdf
+from http_client import cache_validators, download_file
+from listing_changes import listing_snapshot
+from marketing_documents import find_document_links
+
+
+class FastPathMismatch(Exception):
+    """The page no longer matches the learned recipe - use the browser agent"""
+
+
+class PageParser(HTMLParser):
+    """Forms (action, method, default field values) and links of an HTML page"""
+
+    def __init__(self):
+        super().__init__()
+        self.forms = []
+        self.links = []
+        self._form = None
+        self._link = None
+        self._select = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form":
+            self._form = {"action": attrs.get("action") or "", "method": (attrs.get("method") or "get").lower(),
+                          "fields": {}}
+            self.forms.append(self._form)
+        elif tag == "a" and attrs.get("href"):
+            self._link = {"href": attrs["href"], "text": ""}
+            self.links.append(self._link)
+        elif self._form is not None and attrs.get("name"):
+            name = attrs["name"]
+            if tag == "input":
+                input_type = (attrs.get("type") or "text").lower()
+                if input_type in ("checkbox", "radio") and "checked" not in attrs:
+                    return
+                if input_type not in ("submit", "button", "image", "file"):
+                    self._form["fields"][name] = attrs.get("value") or ""
+            elif tag == "textarea":
+                self._form["fields"][name] = ""
+            elif tag == "select":
+                self._select = name
+        elif tag == "option" and self._form is not None and self._select:
+            # First option is the default unless another one is selected
+            if self._select not in self._form["fields"] or "selected" in attrs:
+                self._form["fields"][self._select] = attrs.get("value") or ""
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self._form = None
+        elif tag == "a":
+            self._link = None
+        elif tag == "select":
+            self._select = None
+
+    def handle_data(self, data):
+        if self._link is not None:
+            self._link["text"] += data
+
+
+def parse_page(html: str) -> PageParser:
+    parser = PageParser()
+    parser.feed(html)
+    return parser
+
+
+class FormDownloadAdapter:
+    def __init__(self, website_group: str, download_link_text: str):
+        """Lead form followed by a direct download link whose text contains `download_link_text`"""
+        self.website_group = website_group
+        self.download_link_text = download_link_text.lower()
+
+    def learn(self, form_posts: List[Dict], property_url: str, contact: Dict) -> Optional[Dict]:
+        """Recipe from the form POSTs recorded during a successful browser run (None if none fits)"""
+        contact_keys = {value: key for key, value in contact.items() if value}
+        for post in reversed(form_posts):
+            if "application/x-www-form-urlencoded" not in post["content_type"]:
+                continue
+            fields = dict(parse_qsl(post["post_data"] or "", keep_blank_values=True))
+            contact_fields = {name: contact_keys[value] for name, value in fields.items() if value in contact_keys}
+            # The lead form is the POST that carried the contact details
+            if len(contact_fields) < 2:
+                continue
+            return {"learned_from": property_url, "contact_fields": contact_fields}
+        return None
+
+    def _find_form(self, page: PageParser, page_url: str, recipe: Dict) -> Optional[Dict]:
+        # Form actions often contain the listing's slug, so the form is recognised by its fields
+        for form in page.forms:
+            if form["method"] == "post" and set(recipe["contact_fields"]) <= set(form["fields"]):
+                return {**form, "action": urljoin(page_url, form["action"])}
+        return None
+
+    def _find_download_link(self, page: PageParser, page_url: str) -> Optional[str]:
+        for link in page.links:
+            if self.download_link_text in " ".join(link["text"].split()).lower():
+                return urljoin(page_url, link["href"])
+        return None
+
+    def fetch(self, session: requests.Session, property_url: str, contact: Dict, recipe: Dict,
+              staging_dir: str, timeout: float = 30) -> Dict:
+        """Submit the lead form and download the package into staging_dir; returns the staged PDF's
+        path, its URL and cache validators, a snapshot of the listing page and the document links on the
+        listing and result pages"""
+        listing = session.get(property_url, timeout=timeout)
+        listing.raise_for_status()
+        form = self._find_form(parse_page(listing.text), listing.url, recipe)
+        if not form:
+            raise FastPathMismatch("lead form not found on the listing page")
+
+        data = dict(form["fields"])
+        for name, key in recipe["contact_fields"].items():
+            data[name] = contact[key]
+        result = session.post(form["action"], data=data, headers={"Referer": listing.url}, timeout=timeout)
+        result.raise_for_status()
+
+        download_url = self._find_download_link(parse_page(result.text), result.url)
+        if not download_url:
+            raise FastPathMismatch("download link not found after submitting the form")
+        path, response = download_file(session, download_url, staging_dir, timeout=timeout)
+        if not is_valid_pdf(path):
+            raise FastPathMismatch(f"download link did not return a PDF: {download_url}")
+        return {"path": path, "url": response.url, **cache_validators(response.headers),
+                "listing_snapshot": listing_snapshot(listing.text, listing.headers),
+                "document_links": find_document_links(listing.text, listing.url)
+                                  + find_document_links(result.text, result.url)}
+
+
+# Sites whose lead form and download link work without a browser
+FAST_PATH_ADAPTERS = {
+    "www.levyretail.com": FormDownloadAdapter("www.levyretail.com",
+                                              download_link_text="to download the package directly")
+}
+
+
+def recipe_path(state_folder: str, website_group: str) -> str:
+    return os.path.join(state_folder, f"{website_group}.http_recipe.json")
+
+
+def load_recipe(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_recipe(recipe: Dict, path: str):
+    """Write a recipe atomically; every writer gets its own temp file (pool workers may learn the same site)"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, part_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".part")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(recipe, f, indent=2)
+        os.replace(part_path, path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
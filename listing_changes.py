@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Listing Changes
+Change detection for property listing pages, so refresh runs only redo work
+for listings that actually changed.
+
+Each successful visit stores a snapshot of the listing page: its ETag /
+Last-Modified headers and a hash of the normalised HTML (visible text plus
+link targets; scripts, styles, comments and cache-busting query strings are
+dropped so nonces and asset versions don't count as changes). A refresh run
+requests the page conditionally: 304 or an identical hash means unchanged.
+"""
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+import requests
+
+from http_client import cache_validators
+
+
+class ListingTextParser(HTMLParser):
+    """Visible text and link/image targets of a page, in document order"""
+
+    SKIPPED_TAGS = ("script", "style", "noscript", "template")
+
+    def __init__(self):
+        super().__init__()
+        self.tokens = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skipping += 1
+            return
+        for name, value in attrs:
+            if name in ("href", "src") and value:
+                self.tokens.append(value.split("?")[0])
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping and data.strip():
+            self.tokens.append(" ".join(data.split()))
+
+
+def listing_fingerprint(html: str) -> str:
+    """SHA-256 of the page's normalised content"""
+    parser = ListingTextParser()
+    parser.feed(html)
+    return hashlib.sha256("\n".join(parser.tokens).encode("utf-8")).hexdigest()
+
+
+def listing_snapshot(html: str, headers) -> Dict:
+    """What is stored per property to detect changes later"""
+    return {"hash": listing_fingerprint(html), **cache_validators(headers)}
+
+
+def check_listing_change(session: requests.Session, property_url: str, snapshot: Optional[Dict],
+                         timeout: float = 15) -> Dict:
+    """Conditional GET of a listing page; `changed` is True when there is no usable snapshot"""
+    headers = {}
+    if snapshot and snapshot.get("etag"):
+        headers["If-None-Match"] = snapshot["etag"]
+    if snapshot and snapshot.get("last_modified"):
+        headers["If-Modified-Since"] = snapshot["last_modified"]
+    try:
+        response = session.get(property_url, headers=headers, timeout=timeout)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        return {"changed": True, "snapshot": None, "error": str(e)}
+    if response.status_code == 304:
+        return {"changed": False, "snapshot": snapshot, "error": ""}
+    current = listing_snapshot(response.text, response.headers)
+    changed = not snapshot or snapshot.get("hash") != current["hash"]
+    return {"changed": changed, "snapshot": current, "error": ""}
+
+
+def check_listing_changes(session: requests.Session, listings: List[Dict], concurrency: int = 10) -> List[Dict]:
+    """Check many listings concurrently; `listings` hold a property_url and its stored snapshot each"""
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(
+            lambda listing: check_listing_change(session, listing["property_url"], listing["snapshot"]), listings))
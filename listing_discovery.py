@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Listing Discovery
+Incremental discovery of new property listings from each site's XML sitemap.
+
+The sites publish a sitemap index (WordPress /sitemap_index.xml) whose child
+sitemaps carry lastmod dates. Only child sitemaps and entries modified after
+the group's watermark - the newest sitemap lastmod already stored in
+marketing_checklist - are fetched and considered, so a routine discovery run
+downloads a handful of small XML files. Property URLs are recognised by a
+per-group path pattern and normalized (no query string, fragment or
+trailing slash, lowercase scheme and host) before they are deduplicated and
+matched against the table; new ones are inserted as PENDING rows by the agent
+(see MarketingPackageAgent.discover_listings).
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urlparse, urlunparse
+
+import requests
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+# Sitemap index and property URL pattern per website group
+DISCOVERY_SOURCES = {
+    "www.levyretail.com": {"sitemap": "https://www.levyretail.com/sitemap_index.xml",
+                           "pattern": r"/property/[^/]+/?$"},
+    "tag-industrial.com": {"sitemap": "https://tag-industrial.com/sitemap_index.xml",
+                           "pattern": r"/properties/[^/]+/?$"},
+    "netleaseadvisorygroup.com": {"sitemap": "https://netleaseadvisorygroup.com/sitemap_index.xml",
+                                  "pattern": r"/listings?/[^/]+/?$"}
+}
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """W3C datetime (or date) as naive UTC, matching the TIMESTAMP columns"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_sitemap(content: bytes):
+    """('index' or 'urlset', [(loc, lastmod)])"""
+    root = ET.fromstring(content)
+    kind = "index" if root.tag == f"{SITEMAP_NS}sitemapindex" else "urlset"
+    entries = []
+    for element in root:
+        loc = element.findtext(f"{SITEMAP_NS}loc")
+        if loc:
+            entries.append((loc.strip(), parse_lastmod(element.findtext(f"{SITEMAP_NS}lastmod"))))
+    return kind, entries
+
+
+def normalize_listing_url(url: str) -> str:
+    """Listing URL without query string, fragment or trailing slash, with lowercase scheme and host
+    (checklist_db.normalized_url_sql is the same key in SQL, case-insensitively)"""
+    parsed = urlparse(url.strip())
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path.rstrip("/"), "", "", ""))
+
+
+def property_name_from_url(url: str) -> str:
+    """Readable name from the listing slug, e.g. /property/oak-ridge-plaza/ -> Oak Ridge Plaza"""
+    slug = unquote(urlparse(url).path.rstrip("/").rsplit("/", 1)[-1])
+    return " ".join(word.capitalize() for word in re.split(r"[-_]+", slug) if word)
+
+
+def _modified_since(lastmod: Optional[datetime], since: Optional[datetime]) -> bool:
+    # Entries without a lastmod can't be ruled out
+    return since is None or lastmod is None or lastmod > since
+
+
+def fetch_sitemap(session: requests.Session, url: str, timeout: float = 30):
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return parse_sitemap(response.content)
+
+
+def discover_listings(session: requests.Session, sitemap_url: str, pattern: str, since: Optional[datetime] = None,
+                      concurrency: int = 4) -> List[Dict]:
+    """Property URLs in a sitemap (index) that were added or modified after `since`"""
+    kind, entries = fetch_sitemap(session, sitemap_url)
+    if kind == "index":
+        child_urls = [loc for loc, lastmod in entries if _modified_since(lastmod, since)]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            entries = [entry for _, child_entries in executor.map(lambda url: fetch_sitemap(session, url), child_urls)
+                       for entry in child_entries]
+
+    matcher = re.compile(pattern)
+    listings = {}
+    for loc, lastmod in entries:
+        if matcher.search(urlparse(loc).path) and _modified_since(lastmod, since):
+            url = normalize_listing_url(loc)
+            # The same listing can appear with and without a trailing slash or tracking parameters
+            known = listings.get(url)
+            if known is None or (lastmod and (known["lastmod"] is None or lastmod > known["lastmod"])):
+                listings[url] = {"url": url, "name": property_name_from_url(url), "lastmod": lastmod}
+    return list(listings.values())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Listing Preflight
+Cheap HTTP check of pending property URLs before any browser is launched.
+
+Each listing gets a HEAD request (GET when the site refuses HEAD) through the
+pooled HTTP client and is classified:
+- LIVE:        2xx on the listing itself, or a redirect to another listing page
+- GONE:        404 / 410
+- REDIRECTED:  redirected up to a parent, search or sold page (listing removed)
+- BLOCKED:     401 / 403 / 429 - bot protection, the browser may still get through
+- UNREACHABLE: 5xx or connection error - transient, left for the browser
+
+GONE and REDIRECTED listings are marked in marketing_checklist and never reach
+the browser queue.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from urllib.parse import urlparse
+
+import requests
+
+# Preflight classification -> download_status for listings that are not worth a browser run
+DEAD_LISTING_STATUSES = {"GONE": "LISTING_GONE", "REDIRECTED": "LISTING_REDIRECTED"}
+
+REMOVED_LISTING_MARKERS = ("sold", "search", "not-found", "404")
+
+
+def _normalize(url: str):
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host, parsed.path.rstrip("/").lower()
+
+
+def classify_response(property_url: str, status_code: int, final_url: str) -> str:
+    if status_code in (404, 410):
+        return "GONE"
+    if status_code in (401, 403, 429):
+        return "BLOCKED"
+    if status_code >= 500:
+        return "UNREACHABLE"
+
+    host, path = _normalize(property_url)
+    final_host, final_path = _normalize(final_url)
+    if (final_host, final_path) != (host, path):
+        # Scheme/www/trailing-slash changes normalise away; a move up the tree or to a search page is a removal
+        moved_up = final_host == host and path.startswith(final_path + "/")
+        if final_host != host or moved_up or any(marker in final_path for marker in REMOVED_LISTING_MARKERS):
+            return "REDIRECTED"
+    return "LIVE"
+
+
+def check_listing(session: requests.Session, property_url: str, timeout: float = 15) -> Dict:
+    """Classify one listing URL without downloading its page"""
+    try:
+        response = session.head(property_url, allow_redirects=True, timeout=timeout)
+        if response.status_code in (403, 405, 501):
+            # Some servers reject HEAD; a streamed GET only reads the headers
+            response = session.get(property_url, allow_redirects=True, stream=True, timeout=timeout)
+            response.close()
+    except requests.RequestException as e:
+        return {"classification": "UNREACHABLE", "status_code": None, "final_url": property_url, "error": str(e)}
+    return {
+        "classification": classify_response(property_url, response.status_code, response.url),
+        "status_code": response.status_code,
+        "final_url": response.url,
+        "error": ""
+    }
+
+
+def preflight_listings(session: requests.Session, property_urls: List[str], concurrency: int = 10,
+                       timeout: float = 15) -> Dict[str, Dict]:
+    """Check listings concurrently (bounded by `concurrency`); returns results by URL"""
+    urls = list(dict.fromkeys(property_urls))
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = executor.map(lambda url: check_listing(session, url, timeout), urls)
+        return dict(zip(urls, results))
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+OpenAI Rate-Limit Governor
+Shared requests-per-minute / tokens-per-minute budget for every LLM call.
+
+All agent processes on the machine (parallel workers, several /api/submit_job
+jobs) coordinate through a small JSON ledger guarded by a file lock (taken in a
+worker thread on the async paths, so contention never stalls the event loop). Calls
+for properties that are already in flight may use the whole budget, while
+the first call of a new property only gets the budget minus a reserve, so
+work that has already paid for browser time is never starved by new work.
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, List, Optional
+
+import openai
+from langchain_openai import ChatOpenAI
+
+from metrics import LLM_BUDGET_WAIT_SECONDS, LLM_TOKENS_TOTAL
+
+# Call priorities
+PRIORITY_IN_FLIGHT = 0
+PRIORITY_NEW = 1
+
+WINDOW_SECONDS = 60
+IMAGE_TOKEN_ESTIMATE = 1000
+LOW_DETAIL_IMAGE_TOKENS = 85  # Flat cost of a detail="low" image
+OUTPUT_TOKEN_ESTIMATE = 500
+
+
+class LLMBudgetGovernor:
+    def __init__(self, rpm: int = 500, tpm: int = 30000, state_file: str = None,
+                 new_work_reserve: float = 0.2):
+        """Budget shared across processes through `state_file`"""
+        self.rpm = rpm
+        self.tpm = tpm
+        self.new_work_reserve = new_work_reserve
+        self.state_file = state_file or os.path.join(tempfile.gettempdir(), "marketing_agent_openai_budget.json")
+        self.lock_file = self.state_file + ".lock"
+        self.total_wait_seconds = 0.0
+        self.total_calls = 0
+        self.total_prompt_tokens = 0
+        self.total_cached_tokens = 0
+
+    @contextmanager
+    def _locked_state(self):
+        """Load the shared ledger under an exclusive lock and write it back on exit
+        (blocks while another process holds the lock - async callers go through asyncio.to_thread)"""
+        with open(self.lock_file, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.state_file) as f:
+                        state = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    state = {}
+                state.setdefault("entries", [])
+                state.setdefault("blocked_until", 0)
+
+                # Drop entries that have left the sliding window
+                cutoff = time.time() - WINDOW_SECONDS
+                state["entries"] = [entry for entry in state["entries"] if entry["ts"] > cutoff]
+
+                yield state
+
+                tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+                with open(tmp_file, "w") as f:
+                    json.dump(state, f)
+                os.replace(tmp_file, self.state_file)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _try_reserve(self, estimated_tokens: int, priority: int):
+        """Reserve budget for one call; returns (reservation_id, 0) or (None, seconds_to_wait)"""
+        now = time.time()
+        share = 1.0 if priority == PRIORITY_IN_FLIGHT else 1.0 - self.new_work_reserve
+
+        with self._locked_state() as state:
+            if state["blocked_until"] > now:
+                return None, state["blocked_until"] - now
+
+            used_requests = len(state["entries"])
+            used_tokens = sum(entry["tokens"] for entry in state["entries"])
+            if used_requests + 1 <= self.rpm * share and used_tokens + estimated_tokens <= self.tpm * share:
+                reservation_id = uuid.uuid4().hex
+                state["entries"].append({"id": reservation_id, "ts": now, "tokens": estimated_tokens})
+                return reservation_id, 0.0
+
+            # Wait until the oldest entry leaves the window
+            oldest = min((entry["ts"] for entry in state["entries"]), default=now)
+            return None, max(oldest + WINDOW_SECONDS - now, 0.1)
+
+    async def acquire(self, estimated_tokens: int, priority: int = PRIORITY_NEW) -> str:
+        """Wait until the shared budget admits the call and return its reservation id"""
+        started = time.monotonic()
+        while True:
+            reservation_id, wait_seconds = await asyncio.to_thread(self._try_reserve, estimated_tokens, priority)
+            if reservation_id:
+                break
+            await asyncio.sleep(min(wait_seconds, 1.0))
+
+        waited = time.monotonic() - started
+        self.total_wait_seconds += waited
+        self.total_calls += 1
+        LLM_BUDGET_WAIT_SECONDS.inc(waited)
+        if waited > 1:
+            print(f"🚦 Waited {waited:.1f}s for OpenAI budget")
+        return reservation_id
+
+    def settle(self, reservation_id: str, actual_tokens: Optional[int]):
+        """Replace a reservation's estimate with the real token usage"""
+        if not actual_tokens:
+            return
+        LLM_TOKENS_TOTAL.inc(actual_tokens)
+        with self._locked_state() as state:
+            for entry in state["entries"]:
+                if entry["id"] == reservation_id:
+                    entry["tokens"] = actual_tokens
+                    break
+
+    def record_usage(self, token_usage: dict):
+        """Count prompt tokens and the share served from OpenAI's prompt cache"""
+        self.total_prompt_tokens += token_usage.get("prompt_tokens") or 0
+        self.total_cached_tokens += (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+
+    async def asettle(self, reservation_id: str, actual_tokens: Optional[int]):
+        """settle without blocking the event loop on the ledger lock"""
+        await asyncio.to_thread(self.settle, reservation_id, actual_tokens)
+
+    def penalize(self, seconds: float):
+        """Pause every process after the API returned 429"""
+        with self._locked_state() as state:
+            state["blocked_until"] = max(state["blocked_until"], time.time() + seconds)
+        print(f"🚦 OpenAI rate limit hit - pausing all LLM calls for {seconds:.0f}s")
+
+    async def apenalize(self, seconds: float):
+        """penalize without blocking the event loop on the ledger lock"""
+        await asyncio.to_thread(self.penalize, seconds)
+
+    def get_summary(self) -> str:
+        """One-line report for session summaries"""
+        summary = f"{self.total_calls} LLM calls, {self.total_wait_seconds:.1f}s waiting on OpenAI budget"
+        if self.total_prompt_tokens:
+            summary += (f", {self.total_prompt_tokens:,} prompt tokens "
+                        f"({self.total_cached_tokens / self.total_prompt_tokens * 100:.0f}% cached)")
+        return summary
+
+
+def estimate_tokens(messages: List[Any]) -> int:
+    """Rough prompt size: ~4 characters per token plus a flat cost per screenshot"""
+    tokens = OUTPUT_TOKEN_ESTIMATE
+    for message in messages:
+        content = message.content
+        if isinstance(content, str):
+            tokens += len(content) // 4
+            continue
+        for part in content:
+            if isinstance(part, dict) and part.get("type") == "image_url":
+                low_detail = part.get("image_url", {}).get("detail") == "low"
+                tokens += LOW_DETAIL_IMAGE_TOKENS if low_detail else IMAGE_TOKEN_ESTIMATE
+            else:
+                tokens += len(str(part.get("text", "") if isinstance(part, dict) else part)) // 4
+    return tokens
+
+
+class GovernedChatOpenAI(ChatOpenAI):
+    """ChatOpenAI that routes every completion through an LLMBudgetGovernor"""
+
+    governor: Any = None
+    phase_callback: Any = None  # Optional callable(phase, seconds) for per-step timings
+    tracer: Any = None  # Optional tracing.Tracer; each completion becomes an llm_call span
+    vision_policy: Any = None  # Optional vision_policy.VisionPolicy deciding which screenshots are sent
+    llm_calls: int = 0
+    rate_limit_retries: int = 3
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.vision_policy:
+            messages = self.vision_policy.apply(messages)
+
+        # The first call of a property is new work, later calls are in flight
+        priority = PRIORITY_IN_FLIGHT if self.llm_calls > 0 else PRIORITY_NEW
+        self.llm_calls += 1
+
+        for attempt in range(self.rate_limit_retries + 1):
+            reservation_id = await self.governor.acquire(estimate_tokens(messages), priority)
+            started = time.perf_counter()
+            try:
+                if self.tracer:
+                    with self.tracer.span("llm_call", model=self.model_name, attempt=attempt + 1) as span:
+                        result = await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+                        token_usage = (result.llm_output or {}).get("token_usage") or {}
+                        span.set_attribute("total_tokens", token_usage.get("total_tokens", 0))
+                else:
+                    result = await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except openai.RateLimitError:
+                if attempt == self.rate_limit_retries:
+                    raise
+                await self.governor.apenalize(10 * (attempt + 1))
+                priority = PRIORITY_IN_FLIGHT
+                continue
+
+            if self.phase_callback:
+                self.phase_callback("llm_step", time.perf_counter() - started)
+            token_usage = (result.llm_output or {}).get("token_usage") or {}
+            await self.governor.asettle(reservation_id, token_usage.get("total_tokens"))
+            self.governor.record_usage(token_usage)
+            return result
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Marketing Documents
+Every marketing document a property offers, not just its main package.
+
+Listings often link separate offering memorandums, flyers, site plans and rent
+rolls next to (or behind the same lead form as) the package the agent
+downloads. Links are collected from the listing page and the pages the lead
+form returns, downloaded concurrently through the pooled HTTP client with the
+browser's cookies for the site, and recorded per property (name, URL, size,
+SHA-256) in the marketing_files table.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urljoin, urlparse
+
+import requests
+
+from http_client import download_file
+
+DOCUMENT_EXTENSIONS = (".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".zip")
+
+# Type recorded for the package the site's lead form delivers
+PRIMARY_DOCUMENT_TYPE = "marketing_package"
+
+# Checked in order against the link text and file name; the first match wins
+DOCUMENT_TYPES = (
+    ("offering_memorandum", r"offering[\s_-]*memorandum|\bom\b|marketing[\s_-]*package"),
+    ("rent_roll", r"rent[\s_-]*roll"),
+    ("site_plan", r"site[\s_-]*plan|floor[\s_-]*plan"),
+    ("flyer", r"flyer|brochure|one[\s_-]*pager"),
+    ("aerial", r"aerial"),
+    ("demographics", r"demographic"),
+)
+DOCUMENT_KEYWORDS = re.compile("|".join(pattern for _, pattern in DOCUMENT_TYPES), re.IGNORECASE)
+
+
+class DocumentLinkParser(HTMLParser):
+    """Link targets of a page with their anchor text"""
+
+    def __init__(self):
+        super().__init__()
+        self.links = []
+        self._current = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            attributes = dict(attrs)
+            self._current = {"href": attributes.get("href") or "", "text": attributes.get("title") or ""}
+            self.links.append(self._current)
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self._current = None
+
+    def handle_data(self, data):
+        if self._current is not None:
+            self._current["text"] = " ".join(f"{self._current['text']} {data}".split())
+
+
+def classify_document(url: str, text: str = "") -> str:
+    name = unquote(urlparse(url).path.rsplit("/", 1)[-1])
+    for document_type, pattern in DOCUMENT_TYPES:
+        if re.search(pattern, f"{text} {name}", re.IGNORECASE):
+            return document_type
+    return "document"
+
+
+def find_document_links(html: str, base_url: str) -> List[Dict]:
+    """Document links on a page: document file extensions, or marketing keywords in the link text
+    (those may turn out to be HTML pages and are dropped when downloaded)"""
+    parser = DocumentLinkParser()
+    parser.feed(html)
+    documents = {}
+    for link in parser.links:
+        url = urljoin(base_url, link["href"]).split("#")[0]
+        if not url.startswith("http") or url.rstrip("/") == base_url.split("#")[0].rstrip("/"):
+            continue
+        path = urlparse(url).path.lower()
+        if path.endswith(DOCUMENT_EXTENSIONS) or DOCUMENT_KEYWORDS.search(link["text"]):
+            documents.setdefault(url, {"url": url, "document_type": classify_document(url, link["text"])})
+    return list(documents.values())
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_record(path: str, url: Optional[str], document_type: str) -> Dict:
+    """Row for the marketing_files table"""
+    return {"file_name": os.path.basename(path), "file_url": url, "file_size": os.path.getsize(path),
+            "sha256": file_sha256(path), "document_type": document_type, "path": path}
+
+
+def cookie_jar(browser_cookies: List[Dict]) -> requests.cookies.RequestsCookieJar:
+    """Playwright context cookies as a jar, so gated links download with the browser's session
+    (the jar keeps each cookie to its own domain)"""
+    jar = requests.cookies.RequestsCookieJar()
+    for cookie in browser_cookies or []:
+        jar.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+    return jar
+
+
+def download_document(session: requests.Session, document: Dict, target_dir: str, timeout: float = 60,
+                      cookies: requests.cookies.RequestsCookieJar = None) -> Dict:
+    """Download one document link into its own directory under target_dir (so equal file names
+    never collide); HTML responses mean the link was not a document"""
+    document_dir = os.path.join(target_dir, uuid.uuid4().hex[:8])
+    os.makedirs(document_dir, exist_ok=True)
+    try:
+        path, response = download_file(session, document["url"], document_dir, timeout=timeout,
+                                       cookies=cookies)
+    except requests.RequestException as e:
+        shutil.rmtree(document_dir, ignore_errors=True)
+        return {**document, "error": str(e)}
+    if "text/html" in response.headers.get("content-type", "") or os.path.getsize(path) == 0:
+        shutil.rmtree(document_dir, ignore_errors=True)
+        return {**document, "error": "not a document"}
+    return {**document, **file_record(path, response.url, document["document_type"]), "error": ""}
+
+
+def download_documents(session: requests.Session, documents: List[Dict], target_dir: str, concurrency: int = 4,
+                       cookies: requests.cookies.RequestsCookieJar = None) -> List[Dict]:
+    """Download many document links concurrently (bounded by `concurrency`)"""
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(lambda document: download_document(session, document, target_dir, cookies=cookies),
+                                 documents))
@@ -11,18 +11,35 @@ Features:
 - Handles different website procedures
 - Uses fresh browser instances to avoid context issues
 - Supports selective processing by website group (LR, TI, etc.)
+- Re-queues failed properties with exponential backoff and pauses failing website groups
+- Adaptive per-host rate limiting instead of a fixed delay between properties
+- Shared OpenAI RPM/TPM budget across workers and processes
+- Prometheus phase timings (exported through the web interface's /metrics endpoint)
+- Trace spans per property, DB, LLM and download call (continuing the dashboard job's trace)
+- Long-running daemon mode woken by Postgres LISTEN/NOTIFY, with a warm DB pool and browsers
+- Optional process pool running one property per worker, recycled after N properties
+- Pipelined prefetch of the next property's browser and page while the current one runs
+- Captures every marketing document linked on the listing and form result pages, not just the main package
 """
 
 import asyncio
 import csv
+import functools
+import json
+import multiprocessing
 import os
+import signal
 import shutil
 import argparse
-import re
 import requests
-import subprocess
+import time
 import psycopg2
-from datetime import datetime
+import psycopg2.extensions
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
@@ -34,14 +51,72 @@ from browser_use.browser.browser import Browser, BrowserConfig
 from browser_use.browser.context import BrowserContext
 from langchain_openai import ChatOpenAI
 
+import metrics
+from agent_actions import ReportingController
+from browser_downloads import (StagingBrowserContext, create_staging_dir, is_valid_pdf, promote_staged_pdf,
+                               remove_staging_dir)
+from browser_engines import engine_config
+from browser_state import load_storage_state, save_storage_state, storage_state_path
+from http_client import create_http_session, download_file
+from http_fast_path import FAST_PATH_ADAPTERS, FastPathMismatch, load_recipe, recipe_path, save_recipe
+from listing_changes import check_listing_changes
+from listing_discovery import DISCOVERY_SOURCES, discover_listings
+from listing_preflight import DEAD_LISTING_STATUSES, preflight_listings
+from marketing_documents import (PRIMARY_DOCUMENT_TYPE, classify_document, cookie_jar, download_documents,
+                                 file_record)
+from checklist_db import (AsyncChecklistDB, build_discovery_watermark_query, build_listing_checked_query,
+                          build_next_property_query, build_preflight_query, build_record_files_query,
+                          build_refresh_query, build_requeue_query, build_shard_progress_query, build_update_query,
+                          build_upsert_listings_statements, row_to_property)
+from create_supabase_table import COMMAND_CHANNEL, CREATE_NOTIFY_TRIGGER_SQL, PENDING_CHANNEL, apply_migrations
+from llm_governor import GovernedChatOpenAI, LLMBudgetGovernor
+from prompt_templates import PROMPT_VARIANTS, build_task
+from rate_limiter import HostRateLimiter
+from refresh import refresh_cached_pdfs
+from retry_scheduler import CircuitBreaker, RetryPolicy
+from tracing import Tracer
+from vision_policy import VisionPolicy
+
+tracer = Tracer("marketing-agent")
+
+def timed_phase(phase: str):
+    """Decorator recording a method's duration under a phase name (sync or async)"""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                with self._phase(phase, span_name=func.__name__):
+                    return await func(self, *args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self._phase(phase, span_name=func.__name__):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
 class MarketingPackageAgent:
-    def __init__(self, checklist_file: str = None, headless: bool = False):
-        """Initialize the marketing package download agent"""
+    def __init__(self, checklist_file: str = None, headless: bool = False, shard: Tuple[int, int] = None,
+                 workers: int = 1, pipeline: bool = False, setup_database: bool = True):
+        """Initialize the marketing package download agent (shard=(index, count) serves one slice of the table;
+        pool workers pass setup_database=False since the parent already checked and migrated the schema)"""
         self.checklist_file = checklist_file  # Keep for backward compatibility but not used
         self.download_folder = "marketing_packages"
         self.timeout_seconds = 300  # 5 minutes per property
-        self.request_delay = 2  # 2 seconds between properties to avoid rate limits
+        self.request_delay = 2  # Initial seconds between properties per host (adapts at runtime)
         self.headless = headless  # Browser headless mode
+        self.phase_timings = defaultdict(list)  # Phase name -> durations in seconds
+        self.vision_stats = defaultdict(int)  # Screenshot counters summed over properties
+        self.fast_path_stats = defaultdict(int)  # HTTP fast path hits and browser fallbacks
+        self.reuse_browsers = False  # Daemon mode keeps one warm browser per website group
+        self.browser_pool = {}
+        self.shutdown_requested = False
+        self.shard_index, self.shard_count = shard or (1, 1)  # 1-based shard served by this machine
+        self.workers = workers  # >1 runs properties in a process pool
+        self.worker_pool = None
+        self.pipeline = pipeline  # Prefetch the next property while the current one runs (in-process mode)
+        self.deferred_updates = None  # Pool workers collect DB updates and outcomes here for the parent
         
         # Website group codes for selective processing
         self.website_group_codes = {
@@ -54,7 +129,8 @@ class MarketingPackageAgent:
         load_dotenv("marketing_agent.env")
         self._load_config()
         self._setup_directories()
-        self._setup_database()
+        if setup_database:
+            self._setup_database()
         
     def _load_config(self):
         """Load configuration from environment variables"""
@@ -64,6 +140,9 @@ class MarketingPackageAgent:
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY not found in marketing_agent.env")
             
+        # Optional OpenAI-compatible endpoint (e.g. the benchmark record/replay server)
+        self.openai_base_url = os.getenv('OPENAI_BASE_URL') or None
+            
         # Database Configuration
         self.database_url = os.getenv('DATABASE_URL')
         if not self.database_url:
@@ -93,6 +172,98 @@ class MarketingPackageAgent:
             }
         }
         
+        # Playwright engine per website group (BROWSER_ENGINE_LR / _TI / _NLAG)
+        default_engines = {"LR": "webkit", "TI": "chromium", "NLAG": "chromium"}
+        self.browser_engines = {
+            group: os.getenv(f'BROWSER_ENGINE_{code}', default_engines[code]).lower()
+            for code, group in self.website_group_codes.items()
+        }
+        
+        # Screenshot policy per website group (VISION_MODE_LR / _TI / _NLAG: dom, low or full)
+        self.vision_modes = {
+            group: os.getenv(f'VISION_MODE_{code}', 'dom').lower()
+            for code, group in self.website_group_codes.items()
+        }
+        
+        # Task prompt variant (full or compact), see prompt_templates.py
+        self.prompt_variant = os.getenv('PROMPT_VARIANT', 'full').lower()
+        if self.prompt_variant not in PROMPT_VARIANTS:
+            raise ValueError(f"PROMPT_VARIANT must be one of {', '.join(PROMPT_VARIANTS)}")
+        
+        # Saved cookies/localStorage per website group, loaded into later contexts so
+        # sites that remember a submitted lead form go straight to the download
+        self.persist_browser_state = os.getenv('PERSIST_BROWSER_STATE', 'true').lower() == 'true'
+        self.browser_state_folder = os.getenv('BROWSER_STATE_FOLDER', 'browser_state')
+        
+        # Browser-free downloads for sites with a learned HTTP recipe (see http_fast_path.py)
+        self.http_fast_path = os.getenv('HTTP_FAST_PATH', 'true').lower() == 'true'
+        self.http_pool_size = int(os.getenv('HTTP_POOL_SIZE', 10))
+        
+        # --pipeline: a prefetched listing left open longer than this is reloaded before its agent starts
+        self.prefetch_max_age = float(os.getenv('PREFETCH_MAX_AGE_SECONDS', 120))
+        
+        # Download every document linked on the listing / form result pages alongside the main package
+        self.capture_documents = os.getenv('CAPTURE_DOCUMENTS', 'true').lower() == 'true'
+        self.document_concurrency = int(os.getenv('DOCUMENT_CONCURRENCY', 4))
+        
+        # HEAD/GET every pending listing before the browser queue; dead ones are marked and skipped
+        self.preflight = os.getenv('PREFLIGHT', 'true').lower() == 'true'
+        self.preflight_concurrency = int(os.getenv('PREFLIGHT_CONCURRENCY', 10))
+        self.preflight_recheck_hours = float(os.getenv('PREFLIGHT_RECHECK_HOURS', 24))
+        
+        # Sitemap index per website group for --discover (DISCOVERY_SITEMAP_LR / _TI / _NLAG)
+        self.discovery_sitemaps = {
+            group: os.getenv(f'DISCOVERY_SITEMAP_{code}', DISCOVERY_SOURCES[group]['sitemap'])
+            for code, group in self.website_group_codes.items()
+        }
+        self.discovery_concurrency = int(os.getenv('DISCOVERY_CONCURRENCY', 4))
+        
+        # Concurrent conditional GETs of cached PDF URLs in refresh runs (--refresh)
+        self.refresh_concurrency = int(os.getenv('REFRESH_CONCURRENCY', 10))
+        
+        # Retry and circuit breaker settings
+        self.retry_policy = RetryPolicy(
+            max_attempts=int(os.getenv('MAX_RETRIES', 3)),
+            base_delay_seconds=int(os.getenv('RETRY_BASE_DELAY_SECONDS', 300)),
+            max_delay_seconds=int(os.getenv('RETRY_MAX_DELAY_SECONDS', 6 * 3600))
+        )
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv('CIRCUIT_BREAKER_THRESHOLD', 3)),
+            cooldown_seconds=int(os.getenv('CIRCUIT_BREAKER_COOLDOWN_SECONDS', 900))
+        )
+        
+        # Adaptive per-host rate limiter shared by all workers in this process
+        self.request_delay = float(os.getenv('REQUEST_DELAY_SECONDS', self.request_delay))
+        self.rate_limiter = HostRateLimiter(
+            initial_rate=1 / self.request_delay,
+            min_rate=float(os.getenv('HOST_RATE_MIN_RPS', 0.02)),
+            max_rate=float(os.getenv('HOST_RATE_MAX_RPS', 2.0)),
+            slow_response_seconds=float(os.getenv('HOST_SLOW_RESPONSE_SECONDS', 15))
+        )
+        
+        # Browser-free requests (preflight, discovery, refresh, fast path, documents) to a listing host
+        # take that host's token too and feed their statuses and response times back
+        self.http_session = create_http_session(
+            pool_size=self.http_pool_size,
+            rate_limiter=self.rate_limiter,
+            hosts=self.website_group_codes.values(),
+            on_response=lambda host, status, elapsed: self.record_host_responses(host, [(status, elapsed)])
+        )
+        
+        # OpenAI budget shared with every other agent process on this machine
+        self.llm_governor = LLMBudgetGovernor(
+            rpm=int(os.getenv('OPENAI_RPM_LIMIT', 500)),
+            tpm=int(os.getenv('OPENAI_TPM_LIMIT', 30000)),
+            state_file=os.getenv('OPENAI_BUDGET_STATE_FILE'),
+            new_work_reserve=float(os.getenv('OPENAI_NEW_WORK_RESERVE', 0.2))
+        )
+        
+        # Non-blocking database access for the session loop (psycopg 3 pool)
+        self.async_db = AsyncChecklistDB(self.database_url, max_size=int(os.getenv('DB_POOL_SIZE', 5)))
+        
+        # Pool workers are replaced after this many properties to contain browser/driver leaks
+        self.worker_max_tasks = int(os.getenv('WORKER_MAX_TASKS', 10))
+        
     def _setup_database(self):
         """Setup database connection and verify table exists"""
         try:
@@ -111,6 +282,11 @@ class MarketingPackageAgent:
             table_exists = cursor.fetchone()[0]
             if not table_exists:
                 raise ValueError("marketing_checklist table not found in database. Please run create_supabase_table.py first.")
+            
+            # Columns and tables added after the first release (only ALTERs when something is missing)
+            for added in apply_migrations(cursor):
+                print(f"🧱 Migrated schema: added {added}")
+            conn.commit()
                 
             cursor.close()
             conn.close()
@@ -119,6 +295,61 @@ class MarketingPackageAgent:
         except Exception as e:
             raise ValueError(f"Database connection failed: {e}")
         
+    @contextmanager
+    def _phase(self, phase: str, span_name: str = None):
+        """Time a block of work under a phase name and trace it as a span"""
+        started = time.perf_counter()
+        try:
+            with tracer.span(span_name or phase, phase=phase) as span:
+                yield span
+        finally:
+            self.record_phase(phase, time.perf_counter() - started)
+    
+    def record_phase(self, phase: str, seconds: float):
+        """Record one phase duration for the benchmark report and Prometheus"""
+        self.phase_timings[phase].append(seconds)
+        metrics.observe_phase(phase, seconds)
+    
+    def record_vision_stats(self, vision_policy: Optional[VisionPolicy]):
+        """Add one property's screenshot counters to the session totals"""
+        if vision_policy is None:
+            return
+        self.vision_stats['images_dropped'] += vision_policy.images_dropped
+        self.vision_stats['images_low_detail'] += vision_policy.images_low_detail
+        self.vision_stats['images_full'] += vision_policy.images_full
+        self.vision_stats['image_tokens_saved'] += vision_policy.estimated_tokens_saved
+    
+    # browser-use actions grouped into the phases we report
+    ACTION_PHASES = {
+        "go_to_url": "page_navigation",
+        "open_tab": "page_navigation",
+        "switch_tab": "page_navigation",
+        "go_back": "page_navigation",
+        "scroll_down": "page_navigation",
+        "scroll_up": "page_navigation",
+        "scroll_to_text": "page_navigation",
+        "input_text": "form_fill",
+        "click_element": "form_fill",
+        "select_dropdown_option": "form_fill",
+        "get_dropdown_options": "form_fill",
+        "send_keys": "form_fill",
+    }
+    
+    def record_history_phases(self, history):
+        """Derive page navigation / form fill timings from the agent's step history"""
+        for item in getattr(history, 'history', None) or []:
+            metadata = getattr(item, 'metadata', None)
+            model_output = getattr(item, 'model_output', None)
+            if not metadata or not model_output:
+                continue
+            step_seconds = metadata.step_end_time - metadata.step_start_time
+            for action in model_output.action:
+                action_names = action.model_dump(exclude_unset=True).keys()
+                phase = next((self.ACTION_PHASES[name] for name in action_names if name in self.ACTION_PHASES), None)
+                if phase:
+                    # Steps with several actions split their time evenly
+                    self.record_phase(phase, step_seconds / len(model_output.action))
+        
     def _setup_directories(self):
         """Create necessary directories including subfolders for each website group"""
         os.makedirs(self.download_folder, exist_ok=True)
@@ -138,100 +369,248 @@ class MarketingPackageAgent:
         for subfolder in subfolders.values():
             print(f"   📁 {subfolder}/")
         
-    def get_next_property(self, website_group_filter: str = None) -> Optional[Dict]:
-        """Get the next property to process from the database"""
-        
+    @timed_phase("db_round_trip")
+    async def aget_next_property(self, website_group_filter: str = None, exclude_groups: List[str] = None,
+                                 exclude_ids: List[int] = None) -> Optional[Dict]:
+        """Next property to process (new rows or failed rows due for retry), without blocking the event loop"""
         try:
-            conn = psycopg2.connect(self.database_url)
-            cursor = conn.cursor()
-            
-            # Build query with optional website group filter
-            base_query = """
-                SELECT website_group, property_number, property_name, property_url 
-                FROM marketing_checklist 
-                WHERE UPPER(visited) = 'NO' AND UPPER(download_status) = 'PENDING'
-            """
-            
-            if website_group_filter:
-                query = base_query + " AND website_group = %s ORDER BY property_number LIMIT 1"
-                cursor.execute(query, (website_group_filter,))
-            else:
-                query = base_query + " ORDER BY property_number LIMIT 1"
-                cursor.execute(query)
-            
-            result = cursor.fetchone()
-            cursor.close()
-            conn.close()
-            
-            if result:
-                return {
-                    'website_group': result[0],
-                    'property_number': result[1],
-                    'property_name': result[2],
-                    'property_url': result[3]
-                }
-            else:
-                return None
-                
+            query, params = build_next_property_query(
+                self.retry_policy.max_attempts, website_group_filter, exclude_groups, exclude_ids,
+                shard=(self.shard_index, self.shard_count)
+            )
+            return row_to_property(await self.async_db.fetch_one(query, params))
         except Exception as e:
             print(f"Error reading from database: {e}")
             return None
             
-    def update_checklist(self, property_info: Dict, visited: bool = False, downloaded: bool = False, 
-                        marketing_files: str = "", status: str = "", notes: str = "", error: str = ""):
-        """Update the database with processing results"""
+    async def preflight_pending(self, website_group_filter: str = None) -> Dict[str, int]:
+        """HTTP-check pending listings concurrently and mark gone/redirected ones so no browser is launched for them"""
+        with self._phase("preflight"):
+            try:
+                query, params = build_preflight_query(
+                    self.retry_policy.max_attempts,
+                    checked_before=datetime.now() - timedelta(hours=self.preflight_recheck_hours),
+                    website_group_filter=website_group_filter, shard=(self.shard_index, self.shard_count)
+                )
+                properties = [row_to_property(row) for row in await self.async_db.fetch_all(query, params)]
+            except Exception as e:
+                print(f"Error reading listings for preflight: {e}")
+                return {}
+            if not properties:
+                return {}
+                
+            print(f"🩺 Preflight: checking {len(properties)} listings ({self.preflight_concurrency} at a time)...")
+            results = await asyncio.to_thread(preflight_listings, self.http_session,
+                                              [info['property_url'] for info in properties],
+                                              concurrency=self.preflight_concurrency)
+            counts = Counter()
+            checked_ids = []
+            checked_at = datetime.now()
+            for property_info in properties:
+                result = results[property_info['property_url']]
+                counts[result['classification']] += 1
+                if result['classification'] in DEAD_LISTING_STATUSES:
+                    detail = (f"HTTP {result['status_code']}" if result['final_url'] == property_info['property_url']
+                              else f"HTTP {result['status_code']}, redirected to {result['final_url']}")
+                    query, values = build_update_query(
+                        property_info, status=DEAD_LISTING_STATUSES[result['classification']],
+                        notes=f"Listing preflight: {result['classification'].lower()} ({detail})",
+                        listing_checked_at=checked_at
+                    )
+                    await self.async_db.execute(query, values)
+                elif result['classification'] in ("LIVE", "BLOCKED"):
+                    # Unreachable listings are checked again next session
+                    checked_ids.append(property_info['id'])
+            if checked_ids:
+                query, values = build_listing_checked_query(checked_ids)
+                await self.async_db.execute(query, values)
+                
+        print(f"🩺 Preflight: {', '.join(f'{count} {name.lower()}' for name, count in sorted(counts.items()))}")
+        return dict(counts)
         
+    async def discover_new_listings(self, website_group_filter: str = None) -> Dict[str, int]:
+        """Add listings that are new in the website groups' sitemaps; groups are crawled concurrently"""
+        groups = [website_group_filter] if website_group_filter else list(self.discovery_sitemaps)
+        with self._phase("discovery"):
+            inserted = await asyncio.gather(*(self._discover_group(group) for group in groups))
+        return dict(zip(groups, inserted))
+        
+    async def _discover_group(self, website_group: str) -> int:
+        """Crawl one group's sitemap entries modified since its watermark and upsert them"""
         try:
-            conn = psycopg2.connect(self.database_url)
-            cursor = conn.cursor()
-            
-            # Build dynamic update query
-            update_fields = []
-            values = []
-            
-            if visited:
-                update_fields.append("visited = %s")
-                values.append('YES')
-            if downloaded:
-                update_fields.append("downloaded = %s")
-                values.append('YES')
-            if marketing_files:
-                update_fields.append("marketing_files_found = %s")
-                values.append(str(marketing_files))
-            if status:
-                update_fields.append("download_status = %s")
-                values.append(str(status))
-            if notes:
-                update_fields.append("notes = %s")
-                values.append(str(notes))
-            if error:
-                update_fields.append("error_message = %s")
-                values.append(str(error))
+            query, params = build_discovery_watermark_query(website_group)
+            since = (await self.async_db.fetch_one(query, params))[0]
+            listings = await asyncio.to_thread(discover_listings, self.http_session,
+                                               self.discovery_sitemaps[website_group],
+                                               DISCOVERY_SOURCES[website_group]['pattern'], since,
+                                               concurrency=self.discovery_concurrency)
+            if not listings:
+                print(f"🗺️  {website_group}: no sitemap changes since {since or 'the last crawl'}")
+                return 0
+            _, inserted, updated = await self.async_db.execute_transaction(
+                build_upsert_listings_statements(website_group, listings))
+        except Exception as e:
+            print(f"⚠️  Listing discovery failed for {website_group}: {e}")
+            return 0
+        print(f"🗺️  {website_group}: {len(listings)} changed sitemap entries since {since or 'the beginning'}, "
+              f"{inserted} new listings queued, {updated} existing listings updated")
+        return inserted
+        
+    async def refresh_downloads(self, website_group_filter: str = None) -> Dict[str, int]:
+        """Re-crawl downloaded properties: unchanged listing pages are skipped, changed ones are
+        re-fetched from their cached PDF URL (conditional GET) and go back to the browser agent
+        only when there is no usable cached URL"""
+        with self._phase("refresh"):
+            try:
+                query, params = build_refresh_query(website_group_filter, shard=(self.shard_index, self.shard_count))
+                rows = await self.async_db.fetch_all(query, params)
+            except Exception as e:
+                print(f"Error reading downloaded properties for refresh: {e}")
+                return {}
                 
-            # Always update timestamp and updated_at
-            update_fields.append("last_attempt = %s")
-            update_fields.append("updated_at = %s")
-            values.extend([datetime.now(), datetime.now()])
+            listings = []
+            for row in rows:
+                pdf_url, pdf_etag, pdf_last_modified, page_hash, page_etag, page_last_modified = row[6:12]
+                listings.append({
+                    'property_info': row_to_property(row),
+                    'source': {'url': pdf_url, 'etag': pdf_etag, 'last_modified': pdf_last_modified} if pdf_url else None,
+                    'snapshot': {'hash': page_hash, 'etag': page_etag, 'last_modified': page_last_modified} if page_hash else None
+                })
+            print(f"🔄 Refresh: checking {len(listings)} listing pages for changes...")
             
-            # Add WHERE clause values
-            values.extend([property_info['website_group'], property_info['property_name']])
+            # Conditional GET of every listing page; only changed pages are worth more work
+            page_results = await asyncio.to_thread(
+                check_listing_changes, self.http_session,
+                [{'property_url': listing['property_info']['property_url'], 'snapshot': listing['snapshot']}
+                 for listing in listings],
+                concurrency=self.refresh_concurrency
+            )
+            counts = Counter()
+            jobs = []
+            requeue_ids = []
+            for listing, page in zip(listings, page_results):
+                if not page['changed']:
+                    counts['PAGE_UNCHANGED'] += 1
+                    continue
+                listing['new_snapshot'] = page['snapshot']
+                if not listing['source']:
+                    requeue_ids.append(listing['property_info']['id'])
+                    continue
+                listing['staging_dir'] = create_staging_dir(self.download_folder,
+                                                            f"property_{listing['property_info']['id']}_refresh")
+                jobs.append(listing)
+            print(f"🔄 Refresh: {counts['PAGE_UNCHANGED']} listings unchanged, {len(jobs)} changed listings have "
+                  f"a cached PDF URL, {len(requeue_ids)} go to the browser agent")
             
-            query = f"""
-                UPDATE marketing_checklist 
-                SET {', '.join(update_fields)}
-                WHERE website_group = %s AND property_name = %s
-            """
+            results = await asyncio.to_thread(refresh_cached_pdfs, self.http_session, jobs,
+                                              concurrency=self.refresh_concurrency)
+            for job, result in zip(jobs, results):
+                property_info = job['property_info']
+                counts[result['result']] += 1
+                if result['result'] == 'UPDATED':
+                    final_path = promote_staged_pdf(job['staging_dir'], self.get_download_filename(property_info))
+                    print(f"🔄 Updated: {property_info['property_name']} -> {final_path}")
+                    await self.arecord_files(property_info, [file_record(final_path, result['source']['url'],
+                                                                         PRIMARY_DOCUMENT_TYPE)])
+                    await self.aupdate_checklist(property_info, downloaded=True, pdf_source=result['source'],
+                                                 page_snapshot=job['new_snapshot'],
+                                                 notes="Refreshed from cached PDF URL (new version)")
+                elif result['result'] == 'UNCHANGED':
+                    await self.aupdate_checklist(property_info, page_snapshot=job['new_snapshot'],
+                                                 notes="Refreshed from cached PDF URL (unchanged)")
+                else:
+                    print(f"↩️  Cached PDF URL failed for {property_info['property_name']}: {result['error']}")
+                    requeue_ids.append(property_info['id'])
+                remove_staging_dir(job['staging_dir'])
+                
+            # The new page snapshot is stored when the agent succeeds, so a failed retry is picked up next refresh
+            if requeue_ids:
+                query, values = build_requeue_query(requeue_ids, notes="Queued for the browser agent by a refresh run")
+                await self.async_db.execute(query, values)
+            counts['REQUEUED'] = len(requeue_ids)
             
-            cursor.execute(query, values)
-            conn.commit()
-            cursor.close()
-            conn.close()
+        print(f"🔄 Refresh: {counts['PAGE_UNCHANGED']} listings unchanged, {counts['UNCHANGED']} PDFs unchanged, "
+              f"{counts['UPDATED']} updated, {counts['REQUEUED']} queued for the browser agent")
+        return dict(counts)
+        
+    @timed_phase("db_round_trip")
+    async def get_shard_progress(self, website_group_filter: str = None) -> Dict[str, int]:
+        """Count this shard's rows by download status"""
+        try:
+            query, params = build_shard_progress_query(website_group_filter, shard=(self.shard_index, self.shard_count))
+            rows = await self.async_db.fetch_all(query, params)
+            return {status or 'UNKNOWN': count for status, count in rows}
+        except Exception as e:
+            print(f"Error reading shard progress: {e}")
+            return {}
             
+    async def aupdate_checklist(self, property_info: Dict, visited: bool = False, downloaded: bool = False,
+                                marketing_files: str = "", status: str = "", notes: str = "", error: str = "",
+                                attempt_count: Optional[int] = None, next_attempt_at: Optional[datetime] = None,
+                                pdf_source: Optional[Dict] = None, page_snapshot: Optional[Dict] = None):
+        """Write a property's processing results to the database without blocking the event loop"""
+        fields = dict(visited=visited, downloaded=downloaded, marketing_files=marketing_files, status=status,
+                      notes=notes, error=error, attempt_count=attempt_count, next_attempt_at=next_attempt_at,
+                      pdf_source=pdf_source, page_snapshot=page_snapshot)
+        
+        # Pool workers hand their updates to the parent process instead of writing them
+        if self.deferred_updates is not None:
+            self.deferred_updates.append(('update', dict(property_info=property_info, **fields)))
+            return
+        
+        try:
+            query, values = build_update_query(property_info, **fields)
+            # Timed only here: deferred updates never reach the database in this process
+            with self._phase("db_round_trip", span_name="aupdate_checklist"):
+                await self.async_db.execute(query, values)
             print(f"📝 Updated database for {property_info['property_name']}")
-            
         except Exception as e:
             print(f"Error updating database: {e}")
             
+    def record_success(self, property_info: Dict):
+        """Feed a successful attempt to the circuit breaker and metrics"""
+        self.record_outcome(property_info, "SUCCESS")
+        
+    async def record_failure(self, property_info: Dict, status: str, error: str = "", notes: str = ""):
+        """Record a failed attempt, schedule a retry with backoff and feed the circuit breaker and metrics"""
+        attempt_count = property_info.get('attempt_count', 0) + 1
+        next_attempt_at = self.retry_policy.get_next_attempt_at(attempt_count, status)
+        
+        if next_attempt_at:
+            print(f"🔁 Attempt {attempt_count}/{self.retry_policy.max_attempts} failed - "
+                  f"retry scheduled for {next_attempt_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        elif self.retry_policy.is_retryable(status):
+            print(f"🛑 Giving up after {attempt_count} attempts")
+        
+        await self.aupdate_checklist(property_info, status=status, error=error, notes=notes,
+                                     attempt_count=attempt_count, next_attempt_at=next_attempt_at)
+        self.record_outcome(property_info, status)
+        
+    def record_outcome(self, property_info: Dict, status: str):
+        """Update metrics and the circuit breaker with an attempt's result"""
+        
+        # Breaker state lives in the parent process when running in a pool
+        if self.deferred_updates is not None:
+            self.deferred_updates.append(('outcome', dict(property_info=property_info, status=status)))
+            return
+        
+        metrics.PROPERTIES_TOTAL.labels(website_group=property_info['website_group'], status=status).inc()
+        if status == "SUCCESS":
+            self.circuit_breaker.record_success(property_info['website_group'])
+        else:
+            self.circuit_breaker.record_failure(property_info['website_group'])
+            
+    def record_host_responses(self, website_group: str, responses: List[Tuple[Optional[int], Optional[float]]]):
+        """Feed a listing host's HTTP statuses and response times (browser or HTTP client) to its rate limiter"""
+        
+        # Rate limiter state lives in the parent process when running in a pool
+        if self.deferred_updates is not None:
+            self.deferred_updates.append(('responses', dict(website_group=website_group, responses=list(responses))))
+            return
+        
+        for status, elapsed in responses:
+            self.rate_limiter.record_response(website_group, status=status, elapsed=elapsed)
+            
     def get_subfolder_name(self, website_group: str) -> str:
         """Get subfolder name for a website group"""
         subfolder_map = {
@@ -257,331 +636,336 @@ class MarketingPackageAgent:
         subfolder_path = os.path.join(self.download_folder, subfolder)
         return os.path.abspath(subfolder_path)
         
-    def download_pdf_from_url(self, pdf_url: str, property_info: Dict) -> bool:
-        """Download PDF from URL using the working download_pdf.py script as subprocess"""
+    @timed_phase("pdf_download")
+    async def download_pdf_from_url(self, pdf_url: str, target_dir: str) -> bool:
+        """Download PDF from URL into target_dir (the attempt's staging directory) over the pooled HTTP session"""
+        print(f"🔗 Downloading reported PDF URL: {pdf_url}")
         try:
-            print(f"🔗 Calling download_pdf.py script with URL: {pdf_url}")
-            
-            # Get the target directory for netleaseadvisorygroup
-            target_dir = os.path.join(self.download_folder, self.get_subfolder_name(property_info['website_group']))
-            target_dir = os.path.abspath(target_dir)
-            
-            print(f"📂 Target directory: {target_dir}")
-            
-            # Call download_pdf.py as subprocess
-            cmd = ["python3", "download_pdf.py", pdf_url, target_dir]
-            print(f"🤖 Running: {' '.join(cmd)}")
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            # Check if the subprocess was successful
-            if result.returncode == 0:
-                print(f"✅ download_pdf.py completed successfully")
-                print(f"📄 Output: {result.stdout.strip()}")
-                
-                # Verify the download by checking for files in the target directory
-                expected_filename = pdf_url.split('/')[-1]
-                expected_filepath = os.path.join(target_dir, expected_filename)
-                
-                if os.path.exists(expected_filepath) and os.path.getsize(expected_filepath) > 1000:
-                    file_size = os.path.getsize(expected_filepath)
-                    print(f"✅ PDF file verified: {expected_filepath}")
-                    print(f"📄 File size: {file_size:,} bytes")
-                    return True
-                else:
-                    print(f"❌ PDF file not found or too small after download_pdf.py")
-                    return False
-            else:
-                print(f"❌ download_pdf.py failed with return code: {result.returncode}")
-                print(f"❌ Error: {result.stderr.strip()}")
-                return False
-                
-        except subprocess.TimeoutExpired:
-            print(f"❌ download_pdf.py timed out after 120 seconds")
+            path, _ = await asyncio.to_thread(download_file, self.http_session, pdf_url, target_dir, timeout=120)
+        except requests.RequestException as e:
+            print(f"❌ PDF download failed: {e}")
             return False
+        if path and is_valid_pdf(path):
+            print(f"✅ PDF file verified: {path}")
+            print(f"📄 File size: {os.path.getsize(path):,} bytes")
+            return True
+        print(f"❌ Downloaded file is not a valid PDF")
+        if path:
+            os.remove(path)
+        return False
+    
+    def _create_llm(self, vision_policy: VisionPolicy = None) -> ChatOpenAI:
+        """Create the GPT-4o client for one property, governed by the shared OpenAI budget"""
+        return GovernedChatOpenAI(
+            model="gpt-4o",
+            api_key=self.api_key,
+            base_url=self.openai_base_url,
+            temperature=0.1,
+            governor=self.llm_governor,
+            phase_callback=self.record_phase,
+            tracer=tracer,
+            vision_policy=vision_policy
+        )
+    
+    def _get_browser(self, website_group: str, config: BrowserConfig) -> Browser:
+        """Fresh browser per property, or one warm browser per website group in daemon mode"""
+        config = engine_config(config, self.browser_engines.get(website_group, "chromium"))
+        if not self.reuse_browsers:
+            return Browser(config=config)
+        if website_group not in self.browser_pool:
+            self.browser_pool[website_group] = Browser(config=config)
+        return self.browser_pool[website_group]
+    
+    async def close_browsers(self):
+        """Close pooled daemon browsers"""
+        for website_group, browser in list(self.browser_pool.items()):
+            try:
+                await browser.close()
+            except Exception as e:
+                print(f"⚠️  Error closing browser for {website_group}: {e}")
+        self.browser_pool = {}
+    
+    def _create_browser_context(self, browser: Browser, staging_dir: str, property_info: Dict) -> StagingBrowserContext:
+        """Staging context for one attempt, starting from the website group's saved storage state"""
+        website_group = property_info['website_group']
+        storage_state = None
+        if self.persist_browser_state:
+            storage_state = load_storage_state(storage_state_path(self.browser_state_folder, website_group))
+            if storage_state:
+                print(f"🍪 Loaded saved browser state for {website_group}")
+        return StagingBrowserContext(browser, staging_dir, storage_state=storage_state,
+                                     listing_url=property_info['property_url'])
+    
+    async def save_site_state(self, agent: Agent, property_info: Dict):
+        """Save the website group's cookies/localStorage after its first successful property"""
+        if not self.persist_browser_state:
+            return
+        path = storage_state_path(self.browser_state_folder, property_info['website_group'])
+        if os.path.exists(path):
+            return
+        try:
+            await save_storage_state(agent.browser_context.session.context, path)
+            print(f"🍪 Saved browser state for {property_info['website_group']}")
         except Exception as e:
-            print(f"❌ Error calling download_pdf.py script: {e}")
-            return False
+            # Later properties just fill the form again
+            print(f"⚠️  Could not save browser state: {e}")
+    
+    def fast_path_recipe(self, website_group: str) -> Optional[Dict]:
+        """Learned HTTP recipe for a website group, if it has a fast path adapter and one was recorded"""
+        if not self.http_fast_path or website_group not in FAST_PATH_ADAPTERS:
+            return None
+        return load_recipe(recipe_path(self.browser_state_folder, website_group))
+    
+    async def try_http_fast_path(self, property_info: Dict) -> Optional[Dict]:
+        """Submit the lead form and download over plain HTTP; returns the final path, PDF source, listing
+        snapshot and document links, None means the browser agent has to run"""
+        website_group = property_info['website_group']
+        recipe = self.fast_path_recipe(website_group)
+        if not recipe:
+            return None
+        staging_dir = create_staging_dir(self.download_folder, f"property_{property_info['id']}_http")
+        try:
+            with self._phase("http_fast_path"):
+                # requests is blocking; keep the event loop free for pipelined work
+                fetched = await asyncio.to_thread(FAST_PATH_ADAPTERS[website_group].fetch, self.http_session,
+                                                  property_info['property_url'], self.contact_info[website_group],
+                                                  recipe, staging_dir, timeout=30)
+            final_path = promote_staged_pdf(staging_dir, self.get_download_filename(property_info))
+        except (FastPathMismatch, requests.RequestException) as e:
+            print(f"↩️  HTTP fast path did not match ({e}) - falling back to the browser agent")
+            self.fast_path_stats['fallbacks'] += 1
+            return None
+        finally:
+            remove_staging_dir(staging_dir)
+        self.fast_path_stats['hits'] += 1
+        return {
+            'path': final_path,
+            'pdf_source': {key: fetched[key] for key in ('url', 'etag', 'last_modified')},
+            'listing_snapshot': fetched['listing_snapshot'],
+            'document_links': fetched['document_links']
+        }
+    
+    def resolved_pdf_source(self, agent: Agent, pdf_url: str = None) -> Optional[Dict]:
+        """URL the attempt's PDF came from, with the validators the browser saw (None if unknown)"""
+        context = agent.browser_context
+        pdf_url = pdf_url or next(iter(context.download_urls[-1:] or context.captured_pdf_urls[-1:]), None)
+        if not pdf_url or not pdf_url.startswith("http"):
+            return None
+        return {"url": pdf_url, **context.pdf_responses.get(pdf_url, {})}
+    
+    def get_documents_folder(self, property_info: Dict) -> str:
+        """Folder for a property's additional documents, next to its main package"""
+        return os.path.splitext(self.get_download_filename(property_info))[0] + "_documents"
+    
+    @timed_phase("document_download")
+    async def capture_property_documents(self, property_info: Dict, final_path: str, pdf_source: Optional[Dict],
+                                         document_links: List[Dict], staged_urls: Dict = None,
+                                         browser_cookies: List[Dict] = None) -> str:
+        """Record the main package and every other document the visit turned up in marketing_files:
+        files the browser already staged are kept, linked ones are downloaded concurrently over HTTP.
+        Returns the marketing_files_found summary"""
+        primary_url = (pdf_source or {}).get('url') or property_info['property_url']
+        records = [file_record(final_path, primary_url, PRIMARY_DOCUMENT_TYPE)]
+        if self.capture_documents:
+            try:
+                records.extend(await self._collect_documents(property_info, records[0], document_links,
+                                                             staged_urls or {}, browser_cookies))
+            except Exception as e:
+                # The main package is already safe; missing extras don't fail the property
+                print(f"⚠️  Could not capture additional documents: {e}")
+        await self.arecord_files(property_info, records)
+        
+        summary = f"PDF package ({os.path.basename(final_path)})"
+        if len(records) > 1:
+            extras = Counter(record['document_type'] for record in records[1:])
+            summary += f" + {len(records) - 1} documents ({', '.join(sorted(extras))})"
+            print(f"📎 Captured {len(records) - 1} additional documents -> {self.get_documents_folder(property_info)}")
+        return summary
+    
+    async def capture_browser_documents(self, agent: Agent, property_info: Dict, final_path: str,
+                                        pdf_source: Optional[Dict]) -> str:
+        """capture_property_documents for a browser run: links its pages showed, files it staged and its cookies"""
+        context = agent.browser_context
+        try:
+            browser_cookies = await context.session.context.cookies()
+        except Exception:
+            browser_cookies = []
+        return await self.capture_property_documents(property_info, final_path, pdf_source,
+                                                     list(context.document_links.values()), context.staged_urls,
+                                                     browser_cookies)
+    
+    async def _collect_documents(self, property_info: Dict, primary: Dict, document_links: List[Dict],
+                                 staged_urls: Dict, browser_cookies: List[Dict] = None) -> List[Dict]:
+        """Extra documents of one property, moved into its documents folder (duplicates by hash dropped)"""
+        # Files the browser downloaded besides the main package (that one has been promoted already)
+        candidates = [file_record(path, url, classify_document(url)) for path, url in staged_urls.items()
+                      if os.path.isfile(path) and os.path.getsize(path) > 0]
+        known_urls = {primary['file_url']} | set(staged_urls.values())
+        links = [link for link in document_links if link['url'] not in known_urls]
+        
+        staging_dir = None
+        try:
+            if links:
+                staging_dir = create_staging_dir(self.download_folder, f"property_{property_info['id']}_documents")
+                # requests is blocking; the thread pool inside bounds the concurrent downloads
+                downloaded = await asyncio.to_thread(download_documents, self.http_session, links, staging_dir,
+                                                     self.document_concurrency, cookie_jar(browser_cookies))
+                candidates.extend(document for document in downloaded if not document['error'])
+            
+            documents_folder = self.get_documents_folder(property_info)
+            seen_hashes = {primary['sha256']}
+            used_names = set()
+            records = []
+            for record in candidates:
+                if record['sha256'] in seen_hashes:
+                    continue
+                seen_hashes.add(record['sha256'])
+                name = record['file_name']
+                if name in used_names:
+                    name = f"{len(records) + 1}_{name}"
+                used_names.add(name)
+                os.makedirs(documents_folder, exist_ok=True)
+                final_path = os.path.join(documents_folder, name)
+                os.replace(record['path'], final_path)
+                records.append({**record, 'file_name': name, 'path': final_path})
+            return records
+        finally:
+            if staging_dir:
+                remove_staging_dir(staging_dir)
+    
+    async def arecord_files(self, property_info: Dict, files: List[Dict]):
+        """Upsert a property's captured documents into marketing_files"""
+        if self.deferred_updates is not None:
+            self.deferred_updates.append(('files', dict(property_info=property_info, files=files)))
+            return
+        try:
+            query, values = build_record_files_query(property_info['id'], files)
+            await self.async_db.execute(query, values)
+        except Exception as e:
+            print(f"Error recording marketing files: {e}")
+    
+    def learn_fast_path(self, agent: Agent, property_info: Dict):
+        """Record the HTTP recipe from a successful browser run (refreshed on every browser success)"""
+        website_group = property_info['website_group']
+        if not self.http_fast_path or website_group not in FAST_PATH_ADAPTERS:
+            return
+        recipe = FAST_PATH_ADAPTERS[website_group].learn(agent.browser_context.form_posts,
+                                                         property_info['property_url'],
+                                                         self.contact_info[website_group])
+        if recipe:
+            save_recipe(recipe, recipe_path(self.browser_state_folder, website_group))
+            print(f"⚡ Learned HTTP fast path for {website_group} (fields: {', '.join(recipe['contact_fields'])})")
     
-    async def create_levy_retail_agent(self, property_info: Dict) -> Agent:
+    async def create_levy_retail_agent(self, property_info: Dict, page_open: bool = False) -> Agent:
         """Create browser agent specifically for Levy Retail workflow"""
         
         contact = self.contact_info.get(property_info['website_group'], {})
-        property_url = property_info['property_url']
         download_path = self.get_download_filename(property_info)
         
-        # Get absolute path for specific subfolder
-        abs_download_path = self.get_download_path(property_info['website_group'])
+        # Private download directory for this attempt (promoted to download_path once verified)
+        staging_dir = create_staging_dir(self.download_folder, f"property_{property_info['id']}")
         
-        # Set up GPT-4o model
-        llm = ChatOpenAI(
-            model="gpt-4o",
-            api_key=self.api_key,
-            temperature=0.1
-        )
-        
-        # Create fresh browser context using WebKit/Safari engine  
-        # Force WebKit by setting environment variable before browser creation
-        import os
-        original_browser = os.environ.get('BROWSER')
-        os.environ['BROWSER'] = 'webkit'
+        # Set up GPT-4o model (calls go through the shared OpenAI budget governor)
+        vision_policy = VisionPolicy(self.vision_modes[property_info['website_group']])
+        llm = self._create_llm(vision_policy)
         
-        try:
-            browser = Browser(
-                config=BrowserConfig(
-                    headless=self.headless,  # Use agent's headless setting
-                    disable_security=False,
-                    downloads_path=abs_download_path,  # Set download directory
-                    accept_downloads=True,
-                    channel=None,  # Force default channel
-                    executable_path=None  # Let system find WebKit
-                )
+        # Create fresh browser context (engine per website group, WebKit/Safari by default)
+        browser = self._get_browser(
+            property_info['website_group'],
+            BrowserConfig(
+                headless=self.headless,  # Use agent's headless setting
+                disable_security=False,
+                accept_downloads=True,
+                channel=None,  # Force default channel
+                executable_path=None  # Let Playwright find the engine
             )
-        finally:
-            # Restore original browser setting
-            if original_browser:
-                os.environ['BROWSER'] = original_browser
-            elif 'BROWSER' in os.environ:
-                del os.environ['BROWSER']
-        
-        # Comprehensive task instructions for Levy Retail
-        task = f"""
-You are a marketing package download agent for Levy Retail properties.
-
-CURRENT PROPERTY:
-- Name: {property_info['property_name']}
-- URL: {property_url}
-- Download Path: {download_path}
-
-CONTACT INFORMATION TO USE:
-- Name: {contact['name']}
-- Email: {contact['email']}
-- Phone: {contact['phone']}
-
-STEP-BY-STEP WORKFLOW:
-
-1. NAVIGATE TO PROPERTY:
-   - Go to: {property_url}
-   - Wait for page to fully load
-   - Verify you're on the correct property page
-
-2. FIND AND CLICK VIEW PACKAGE:
-   - First, look for red "VIEW PACKAGE" button on the current view (usually on left side)
-   - If not visible, scroll down SLOWLY in small increments (one scroll at a time)
-   - After each scroll, STOP and look for the button before scrolling more
-   - The button is typically in the upper portion of the page, NOT at the bottom
-   - Once you see the button, click it to open download form modal
-
-3. FILL OUT THE FORM:
-   - Fill "Your Name" field with: {contact['name']}
-   - Fill "Your Email" field with: {contact['email']}
-   - Fill "Your Phone" field with: {contact['phone']}
-   - Click "Submit" button
-
-4. HANDLE THANK YOU PAGE:
-   - After submitting, you'll see a "Thank you!" message
-   - Look for link text "TO DOWNLOAD THE PACKAGE DIRECTLY, CLICK HERE."
-   - Click that link to download the PDF directly
-   - DO NOT rely on email - use the direct download link
-
-5. DOWNLOAD VERIFICATION:
-   - After clicking the download link, the PDF should start downloading
-   - Mark the task as complete once the download link is clicked
-   - Do not wait for file verification - that will be handled separately
-
-IMPORTANT NOTES:
-- The email provided will be bogus/fake - that's intentional
-- ALWAYS use the direct download link, not email
-- If any step fails, try again once before reporting error
-- Take your time and wait for elements to load
-- Downloads will be automatically saved to the levyretail subfolder
-- SCROLLING STRATEGY: The VIEW PACKAGE button is usually visible after 1-2 small scrolls
-- DO NOT scroll to the bottom of the page - the button is in the upper/middle section
-- If you scroll more than 3-4 times without finding the button, try scrolling back up
-
-SUCCESS CRITERIA:
-- Successfully navigate to the property page
-- Successfully click the VIEW PACKAGE button
-- Successfully fill out and submit the contact form
-- Successfully click the direct download link
-- Report completion once download link is clicked
-
-Report your progress and any issues encountered.
-"""
+        )
+        
+        # Cache-friendly prompt: static Levy Retail instructions first, property details last
+        task = build_task(property_info['website_group'], contact, property_info, download_path,
+                          self.prompt_variant, page_open=page_open)
 
         agent = Agent(
             task=task,
             llm=llm,
-            browser=browser
+            browser=browser,
+            browser_context=self._create_browser_context(browser, staging_dir, property_info),
+            controller=ReportingController(vision_policy),
+            # DOM-only groups take no screenshots unless the agent calls request_screenshot
+            use_vision=vision_policy.use_vision,
+            # browser-use picks function calling by class name, which GovernedChatOpenAI doesn't match
+            tool_calling_method='function_calling'
         )
         
-        return agent
+        return self._attach_vision_policy(agent, vision_policy)
 
-    async def create_tag_industrial_agent(self, property_info: Dict) -> Agent:
+    async def create_tag_industrial_agent(self, property_info: Dict, page_open: bool = False) -> Agent:
         """Create browser agent specifically for Tag Industrial workflow"""
         
         contact = self.contact_info.get(property_info['website_group'], {})
-        property_url = property_info['property_url']
         download_path = self.get_download_filename(property_info)
         
-        # Get absolute path for specific subfolder
-        abs_download_path = self.get_download_path(property_info['website_group'])
+        # Private download directory for this attempt (promoted to download_path once verified)
+        staging_dir = create_staging_dir(self.download_folder, f"property_{property_info['id']}")
         
-        # Set up GPT-4o model
-        llm = ChatOpenAI(
-            model="gpt-4o",
-            api_key=self.api_key,
-            temperature=0.1
-        )
+        # Set up GPT-4o model (calls go through the shared OpenAI budget governor)
+        vision_policy = VisionPolicy(self.vision_modes[property_info['website_group']])
+        llm = self._create_llm(vision_policy)
         
-        # Create fresh browser context
-        browser = Browser(
-            config=BrowserConfig(
+        # Create fresh browser context (or reuse the warm daemon browser)
+        browser = self._get_browser(
+            property_info['website_group'],
+            BrowserConfig(
                 headless=self.headless,  # Use agent's headless setting
                 disable_security=False,
-                downloads_path=abs_download_path,  # Set download directory
                 accept_downloads=True,
                 channel=None,
                 executable_path=None
             )
         )
         
-        # Comprehensive task instructions for Tag Industrial
-        task = f"""
-You are a marketing package download agent for Tag Industrial properties.
-
-CURRENT PROPERTY:
-- Name: {property_info['property_name']}
-- URL: {property_url}
-- Download Path: {download_path}
-
-CONTACT INFORMATION TO USE:
-- First Name: {contact['first_name']}
-- Last Name: {contact['last_name']}
-- Company Name: {contact['company']}
-- Phone Number: {contact['phone']}
-- Email Address: {contact['email']}
-- Contact Type: {contact['contact_type']}
-
-STEP-BY-STEP WORKFLOW:
-
-1. NAVIGATE TO PROPERTY:
-   - Go to: {property_url}
-   - Wait for page to fully load
-   - Verify you're on the correct property page
-
-2. FIND AND CLICK MARKETING PACKAGE BUTTON:
-   - FIRST: Look carefully for "Marketing Package" button in the current visible area
-   - If not visible, scroll down SLOWLY (half-page scrolls, not full page)
-   - After EACH scroll, STOP and carefully scan the entire page for the button
-   - Try maximum 3-4 slow scrolls down
-   - IF BUTTON NOT FOUND after scrolling down: SCROLL BACK UP gradually
-   - When scrolling up: Start from current position and scroll up slowly (small increments)
-   - Check after each upward scroll - the button might be in the middle area
-   - The button should be findable within this careful up/down search pattern
-   - Once you see the "Marketing Package" button, click it to open the form modal
-
-3. FILL OUT THE CONTACT FORM (WORK EFFICIENTLY):
-   - Fill "First Name" field with: {contact['first_name']}
-   - Fill "Last Name" field with: {contact['last_name']}
-   - Fill "Company Name" field with: {contact['company']}
-   - Fill "Phone Number" field with: {contact['phone']}
-   - Fill "Email Address" field with: {contact['email']}
-   - For "Contact Type" dropdown: 
-     * Click on the dropdown field to open it
-     * Click directly on "Principal" from the list
-   - Click the "I accept the Terms and Conditions" checkbox IMMEDIATELY
-   - Click "Submit" button RIGHT AFTER checking the checkbox
-   - COMPLETE THE ENTIRE FORM IN ONE SMOOTH SEQUENCE
-
-4. DOWNLOAD THE PACKAGE:
-   - After submitting the form, look for "Download Marketing Package" button
-   - Click the "Download Marketing Package" button to start the download
-   - The PDF should start downloading automatically
-
-5. DOWNLOAD VERIFICATION:
-   - After clicking the download button, the PDF should start downloading
-   - Mark the task as complete once the download button is clicked
-   - Do not wait for file verification - that will be handled separately
-
-IMPORTANT NOTES:
-- The email provided will be bogus/fake - that's intentional
-- Take your time and wait for elements to load
-- CRITICAL: Use SLOW half-page scrolls (not full page) when looking for Marketing Package button
-- If button not found after scrolling down, SCROLL BACK UP gradually to find it
-- The button might be in the middle area that gets passed over with fast scrolling
-- For the Contact Type dropdown: DO NOT use select_dropdown_option - CLICK on the dropdown, then CLICK on "Principal"
-- WORK FAST on the checkbox: Click it immediately after dropdown selection
-- DO NOT overthink the form - fill, check, submit in quick succession
-- Downloads will be automatically saved to the tag-industries subfolder
-- If any form field is marked as required, make sure to fill it out
-- If any step fails, try again once before reporting error
-
-BUTTON SEARCH STRATEGY:
-- Step 1: Check current visible area thoroughly
-- Step 2: Scroll down slowly (3-4 half-page scrolls max)
-- Step 3: If not found, scroll back up slowly from current position
-- Step 4: Check each area carefully as you scroll up
-- Step 5: The button should be found using this up/down pattern
-
-SUCCESS CRITERIA:
-- Successfully navigate to the property page
-- Successfully find and click the Marketing Package button using the search strategy
-- Successfully fill out and submit the contact form
-- Successfully click the Download Marketing Package button
-- Report completion once download button is clicked
-
-Report your progress and any issues encountered.
-"""
+        # Cache-friendly prompt: static Tag Industrial instructions first, property details last
+        task = build_task(property_info['website_group'], contact, property_info, download_path,
+                          self.prompt_variant, page_open=page_open)
 
         agent = Agent(
             task=task,
             llm=llm,
-            browser=browser
+            browser=browser,
+            browser_context=self._create_browser_context(browser, staging_dir, property_info),
+            controller=ReportingController(vision_policy),
+            # DOM-only groups take no screenshots unless the agent calls request_screenshot
+            use_vision=vision_policy.use_vision,
+            # browser-use picks function calling by class name, which GovernedChatOpenAI doesn't match
+            tool_calling_method='function_calling'
         )
         
-        return agent
+        return self._attach_vision_policy(agent, vision_policy)
 
-    async def create_netleaseadvisorygroup_agent(self, property_info: Dict) -> Agent:
+    async def create_netleaseadvisorygroup_agent(self, property_info: Dict, page_open: bool = False) -> Agent:
         """Create browser agent specifically for Net Lease Advisory Group workflow"""
         
         contact = self.contact_info.get(property_info['website_group'], {})
-        property_url = property_info['property_url']
         download_path = self.get_download_filename(property_info)
         
-        # Get absolute path for specific subfolder
-        abs_download_path = self.get_download_path(property_info['website_group'])
-        
-        # Set up GPT-4o model
-        llm = ChatOpenAI(
-            model="gpt-4o",
-            api_key=self.api_key,
-            temperature=0.1
-        )
+        # Private download directory for this attempt (promoted to download_path once verified)
+        staging_dir = create_staging_dir(self.download_folder, f"property_{property_info['id']}")
         
-        # Detect platform for correct keyboard shortcuts
-        import platform
-        is_mac = platform.system() == 'Darwin'
-        save_shortcut = "Cmd+S" if is_mac else "Ctrl+S"
-        save_alt_shortcut = "Cmd+Shift+S" if is_mac else "Ctrl+Shift+S"
-        platform_name = "Mac" if is_mac else "Windows/Linux"
+        # Set up GPT-4o model (calls go through the shared OpenAI budget governor)
+        vision_policy = VisionPolicy(self.vision_modes[property_info['website_group']])
+        llm = self._create_llm(vision_policy)
         
-        # Create fresh browser context with enhanced download settings
-        browser = Browser(
-            config=BrowserConfig(
+        # Create fresh browser context with enhanced download settings (or reuse the warm daemon browser)
+        browser = self._get_browser(
+            property_info['website_group'],
+            BrowserConfig(
                 headless=self.headless,  # Use agent's headless setting
                 disable_security=False,
-                downloads_path=abs_download_path,  # Set download directory
                 accept_downloads=True,
                 channel=None,
                 executable_path=None,
                 # Add extra args to handle PDFs and downloads better
-                extra_chromium_args=[
+                extra_browser_args=[
                     '--disable-web-security',
                     '--disable-features=VizDisplayCompositor',
                     '--no-pdf-header-footer',
@@ -590,247 +974,648 @@ Report your progress and any issues encountered.
             )
         )
         
-        # Comprehensive task instructions for Net Lease Advisory Group
-        task = f"""
-You are a marketing package download agent for Net Lease Advisory Group properties.
-
-CURRENT PROPERTY:
-- Name: {property_info['property_name']}
-- URL: {property_url}
-- Download Path: {download_path}
-
-STEP-BY-STEP WORKFLOW:
-
-1. NAVIGATE TO PROPERTY:
-   - Go to: {property_url}
-   - Wait for page to fully load
-   - Verify you're on the correct property page
-
-2. FIND AND CLICK DOWNLOAD BROCHURE BUTTON:
-   - Scroll down slowly to find the "DOWNLOAD BROCHURE" button
-   - The button should be visible after scrolling down a little bit
-   - After each scroll, STOP and look for the button before scrolling more
-   - Once you see the "DOWNLOAD BROCHURE" button, click it to open the popup modal
-
-3. HANDLE THE POPUP FORM:
-   - A popup window will open with a form
-   - DO NOT fill out any fields in the form
-   - Look for the "DOWNLOAD NOW" button at the bottom of the popup
-   - Click the "DOWNLOAD NOW" button directly without filling any form fields
-
-4. EXTRACT PDF URL FOR PYTHON DOWNLOAD:
-   After clicking "DOWNLOAD NOW", the PDF will open in browser. Follow this process:
-
-   STEP A - Extract PDF URL:
-   - Wait 5-6 seconds for PDF to fully load in browser (PDF needs time to render completely)
-   - Look at the browser address bar - it should now show the direct PDF URL
-   - The URL will be something like: https://netleaseadvisorygroup.com/wp-content/uploads/YYYY/MM/filename.pdf
-   - Extract this complete PDF URL from the address bar
-   - IMPORTANT: Make sure you have the complete URL starting with https://
-
-   STEP B - Return PDF URL:
-   - Once you have successfully extracted the PDF URL, your task is complete
-   - Return the PDF URL in your final response using this exact format:
-   - "PDF_URL_EXTRACTED: [complete_pdf_url_here]"
-   - Example: "PDF_URL_EXTRACTED: https://netleaseadvisorygroup.com/wp-content/uploads/2022/07/property-brochure.pdf"
-   - The Python code will handle the actual download using this URL
-
-5. TASK COMPLETION:
-   - Mark task as complete once you have successfully extracted and returned the PDF URL
-   - DO NOT attempt to download the PDF yourself
-   - The Python code will handle the download process using the extracted URL
-
-IMPORTANT NOTES:
-- NO form filling required - just click DOWNLOAD NOW directly
-- Focus ONLY on extracting the correct PDF URL from browser address bar
-- Your job is complete once you return the PDF URL in the correct format
-- The PDF URL extraction is critical - wait for page to fully load
-- Python code will handle the actual download to the netleaseadvisorygroup subfolder
-- Make sure to return the URL in the exact format: "PDF_URL_EXTRACTED: [url]"
-
-STEP-BY-STEP PROCESS:
-1. PDF opens in browser after clicking DOWNLOAD NOW
-2. Wait 5-6 seconds for PDF to fully load and URL to stabilize
-3. Extract the complete PDF URL from browser address bar
-4. Return the URL in the specified format
-5. Task complete - Python will handle download
-
-SUCCESS CRITERIA:
-- Successfully navigate to the property page
-- Successfully find and click the DOWNLOAD BROCHURE button
-- Successfully click the DOWNLOAD NOW button in the popup
-- Successfully extract PDF URL from browser address bar
-- Successfully return PDF URL in format: "PDF_URL_EXTRACTED: [url]"
-- Report completion once PDF URL is extracted and returned
-
-TROUBLESHOOTING:
-- If popup is blocked, look for popup blocker notification and allow it
-- If PDF doesn't load after clicking DOWNLOAD NOW, wait longer (up to 10 seconds)
-- If PDF URL looks incomplete or wrong, wait longer for page to fully load
-- Make sure the extracted URL starts with https:// and ends with .pdf
-- If URL extraction fails, report the issue clearly
-
-Report your progress and return the PDF URL using the exact format specified.
-"""
+        # Cache-friendly prompt: static Net Lease Advisory Group instructions first, property details last
+        task = build_task(property_info['website_group'], contact, property_info, download_path,
+                          self.prompt_variant, page_open=page_open)
 
         agent = Agent(
             task=task,
             llm=llm,
-            browser=browser
+            browser=browser,
+            browser_context=self._create_browser_context(browser, staging_dir, property_info),
+            controller=ReportingController(vision_policy),
+            # DOM-only groups take no screenshots unless the agent calls request_screenshot
+            use_vision=vision_policy.use_vision,
+            # browser-use picks function calling by class name, which GovernedChatOpenAI doesn't match
+            tool_calling_method='function_calling'
         )
         
+        return self._attach_vision_policy(agent, vision_policy)
+
+    def _attach_vision_policy(self, agent: Agent, vision_policy: VisionPolicy) -> Agent:
+        """Let the vision policy switch screenshots on for the step after request_screenshot (and off again)"""
+        vision_policy.attach(agent.settings)
+        agent.browser_context.screenshots_wanted = lambda: vision_policy.use_vision
         return agent
 
-    async def process_property(self, property_info: Dict) -> bool:
-        """Process a single property download"""
+    async def _create_agent(self, property_info: Dict, page_open: bool = False) -> Optional[Agent]:
+        """Create the browser agent for a property's website group (None if unsupported);
+        page_open tells the agent its listing is already loaded in the current tab"""
+        if property_info['website_group'] == "www.levyretail.com":
+            return await self.create_levy_retail_agent(property_info, page_open)
+        elif property_info['website_group'] == "tag-industrial.com":
+            return await self.create_tag_industrial_agent(property_info, page_open)
+        elif property_info['website_group'] == "netleaseadvisorygroup.com":
+            return await self.create_netleaseadvisorygroup_agent(property_info, page_open)
+        return None
+        
+    async def process_property(self, property_info: Dict, prepared_agent: Agent = None) -> bool:
+        """Process a single property download (prepared_agent comes from pipelined prefetch).
+        Timed as property_total, or as fast_path_total when the HTTP fast path handled it, so
+        browser latency percentiles only cover browser runs"""
+        started = time.perf_counter()
+        # One property runs at a time per agent (prefetch never takes the fast path), so a new hit is this one's
+        hits_before = self.fast_path_stats['hits']
+        try:
+            with tracer.span("process_property", phase="property_total"):
+                return await self._process_property(property_info, prepared_agent)
+        finally:
+            phase = "fast_path_total" if self.fast_path_stats['hits'] > hits_before else "property_total"
+            self.record_phase(phase, time.perf_counter() - started)
+            
+    async def _process_property(self, property_info: Dict, prepared_agent: Agent = None) -> bool:
+        """process_property without the timing: fast path first, then the browser agent"""
+        span = tracer.current_span()
+        if span:
+            span.set_attribute("website_group", property_info['website_group'])
+            span.set_attribute("property_name", property_info['property_name'])
+            span.set_attribute("attempt", property_info.get('attempt_count', 0) + 1)
         
         print(f"\n🚀 PROCESSING: {property_info['website_group']} - {property_info['property_name']}")
         print(f"🔗 URL: {property_info['property_url']}")
         
-        # Mark as visited immediately
-        self.update_checklist(property_info, visited=True, status="IN_PROGRESS")
+        # Mark as visited immediately (pool workers' rows were marked by the parent when dispatched)
+        if self.deferred_updates is None:
+            await self.aupdate_checklist(property_info, visited=True, status="IN_PROGRESS")
         
+        agent = prepared_agent
         try:
-            # Create agent based on website group
-            if property_info['website_group'] == "www.levyretail.com":
-                agent = await self.create_levy_retail_agent(property_info)
-            elif property_info['website_group'] == "tag-industrial.com":
-                agent = await self.create_tag_industrial_agent(property_info)
-            elif property_info['website_group'] == "netleaseadvisorygroup.com":
-                agent = await self.create_netleaseadvisorygroup_agent(property_info)
-            else:
+            # Sites with a learned HTTP recipe skip the browser and the LLM entirely
+            fast_path_result = await self.try_http_fast_path(property_info)
+            if fast_path_result:
+                final_path = fast_path_result['path']
+                print(f"⚡ SUCCESS: PDF downloaded over HTTP for {property_info['property_name']} -> {final_path}")
+                self.record_success(property_info)
+                marketing_files = await self.capture_property_documents(
+                    property_info, final_path, fast_path_result['pdf_source'], fast_path_result['document_links'])
+                await self.aupdate_checklist(property_info, downloaded=True, status="SUCCESS",
+                                    marketing_files=marketing_files,
+                                    notes="Successfully downloaded and verified PDF via HTTP fast path",
+                                    pdf_source=fast_path_result['pdf_source'],
+                                    page_snapshot=fast_path_result['listing_snapshot'])
+                return True
+            
+            # Create agent based on website group, unless it was prefetched while the last property ran
+            if agent is None:
+                with self._phase("browser_launch"):
+                    agent = await self._create_agent(property_info)
+            if agent is None:
                 print(f"⚠️  Website group {property_info['website_group']} not yet implemented")
-                self.update_checklist(property_info, status="SKIPPED", 
+                await self.aupdate_checklist(property_info, status="SKIPPED", 
                                     notes="Website group not yet implemented")
                 return False
+            if prepared_agent is not None:
+                await self.refresh_prefetched_page(agent, property_info)
                 
             # Run the agent with timeout
             print(f"🤖 Starting browser agent...")
-            result = await asyncio.wait_for(
-                agent.run(),
-                timeout=self.timeout_seconds
-            )
+            with self._phase("agent_run"):
+                result = await asyncio.wait_for(
+                    agent.run(),
+                    timeout=self.timeout_seconds
+                )
+            self.record_history_phases(result)
             
-            # Handle netleaseadvisorygroup separately - extract PDF URL and download
+            # Handle netleaseadvisorygroup separately - the PDF opens in the browser instead of downloading
             if property_info['website_group'] == "netleaseadvisorygroup.com":
-                # Extract PDF URL from agent result
-                pdf_url = None
-                if result:
-                    # Convert result to string and look for PDF URL
-                    result_str = str(result)
-                    
-                    # Look for PDF_URL_EXTRACTED pattern
-                    url_match = re.search(r'PDF_URL_EXTRACTED:\s*([^\s\]]+)', result_str)
-                    if url_match:
-                        pdf_url = url_match.group(1).strip()
-                        print(f"🔗 Extracted PDF URL: {pdf_url}")
-                    else:
-                        # Fallback: look for any https URL ending in .pdf
-                        url_match = re.search(r'https://[^\s\]]+\.pdf', result_str)
-                        if url_match:
-                            pdf_url = url_match.group(0).strip()
-                            print(f"🔗 Found PDF URL (fallback): {pdf_url}")
-                
-                if pdf_url:
-                    # Clean up the URL - remove any extra characters
-                    pdf_url = pdf_url.strip().rstrip("',\"").strip()
-                    print(f"🔗 Cleaned PDF URL: {pdf_url}")
-                    
-                    # Brief wait before using download_pdf.py script (which works reliably)
-                    print(f"⏳ Waiting 5 seconds before download...")
-                    await asyncio.sleep(5)
-                    
-                    # Download PDF using Python requests
-                    download_success = self.download_pdf_from_url(pdf_url, property_info)
-                    if download_success:
-                        print(f"✅ SUCCESS: PDF downloaded for {property_info['property_name']}")
-                        self.update_checklist(property_info, downloaded=True, status="SUCCESS",
-                                            marketing_files=f"PDF package ({pdf_url})", 
-                                            notes=f"Successfully extracted URL and downloaded PDF")
-                        return True
-                    else:
-                        print(f"❌ FAILED: PDF download failed for {property_info['property_name']}")
-                        self.update_checklist(property_info, status="DOWNLOAD_FAILED",
-                                            error=f"Failed to download PDF from URL: {pdf_url}")
+                # The browser context captures the PDF from its network traffic as it loads
+                staging_dir = agent.browser_context.staging_dir
+                with self._phase("pdf_download"):
+                    await agent.browser_context.wait_for_downloads()
+                    final_path = promote_staged_pdf(staging_dir, self.get_download_filename(property_info))
+                pdf_url = agent.browser_context.captured_pdf_urls[-1] if agent.browser_context.captured_pdf_urls else None
+                if final_path:
+                    print(f"📡 PDF captured from the browser's network traffic: {pdf_url}")
+                else:
+                    # Fallback: download the URL the agent reported through report_pdf_url
+                    pdf_url = agent.controller.report.pdf_url
+                    if not pdf_url:
+                        print(f"❌ FAILED: Agent did not report a PDF URL")
+                        await self.record_failure(property_info, status="URL_EXTRACTION_FAILED",
+                                            error="Agent finished without calling report_pdf_url")
                         return False
+                        
+                    print(f"🔗 Reported PDF URL: {pdf_url}")
+                    if await self.download_pdf_from_url(pdf_url, staging_dir):
+                        final_path = promote_staged_pdf(staging_dir, self.get_download_filename(property_info))
+                        
+                if final_path:
+                    print(f"✅ SUCCESS: PDF downloaded for {property_info['property_name']} -> {final_path}")
+                    self.record_success(property_info)
+                    await self.save_site_state(agent, property_info)
+                    pdf_source = self.resolved_pdf_source(agent, pdf_url)
+                    marketing_files = await self.capture_browser_documents(agent, property_info, final_path, pdf_source)
+                    await self.aupdate_checklist(property_info, downloaded=True, status="SUCCESS",
+                                        marketing_files=marketing_files, 
+                                        notes=f"Successfully captured and verified PDF",
+                                        pdf_source=pdf_source,
+                                        page_snapshot=agent.browser_context.listing_snapshot)
+                    return True
                 else:
-                    print(f"❌ FAILED: Could not extract PDF URL from agent result")
-                    self.update_checklist(property_info, status="URL_EXTRACTION_FAILED",
-                                        error="Agent did not return PDF URL in expected format")
+                    print(f"❌ FAILED: PDF download failed for {property_info['property_name']}")
+                    await self.record_failure(property_info, status="DOWNLOAD_FAILED",
+                                        error=f"Failed to download PDF from URL: {pdf_url}")
                     return False
             
-            # Handle other website groups (original logic)
+            # Other website groups download through the browser into the staging directory
             else:
-                # Mark as successful regardless of agent status (browser automation completed)
-                print(f"✅ SUCCESS: Agent completed workflow for {property_info['property_name']}")
-                subfolder = self.get_subfolder_name(property_info['website_group'])
-                self.update_checklist(property_info, downloaded=True, status="SUCCESS",
-                                    marketing_files="PDF package", 
-                                    notes=f"Successfully completed download workflow - PDF should be in {subfolder}/ folder")
+                with self._phase("pdf_download"):
+                    await agent.browser_context.wait_for_downloads()
+                    final_path = promote_staged_pdf(agent.browser_context.staging_dir,
+                                                    self.get_download_filename(property_info))
+                if not final_path:
+                    print(f"❌ FAILED: Agent finished but no PDF was downloaded for {property_info['property_name']}")
+                    reported = ("agent reported the download as started" if agent.controller.report.download_started
+                                else "agent did not report a download")
+                    await self.record_failure(property_info, status="DOWNLOAD_FAILED",
+                                              error=f"No valid PDF was downloaded ({reported})")
+                    return False
+                    
+                print(f"✅ SUCCESS: PDF downloaded for {property_info['property_name']} -> {final_path}")
+                self.record_success(property_info)
+                await self.save_site_state(agent, property_info)
+                self.learn_fast_path(agent, property_info)
+                pdf_source = self.resolved_pdf_source(agent)
+                marketing_files = await self.capture_browser_documents(agent, property_info, final_path, pdf_source)
+                await self.aupdate_checklist(property_info, downloaded=True, status="SUCCESS",
+                                    marketing_files=marketing_files, 
+                                    notes=f"Successfully downloaded and verified PDF",
+                                    pdf_source=pdf_source,
+                                    page_snapshot=agent.browser_context.listing_snapshot)
                 return True
                 
         except asyncio.TimeoutError:
             print(f"⏰ TIMEOUT: Property took longer than {self.timeout_seconds} seconds")
-            self.update_checklist(property_info, status="TIMEOUT",
-                                error=f"Timeout after {self.timeout_seconds} seconds")
+            await self.record_failure(property_info, status="TIMEOUT",
+                              error=f"Timeout after {self.timeout_seconds} seconds")
             return False
             
         except Exception as e:
             print(f"❌ ERROR processing property: {e}")
-            self.update_checklist(property_info, status="ERROR", error=str(e))
+            await self.record_failure(property_info, status="ERROR", error=str(e))
             return False
             
-    async def run_download_session(self, max_properties: int = None, website_group_filter: str = None):
-        """Run a download session processing properties from the database"""
-        
+        finally:
+            if agent is not None:
+                self.record_vision_stats(agent.controller.vision_policy)
+                self.record_host_responses(property_info['website_group'], agent.browser_context.host_responses)
+            # Unverified or partial downloads never leave the staging directory
+            await self.close_agent_browser(agent)
+            
+    def print_banner(self, website_group_filter: str = None):
+        """Print the session configuration"""
         print("🎯 MARKETING PACKAGE DOWNLOAD AGENT")
         print("=" * 70)
         print(f"🗄️  Database: Railway PostgreSQL")
         print(f"📁 Downloads: {self.download_folder}/")
         print(f"🎭 Browser Mode: {'Headless' if self.headless else 'Visible'}")
+        print(f"👁️  Vision: {', '.join(f'{code}={self.vision_modes[group]}' for code, group in self.website_group_codes.items())}")
+        if self.persist_browser_state:
+            print(f"🍪 Browser state: saved per site in {self.browser_state_folder}/ to skip repeat lead forms")
+        if self.preflight:
+            print(f"🩺 Preflight: pending listings are HTTP-checked first ({self.preflight_concurrency} at a time)")
+        if self.capture_documents:
+            print(f"📎 Documents: every linked OM, flyer, site plan and rent roll ({self.document_concurrency} at a time)")
+        if self.http_fast_path:
+            print(f"⚡ HTTP fast path: {', '.join(FAST_PATH_ADAPTERS)} (recipe learned from the first browser run)")
+        print(f"📝 Prompt: {self.prompt_variant} variant (static instructions first for prompt caching)")
+        print(f"🧭 Engines: {', '.join(f'{code}={self.browser_engines[group]}' for code, group in self.website_group_codes.items())}")
         print(f"⏱️  Timeout: {self.timeout_seconds} seconds per property")
-        print(f"⏳ Delay: {self.request_delay} seconds between properties (rate limit protection)")
+        print(f"⏳ Rate limit: adaptive per host, starting at {self.request_delay} seconds between properties")
+        print(f"🔁 Retries: up to {self.retry_policy.max_attempts} attempts with exponential backoff")
         if website_group_filter:
             print(f"🎯 Filter: Only processing {website_group_filter} properties")
+        if self.pipeline and self.workers <= 1:
+            print(f"⏩ Pipeline: next property is prefetched while the current one runs")
+        if self.shard_count > 1:
+            print(f"🧩 Shard: {self.shard_index}/{self.shard_count} (rows with id % {self.shard_count} = {self.shard_index - 1})")
         print("=" * 70)
         
+    async def _select_next_property(self, website_group_filter: str = None,
+                                    exclude_ids: List[int] = None) -> Optional[Dict]:
+        """Pick the next property, skipping paused website groups and preferring hosts
+        that have rate limit capacity right now (waits while only paused groups have work)"""
+        while not self.shutdown_requested:
+            open_groups = self.circuit_breaker.open_groups()
+            busy_groups = [group for group in self.website_group_codes.values()
+                           if self.rate_limiter.seconds_until_ready(group) > 0]
+            property_info = await self.aget_next_property(website_group_filter, exclude_groups=open_groups + busy_groups,
+                                                          exclude_ids=exclude_ids)
+            if not property_info and busy_groups:
+                property_info = await self.aget_next_property(website_group_filter, exclude_groups=open_groups,
+                                                              exclude_ids=exclude_ids)
+            if not property_info and open_groups and await self.aget_next_property(website_group_filter,
+                                                                                   exclude_ids=exclude_ids):
+                if exclude_ids and self.circuit_breaker.probes_in_flight():
+                    # A half-open group's probe is still running - let the caller collect its result
+                    return None
+                # Only paused groups have work left - wait for the earliest breaker to half-open
+                wait_seconds = self.circuit_breaker.seconds_until_retry()
+                print(f"⏸️  Paused groups {', '.join(open_groups)} - retrying in {wait_seconds:.0f} seconds...")
+                await asyncio.sleep(wait_seconds)
+                continue
+            if property_info:
+                website_group = property_info['website_group']
+                if not self.circuit_breaker.allow(website_group):
+                    # Another selection claimed the half-open group's single probe meanwhile
+                    continue
+                property_info['circuit_probe'] = self.circuit_breaker.is_probe(website_group)
+            return property_info
+        return None
+        
+    async def prefetch_property(self, website_group_filter: str = None,
+                                exclude_ids: List[int] = None) -> Optional[Tuple[Dict, Optional[Agent]]]:
+        """Claim the next property, launch its browser and pre-navigate to its URL"""
+        with self._phase("prefetch"):
+            property_info = await self._select_next_property(website_group_filter, exclude_ids=exclude_ids)
+            if not property_info:
+                return None
+            await self.rate_limiter.acquire(property_info['website_group'])
+            
+            # No browser to warm up when the HTTP fast path will handle the property
+            if self.fast_path_recipe(property_info['website_group']):
+                return property_info, None
+            
+            agent = None
+            try:
+                with self._phase("browser_launch"):
+                    agent = await self._create_agent(property_info, page_open=True)
+                if agent:
+                    page = await agent.browser_context.get_current_page()
+                    await page.goto(property_info['property_url'], wait_until="domcontentloaded")
+                    agent.browser_context.prefetched_at = time.monotonic()
+                    print(f"⏩ Prefetched {property_info['property_name']}")
+            except Exception as e:
+                # The agent was told its page is open, so drop it; the property is processed with a fresh one
+                print(f"⚠️  Prefetch failed for {property_info['property_name']}: {e}")
+                await self.close_agent_browser(agent)
+                agent = None
+            return property_info, agent
+            
+    async def refresh_prefetched_page(self, agent: Agent, property_info: Dict):
+        """Reload a prefetched listing that sat open longer than prefetch_max_age (sessions and form tokens expire)"""
+        prefetched_at = agent.browser_context.prefetched_at
+        if prefetched_at is None or time.monotonic() - prefetched_at <= self.prefetch_max_age:
+            return
+        print(f"🔄 Reloading prefetched page for {property_info['property_name']} "
+              f"({time.monotonic() - prefetched_at:.0f}s old)")
+        try:
+            page = await agent.browser_context.get_current_page()
+            await page.goto(property_info['property_url'], wait_until="domcontentloaded")
+            agent.browser_context.prefetched_at = time.monotonic()
+        except Exception as e:
+            # The task still carries the URL, so the agent can navigate itself
+            print(f"⚠️  Reload failed for {property_info['property_name']}: {e}")
+            
+    async def close_agent_browser(self, agent: Optional[Agent]):
+        """Close an agent's browser context (and browser, unless it is pooled) and remove its staging directory"""
+        if agent is None:
+            return
+        try:
+            await agent.browser_context.close()
+            if not self.reuse_browsers:
+                await agent.browser.close()
+        except Exception as e:
+            print(f"⚠️  Error closing browser: {e}")
+        remove_staging_dir(agent.browser_context.staging_dir)
+        
+    def _create_worker_pool(self) -> ProcessPoolExecutor:
+        """Bounded pool of property workers, each replaced after worker_max_tasks properties"""
+        # max_tasks_per_child needs a non-fork start method
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=self.worker_max_tasks,
+            initializer=_init_property_worker,
+            initargs=(self.headless, self.download_folder, self.workers)
+        )
+        
+    async def apply_worker_result(self, result: Dict) -> bool:
+        """Replay a pool worker's database updates and outcomes in this process"""
+        for kind, fields in result['events']:
+            if kind == 'update':
+                await self.aupdate_checklist(**fields)
+            elif kind == 'files':
+                await self.arecord_files(**fields)
+            elif kind == 'responses':
+                self.record_host_responses(**fields)
+            else:
+                self.record_outcome(**fields)
+        for phase, durations in result['phase_timings'].items():
+            self.phase_timings[phase].extend(durations)
+        for key, count in result['vision_stats'].items():
+            self.vision_stats[key] += count
+        for key, count in result['fast_path_stats'].items():
+            self.fast_path_stats[key] += count
+        return result['success']
+        
+    async def _collect_worker_results(self, in_flight: Dict) -> List[bool]:
+        """Wait for at least one pool worker to finish and apply its results"""
+        done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        outcomes = []
+        for future in done:
+            property_info, pool = in_flight.pop(future)
+            try:
+                outcomes.append(await self.apply_worker_result(future.result()))
+            except BrokenProcessPool as e:
+                # A crashed worker (e.g. browser OOM) only costs the properties it had in flight
+                print(f"💥 Worker process died while processing {property_info['property_name']}: {e}")
+                await self.record_failure(property_info, status="ERROR", error=f"Worker process crashed: {e}")
+                outcomes.append(False)
+                if pool is self.worker_pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self.worker_pool = self._create_worker_pool()
+            except Exception as e:
+                print(f"❌ Worker error for {property_info['property_name']}: {e}")
+                await self.record_failure(property_info, status="ERROR", error=str(e))
+                outcomes.append(False)
+        return outcomes
+        
+    async def run_download_session(self, max_properties: int = None, website_group_filter: str = None,
+                                   show_banner: bool = True):
+        """Run a download session processing properties from the database"""
+        
+        if show_banner:
+            self.print_banner(website_group_filter)
+        
+        # Only live listings reach the browser queue
+        if self.preflight:
+            await self.preflight_pending(website_group_filter)
+        
         processed = 0
         successful = 0
+        in_flight = {}  # Pool future -> (property_info, pool)
+        prefetched = None  # (property_info, prepared agent) claimed while the last property ran
+        self.worker_pool = self._create_worker_pool() if self.workers > 1 else None
+        loop = asyncio.get_running_loop()
         
-        while True:
-            # Check if we've reached the limit
-            if max_properties and processed >= max_properties:
-                print(f"🎯 Reached maximum properties limit: {max_properties}")
-                break
-                
-            # Get next property to process
-            property_info = self.get_next_property(website_group_filter)
-            if not property_info:
-                if website_group_filter:
-                    print(f"✅ No more {website_group_filter} properties to process!")
+        try:
+            while not self.shutdown_requested:
+                # Check if we've reached the limit
+                if max_properties and processed + len(in_flight) >= max_properties:
+                    print(f"🎯 Reached maximum properties limit: {max_properties}")
+                    break
+                    
+                # Every worker busy - wait for one to finish
+                if self.worker_pool and len(in_flight) >= self.workers:
+                    for success in await self._collect_worker_results(in_flight):
+                        processed += 1
+                        successful += success
+                    print(f"\n📊 SESSION PROGRESS: {processed} processed, {successful} successful, "
+                          f"{len(in_flight)} in flight")
+                    continue
+                    
+                prepared_agent = None
+                if prefetched:
+                    property_info, prepared_agent = prefetched
+                    prefetched = None
+                    if not property_info.get('circuit_probe') and \
+                            property_info['website_group'] in self.circuit_breaker.open_groups():
+                        # Its group was paused while it waited - leave the row for later
+                        await self.close_agent_browser(prepared_agent)
+                        continue
                 else:
-                    print("✅ No more properties to process!")
-                break
-                
-            # Process the property
-            success = await self.process_property(property_info)
-            processed += 1
-            if success:
-                successful += 1
+                    property_info = await self._select_next_property(
+                        website_group_filter, exclude_ids=[info['id'] for info, _ in in_flight.values()])
+                    if property_info:
+                        # Wait for the host's rate limit token (only blocks when every eligible host is busy)
+                        waited = await self.rate_limiter.acquire(property_info['website_group'])
+                        if waited > 0.1:
+                            print(f"⏳ Waited {waited:.1f} seconds for {property_info['website_group']} rate limit")
+                if not property_info:
+                    if in_flight:
+                        # Finishing workers may free up paused groups or schedule retries
+                        for success in await self._collect_worker_results(in_flight):
+                            processed += 1
+                            successful += success
+                        continue
+                    if website_group_filter:
+                        print(f"✅ No more {website_group_filter} properties to process!")
+                    else:
+                        print("✅ No more properties to process!")
+                    break
+                    
+                # Hand the property to a pool worker
+                if self.worker_pool:
+                    await self.aupdate_checklist(property_info, visited=True, status="IN_PROGRESS")
+                    future = loop.run_in_executor(self.worker_pool, _process_property_in_worker, property_info,
+                                                  self.rate_limiter.get_rates())
+                    in_flight[future] = (property_info, self.worker_pool)
+                    continue
+                    
+                # Process the property, preparing the next one while this one runs
+                if self.pipeline and not (max_properties and processed + 1 >= max_properties):
+                    process_task = asyncio.create_task(self.process_property(property_info, prepared_agent))
+                    prefetched = await self.prefetch_property(website_group_filter, exclude_ids=[property_info['id']])
+                    success = await process_task
+                else:
+                    success = await self.process_property(property_info, prepared_agent)
+                processed += 1
+                if success:
+                    successful += 1
+                    
+                print(f"\n📊 SESSION PROGRESS: {processed} processed, {successful} successful")
                 
-            print(f"\n📊 SESSION PROGRESS: {processed} processed, {successful} successful")
-            
-            # Delay between properties to avoid rate limits
-            if max_properties is None or processed < max_properties:
-                print(f"⏳ Waiting {self.request_delay} seconds before next property...")
-                await asyncio.sleep(self.request_delay)
+            # Let workers finish the properties they already started
+            while in_flight:
+                for success in await self._collect_worker_results(in_flight):
+                    processed += 1
+                    successful += success
+        finally:
+            if prefetched:
+                if prefetched[0].get('circuit_probe'):
+                    self.circuit_breaker.release_probe(prefetched[0]['website_group'])
+                await self.close_agent_browser(prefetched[1])
+            if self.worker_pool:
+                self.worker_pool.shutdown(wait=True)
+                self.worker_pool = None
             
         print(f"\n🏁 SESSION COMPLETE!")
         print(f"📊 Total Processed: {processed}")
         print(f"✅ Successful Downloads: {successful}")
         print(f"❌ Failed Downloads: {processed - successful}")
+        print(f"🚦 OpenAI Budget: {self.llm_governor.get_summary()}")
+        print(f"🖼️  Vision: {self.vision_stats['images_dropped']} screenshots dropped, "
+              f"{self.vision_stats['images_low_detail']} low-detail, {self.vision_stats['images_full']} full, "
+              f"~{self.vision_stats['image_tokens_saved']:,} image tokens saved")
+        if self.fast_path_stats:
+            print(f"⚡ HTTP fast path: {self.fast_path_stats['hits']} downloads without a browser, "
+                  f"{self.fast_path_stats['fallbacks']} fell back to the browser agent")
+        if self.shard_count > 1:
+            shard_counts = await self.get_shard_progress(website_group_filter)
+            total = sum(shard_counts.values())
+            print(f"🧩 Shard {self.shard_index}/{self.shard_count}: {shard_counts.get('SUCCESS', 0)}/{total} successful, "
+                  f"{shard_counts.get('PENDING', 0)} pending "
+                  f"({', '.join(f'{status}: {count}' for status, count in sorted(shard_counts.items()))})")
         print(f"📁 Downloads saved to: {self.download_folder}/")
 
+    async def _install_notify_trigger(self):
+        """Make sure pending rows send a NOTIFY that wakes the daemon"""
+        await self.async_db.execute(CREATE_NOTIFY_TRIGGER_SQL)
+            
+    def _parse_notification(self, notify) -> Dict:
+        """Turn a Postgres notification into a daemon command"""
+        if notify.channel == PENDING_CHANNEL:
+            return {'command': 'pending', 'website_group': notify.payload}
+        try:
+            command = json.loads(notify.payload)
+        except json.JSONDecodeError:
+            command = {'command': notify.payload.strip()}
+        return command if isinstance(command, dict) else {'command': str(command)}
+        
+    async def _next_daemon_command(self, events: asyncio.Queue, idle_seconds: float) -> Dict:
+        """Wait for the next command, coalescing bursts of pending-row notifications"""
+        try:
+            command = await asyncio.wait_for(events.get(), timeout=idle_seconds)
+        except asyncio.TimeoutError:
+            # Retries become due by time, not by NOTIFY - check for them periodically
+            return {'command': 'pending'}
+        
+        if command.get('command') == 'pending':
+            deferred = []
+            while not events.empty():
+                queued = events.get_nowait()
+                if queued.get('command') == 'pending':
+                    continue
+                deferred.append(queued)
+            for queued in deferred:
+                events.put_nowait(queued)
+        return command
+        
+    async def run_daemon(self, website_group_filter: str = None):
+        """Keep the process, DB pool and browsers warm and process rows as they become pending"""
+        
+        idle_seconds = float(os.getenv('DAEMON_IDLE_POLL_SECONDS', 300))
+        self.print_banner(website_group_filter)
+        print(f"👂 Daemon mode: listening on {PENDING_CHANNEL} and {COMMAND_CHANNEL}")
+        
+        self.reuse_browsers = True
+        await self._install_notify_trigger()
+        
+        # Dedicated autocommit connection for LISTEN
+        listen_conn = psycopg2.connect(self.database_url)
+        listen_conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        listen_cursor = listen_conn.cursor()
+        listen_cursor.execute(f"LISTEN {PENDING_CHANNEL};")
+        listen_cursor.execute(f"LISTEN {COMMAND_CHANNEL};")
+        
+        events = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        
+        def on_notify():
+            listen_conn.poll()
+            while listen_conn.notifies:
+                command = self._parse_notification(listen_conn.notifies.pop(0))
+                if command.get('command') == 'shutdown':
+                    # Stop between properties even if a session is running
+                    self.shutdown_requested = True
+                events.put_nowait(command)
+                
+        def on_signal():
+            print("\n🛑 Shutdown signal received - finishing current property...")
+            self.shutdown_requested = True
+            events.put_nowait({'command': 'shutdown'})
+        
+        loop.add_reader(listen_conn.fileno(), on_notify)
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, on_signal)
+        
+        try:
+            # Drain whatever is already pending before waiting for notifications
+            command = {'command': 'pending'}
+            while not self.shutdown_requested:
+                name = command.get('command')
+                
+                if name == 'pending':
+                    notified_group = command.get('website_group')
+                    if not (website_group_filter and notified_group and notified_group != website_group_filter):
+                        await self.run_download_session(website_group_filter=website_group_filter, show_banner=False)
+                elif name == 'run':
+                    group = command.get('group') or website_group_filter
+                    group = self.website_group_codes.get(group, group)
+                    print(f"📨 Run command: group={group or 'ALL'}, max={command.get('max_properties') or 'unlimited'}")
+                    # Continues the dashboard job's trace (submit_job sends its traceparent)
+                    with tracer.span("run_download_session", traceparent=command.get('traceparent'),
+                                     job_id=command.get('job_id'), website_group=group or "ALL",
+                                     shard=f"{self.shard_index}/{self.shard_count}"):
+                        await self.run_download_session(max_properties=command.get('max_properties'),
+                                                        website_group_filter=group, show_banner=False)
+                elif name == 'status':
+                    print(f"💓 Daemon alive: {len(self.browser_pool)} warm browsers, "
+                          f"paused groups: {', '.join(self.circuit_breaker.open_groups()) or 'none'}, "
+                          f"{self.llm_governor.get_summary()}")
+                elif name != 'shutdown':
+                    print(f"⚠️  Unknown daemon command: {command}")
+                    
+                if self.shutdown_requested:
+                    break
+                command = await self._next_daemon_command(events, idle_seconds)
+        finally:
+            loop.remove_reader(listen_conn.fileno())
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+            listen_conn.close()
+            await self.close_browsers()
+            await self.async_db.close()
+            print("👋 Daemon stopped")
+
+# Agent owned by a pool worker process (created once per worker by the initializer)
+_worker_agent = None
+
+def _init_property_worker(headless: bool, download_folder: str, workers: int):
+    """Pool initializer: build this worker's agent, deferring DB writes to the parent"""
+    global _worker_agent
+    # Ctrl+C goes to the parent, which lets in-flight properties finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_agent = MarketingPackageAgent(headless=headless, setup_database=False)
+    _worker_agent.download_folder = download_folder
+    _worker_agent._setup_directories()
+    # Each worker sends 1/workers of a host's rate, so the pool as a whole stays within it
+    _worker_agent.rate_limiter_share = 1 / workers
+    _worker_agent.rate_limiter.initial_rate *= _worker_agent.rate_limiter_share
+
+def _process_property_in_worker(property_info: Dict, host_rates: Dict[str, float]) -> Dict:
+    """Run one property in a pool worker at its share of the parent's current host rates;
+    returns its success, DB events and phase timings"""
+    # The parent owns the AIMD state (worker responses are deferred to it), so follow its latest rates
+    for host, rate in host_rates.items():
+        _worker_agent.rate_limiter.set_rate(host, rate * _worker_agent.rate_limiter_share)
+    _worker_agent.deferred_updates = []
+    _worker_agent.phase_timings = defaultdict(list)
+    _worker_agent.vision_stats = defaultdict(int)
+    _worker_agent.fast_path_stats = defaultdict(int)
+    success = asyncio.run(_worker_agent.process_property(property_info))
+    return {
+        'success': success,
+        'events': _worker_agent.deferred_updates,
+        'phase_timings': dict(_worker_agent.phase_timings),
+        'vision_stats': dict(_worker_agent.vision_stats),
+        'fast_path_stats': dict(_worker_agent.fast_path_stats)
+    }
+
+def send_daemon_command(database_url: str, command: str, **fields):
+    """Send a command (run, status, shutdown) to running daemons via NOTIFY"""
+    payload = json.dumps({'command': command, **{key: value for key, value in fields.items() if value}})
+    conn = psycopg2.connect(database_url)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_notify(%s, %s);", (COMMAND_CHANNEL, payload))
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    print(f"📨 Sent daemon command: {payload}")
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse --shard i/n (1-based) into (index, count)"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard must look like i/n, got {value!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 1 and {count}, got {value!r}")
+    return index, count
+
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Marketing Package Download Agent')
@@ -841,17 +1626,44 @@ def parse_arguments():
                         help='Maximum number of properties to process')
     parser.add_argument('--headless', action='store_true',
                         help='Run browser in headless mode (no GUI)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Keep running and process rows as they become pending (LISTEN/NOTIFY)')
+    parser.add_argument('--daemon-command', choices=['run', 'status', 'shutdown'],
+                        help='Send a command to running daemons and exit (run honours -g/-m)')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Run properties in a pool of this many worker processes (default: 1, in-process)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Claim, launch and pre-navigate the next property while the current one finishes')
+    parser.add_argument('--discover', action='store_true',
+                        help='Add new listings from the website groups\' sitemaps before processing')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Re-crawl downloaded properties: try cached PDF URLs first, browser agent only if they fail')
+    parser.add_argument('--shard', type=parse_shard, metavar='I/N',
+                        help='Only process shard I of N (rows with id %% N = I-1), e.g. 2/4 on the second of four machines')
     
     return parser.parse_args()
 
 async def main():
     """Main function to run the marketing package agent"""
     
+    # Report time spent between the dashboard spawning us and reaching main (imports, interpreter startup)
+    spawned_at = os.getenv('TRACE_SPAWNED_AT_NS')
+    if spawned_at:
+        tracer.record_span("agent_startup", int(spawned_at))
+    
     # Parse command line arguments
     args = parse_arguments()
     
+    # Commands for a running daemon only need the database
+    if args.daemon_command:
+        load_dotenv("marketing_agent.env")
+        send_daemon_command(os.getenv('DATABASE_URL'), args.daemon_command,
+                            group=args.group, max_properties=args.max_properties)
+        return
+    
     # Create agent with headless setting
-    agent = MarketingPackageAgent(headless=args.headless)
+    agent = MarketingPackageAgent(headless=args.headless, shard=args.shard, workers=args.workers,
+                                  pipeline=args.pipeline)
     
     # Convert group code to website group name
     website_group_filter = None
@@ -861,11 +1673,24 @@ async def main():
             print(f"❌ Unknown group code: {args.group}")
             return
     
-    # Process properties
-    await agent.run_download_session(
-        max_properties=args.max_properties,
-        website_group_filter=website_group_filter
-    )
+    # Process properties (continues the dashboard job's trace when TRACEPARENT is set)
+    if args.daemon:
+        await agent.run_daemon(website_group_filter=website_group_filter)
+        return
+    
+    with tracer.span("run_download_session", website_group=website_group_filter or "ALL",
+                     shard=f"{agent.shard_index}/{agent.shard_count}"):
+        try:
+            if args.discover:
+                await agent.discover_new_listings(website_group_filter)
+            if args.refresh:
+                await agent.refresh_downloads(website_group_filter)
+            await agent.run_download_session(
+                max_properties=args.max_properties,
+                website_group_filter=website_group_filter
+            )
+        finally:
+            await agent.async_db.close()
 
 if __name__ == "__main__":
     print("🤖 Marketing Package Download Agent")
@@ -879,6 +1704,13 @@ if __name__ == "__main__":
     print("   python marketing_package_agent.py -g LR -m 5         # Process max 5 Levy Retail properties")
     print("   python marketing_package_agent.py --headless          # Run in headless mode (no browser window)")
     print("   python marketing_package_agent.py -g LR --headless   # Levy Retail headless mode")
+    print("   python marketing_package_agent.py --shard 2/4 --headless  # Second of four machines")
+    print("   python marketing_package_agent.py -w 4 --headless    # Four worker processes")
+    print("   python marketing_package_agent.py --pipeline --headless  # Prefetch the next property")
+    print("   python marketing_package_agent.py --discover --headless # Pick up new listings from the sitemaps")
+    print("   python marketing_package_agent.py --refresh --headless  # Re-crawl using cached PDF URLs")
+    print("   python marketing_package_agent.py --daemon --headless # Stay running, react to new pending rows")
+    print("   python marketing_package_agent.py --daemon-command shutdown  # Stop running daemons")
     print("🚀 Starting download session...\n")
     
     asyncio.run(main()) 
\ No newline at end of file
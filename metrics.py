@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Prometheus Metrics
+Phase-level timing histograms and counters for the agent, plus the collector
+behind the Flask app's /metrics endpoint.
+
+Agent subprocesses started by the web interface inherit
+PROMETHEUS_MULTIPROC_DIR and write their samples to shared files in that
+directory; the app aggregates them at scrape time together with live queue
+depth and active job gauges.
+"""
+
+import glob
+import os
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+PHASE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+PHASE_SECONDS = Histogram(
+    'marketing_agent_phase_seconds',
+    'Duration of agent phases (browser_launch, page_navigation, llm_step, form_fill, pdf_download, db_round_trip, ...)',
+    ['phase'],
+    buckets=PHASE_BUCKETS
+)
+
+PROPERTIES_TOTAL = Counter(
+    'marketing_agent_properties_total',
+    'Properties processed, by website group and resulting status',
+    ['website_group', 'status']
+)
+
+LLM_TOKENS_TOTAL = Counter(
+    'marketing_agent_llm_tokens_total',
+    'OpenAI tokens used by the agent'
+)
+
+LLM_IMAGE_TOKENS_SAVED = Counter(
+    'marketing_agent_llm_image_tokens_saved_total',
+    'Estimated prompt tokens saved by dropping or downscaling screenshots'
+)
+
+LLM_BUDGET_WAIT_SECONDS = Counter(
+    'marketing_agent_llm_budget_wait_seconds_total',
+    'Time spent waiting on the shared OpenAI budget'
+)
+
+
+def observe_phase(phase: str, seconds: float):
+    PHASE_SECONDS.labels(phase=phase).observe(seconds)
+
+
+# Marks a directory created by setup_multiprocess_dir, the only kind whose samples it clears
+MULTIPROC_MARKER = ".marketing_agent_metrics"
+
+
+def setup_multiprocess_dir(path: str) -> str:
+    """Point PROMETHEUS_MULTIPROC_DIR at `path` for the app and its agent subprocesses, clearing the
+    previous run's sample files (*.db) only if the directory is new, empty or carries our marker"""
+    os.makedirs(path, exist_ok=True)
+    marker = os.path.join(path, MULTIPROC_MARKER)
+    if os.path.exists(marker) or not os.listdir(path):
+        for sample_file in glob.glob(os.path.join(path, "*.db")):
+            os.remove(sample_file)
+        open(marker, "a").close()
+    else:
+        print(f"⚠️  {path} was not created for metrics; leaving its files alone "
+              f"(stale samples may be included until it is emptied)")
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = path
+    return path
+
+
+class DashboardCollector:
+    def __init__(self, db_manager, active_processes: dict):
+        """Gauges computed at scrape time from the database and the app's job table"""
+        self.db_manager = db_manager
+        self.active_processes = active_processes
+
+    def collect(self):
+        queue_depth = GaugeMetricFamily(
+            'marketing_checklist_queue_depth',
+            'Properties in marketing_checklist by download status and website group',
+            labels=['status', 'website_group']
+        )
+        for status, website_group, count in self.db_manager.get_queue_depth():
+            queue_depth.add_metric([status or 'UNKNOWN', website_group], count)
+        yield queue_depth
+
+        yield GaugeMetricFamily(
+            'marketing_agent_active_jobs',
+            'Agent jobs currently running from the web interface',
+            value=len(self.active_processes)
+        )
+
+
+def render_metrics(db_manager, active_processes: dict):
+    """Return (body, content_type) for the /metrics endpoint"""
+    registry = CollectorRegistry()
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.MultiProcessCollector(registry)
+    registry.register(DashboardCollector(db_manager, active_processes))
+    return generate_latest(registry), CONTENT_TYPE_LATEST
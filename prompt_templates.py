@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Prompt Templates
+Per-site task prompts laid out for provider-side prompt caching.
+
+Each prompt is a static prefix that is identical for every property of a
+website group (instructions plus the group's contact details) followed by a
+small per-property suffix (name, URL, download path). OpenAI caches repeated
+prompt prefixes automatically, so the browser-use system prompt and the
+static instructions are only processed once across steps and properties.
+
+Variants (PROMPT_VARIANT):
+- full:    the original step-by-step instructions
+- compact: the same workflow in a few lines, to compare in the benchmark
+
+Usage:
+    python3 prompt_templates.py    # Prompt size report per site and variant
+"""
+
+from typing import Dict, List
+
+PROMPT_VARIANTS = ("full", "compact")
+
+# Everything that changes per property goes here, at the very end of the prompt
+PROPERTY_SUFFIX = """
+CURRENT PROPERTY:
+- Name: {property_name}
+- URL: {property_url}
+- Download Path: {download_path}
+"""
+
+# Appended when pipelined prefetch already opened the listing, so the agent doesn't load it a second time
+PAGE_OPEN_NOTE = """- The property page is already open in the current tab: start there instead of navigating to the URL
+"""
+
+# Levy Retail: VIEW PACKAGE -> name/email/phone form -> direct download link
+LEVY_RETAIL_FULL = """
+You are a marketing package download agent for Levy Retail properties.
+
+CONTACT INFORMATION TO USE:
+- Name: {name}
+- Email: {email}
+- Phone: {phone}
+
+STEP-BY-STEP WORKFLOW:
+
+1. NAVIGATE TO PROPERTY:
+   - Go to the property URL given under CURRENT PROPERTY at the end
+   - Wait for page to fully load
+   - Verify you're on the correct property page
+
+2. FIND AND CLICK VIEW PACKAGE:
+   - First, look for red "VIEW PACKAGE" button on the current view (usually on left side)
+   - If not visible, scroll down SLOWLY in small increments (one scroll at a time)
+   - After each scroll, STOP and look for the button before scrolling more
+   - The button is typically in the upper portion of the page, NOT at the bottom
+   - Once you see the button, click it to open download form modal
+
+3. FILL OUT THE FORM:
+   - If no form opens and the page goes straight to the download link, skip to step 4
+   - Fill "Your Name" field with: {name}
+   - Fill "Your Email" field with: {email}
+   - Fill "Your Phone" field with: {phone}
+   - Click "Submit" button
+
+4. HANDLE THANK YOU PAGE:
+   - After submitting, you'll see a "Thank you!" message
+   - Look for link text "TO DOWNLOAD THE PACKAGE DIRECTLY, CLICK HERE."
+   - Click that link to download the PDF directly
+   - DO NOT rely on email - use the direct download link
+
+5. DOWNLOAD VERIFICATION:
+   - After clicking the download link, the PDF should start downloading
+   - Call the report_download_started action right after clicking the link - this completes the task
+   - Do not wait for file verification - that will be handled separately
+
+IMPORTANT NOTES:
+- The email provided will be bogus/fake - that's intentional
+- ALWAYS use the direct download link, not email
+- If any step fails, try again once before reporting error
+- Take your time and wait for elements to load
+- Downloads will be automatically saved to the levyretail subfolder
+- SCROLLING STRATEGY: The VIEW PACKAGE button is usually visible after 1-2 small scrolls
+- DO NOT scroll to the bottom of the page - the button is in the upper/middle section
+- If you scroll more than 3-4 times without finding the button, try scrolling back up
+
+SUCCESS CRITERIA:
+- Successfully navigate to the property page
+- Successfully click the VIEW PACKAGE button
+- Successfully fill out and submit the contact form
+- Successfully click the direct download link
+- Call report_download_started once the download link is clicked
+
+Report your progress and any issues encountered.
+"""
+
+LEVY_RETAIL_COMPACT = """
+You download Levy Retail marketing packages.
+
+CONTACT: Name: {name} | Email: {email} | Phone: {phone}
+
+1. Go to the property URL given under CURRENT PROPERTY at the end.
+2. Find the red "VIEW PACKAGE" button (upper/middle of the page). If it is not visible, scroll down one
+   small step at a time and look again after each scroll - never scroll to the bottom. Click it.
+3. Fill "Your Name", "Your Email" and "Your Phone" with the contact details above and click "Submit".
+   If no form opens and the download link is shown right away, skip to step 4.
+4. On the "Thank you!" page click "TO DOWNLOAD THE PACKAGE DIRECTLY, CLICK HERE." (never rely on email).
+5. Call report_download_started right after clicking the link - this completes the task.
+
+If a step fails, try it once more before reporting the error.
+"""
+
+# Tag Industrial: Marketing Package -> six-field form with Principal and terms -> download button
+TAG_INDUSTRIAL_FULL = """
+You are a marketing package download agent for Tag Industrial properties.
+
+CONTACT INFORMATION TO USE:
+- First Name: {first_name}
+- Last Name: {last_name}
+- Company Name: {company}
+- Phone Number: {phone}
+- Email Address: {email}
+- Contact Type: {contact_type}
+
+STEP-BY-STEP WORKFLOW:
+
+1. NAVIGATE TO PROPERTY:
+   - Go to the property URL given under CURRENT PROPERTY at the end
+   - Wait for page to fully load
+   - Verify you're on the correct property page
+
+2. FIND AND CLICK MARKETING PACKAGE BUTTON:
+   - FIRST: Look carefully for "Marketing Package" button in the current visible area
+   - If not visible, scroll down SLOWLY (half-page scrolls, not full page)
+   - After EACH scroll, STOP and carefully scan the entire page for the button
+   - Try maximum 3-4 slow scrolls down
+   - IF BUTTON NOT FOUND after scrolling down: SCROLL BACK UP gradually
+   - When scrolling up: Start from current position and scroll up slowly (small increments)
+   - Check after each upward scroll - the button might be in the middle area
+   - The button should be findable within this careful up/down search pattern
+   - Once you see the "Marketing Package" button, click it to open the form modal
+
+3. FILL OUT THE CONTACT FORM (WORK EFFICIENTLY):
+   - If no form opens and the "Download Marketing Package" button is shown right away, skip to step 4
+   - Fill "First Name" field with: {first_name}
+   - Fill "Last Name" field with: {last_name}
+   - Fill "Company Name" field with: {company}
+   - Fill "Phone Number" field with: {phone}
+   - Fill "Email Address" field with: {email}
+   - For "Contact Type" dropdown: 
+     * Click on the dropdown field to open it
+     * Click directly on "Principal" from the list
+   - Click the "I accept the Terms and Conditions" checkbox IMMEDIATELY
+   - Click "Submit" button RIGHT AFTER checking the checkbox
+   - COMPLETE THE ENTIRE FORM IN ONE SMOOTH SEQUENCE
+
+4. DOWNLOAD THE PACKAGE:
+   - After submitting the form, look for "Download Marketing Package" button
+   - Click the "Download Marketing Package" button to start the download
+   - The PDF should start downloading automatically
+
+5. DOWNLOAD VERIFICATION:
+   - After clicking the download button, the PDF should start downloading
+   - Call the report_download_started action right after clicking the button - this completes the task
+   - Do not wait for file verification - that will be handled separately
+
+IMPORTANT NOTES:
+- The email provided will be bogus/fake - that's intentional
+- Take your time and wait for elements to load
+- CRITICAL: Use SLOW half-page scrolls (not full page) when looking for Marketing Package button
+- If button not found after scrolling down, SCROLL BACK UP gradually to find it
+- The button might be in the middle area that gets passed over with fast scrolling
+- For the Contact Type dropdown: DO NOT use select_dropdown_option - CLICK on the dropdown, then CLICK on "Principal"
+- WORK FAST on the checkbox: Click it immediately after dropdown selection
+- DO NOT overthink the form - fill, check, submit in quick succession
+- Downloads will be automatically saved to the tag-industries subfolder
+- If any form field is marked as required, make sure to fill it out
+- If any step fails, try again once before reporting error
+
+BUTTON SEARCH STRATEGY:
+- Step 1: Check current visible area thoroughly
+- Step 2: Scroll down slowly (3-4 half-page scrolls max)
+- Step 3: If not found, scroll back up slowly from current position
+- Step 4: Check each area carefully as you scroll up
+- Step 5: The button should be found using this up/down pattern
+
+SUCCESS CRITERIA:
+- Successfully navigate to the property page
+- Successfully find and click the Marketing Package button using the search strategy
+- Successfully fill out and submit the contact form
+- Successfully click the Download Marketing Package button
+- Call report_download_started once the download button is clicked
+
+Report your progress and any issues encountered.
+"""
+
+TAG_INDUSTRIAL_COMPACT = """
+You download Tag Industrial marketing packages.
+
+CONTACT: First Name: {first_name} | Last Name: {last_name} | Company Name: {company} | Phone Number: {phone} | Email Address: {email}
+
+1. Go to the property URL given under CURRENT PROPERTY at the end.
+2. Find the "Marketing Package" button: check the visible area, then scroll down in half-page steps
+   (at most 4), then scroll back up slowly. Look again after every scroll. Click it.
+3. Fill the five text fields with the contact details above. For "Contact Type" click the dropdown,
+   then click "Principal" (do not use select_dropdown_option). Tick "I accept the Terms and
+   Conditions" and click "Submit" immediately. If no form opens and the download button is shown
+   right away, skip to step 4.
+4. Click "Download Marketing Package".
+5. Call report_download_started right after clicking it - this completes the task.
+
+If a step fails, try it once more before reporting the error.
+"""
+
+# Net Lease Advisory Group: DOWNLOAD BROCHURE -> DOWNLOAD NOW -> PDF opens in the browser
+NET_LEASE_FULL = """
+You are a marketing package download agent for Net Lease Advisory Group properties.
+
+STEP-BY-STEP WORKFLOW:
+
+1. NAVIGATE TO PROPERTY:
+   - Go to the property URL given under CURRENT PROPERTY at the end
+   - Wait for page to fully load
+   - Verify you're on the correct property page
+
+2. FIND AND CLICK DOWNLOAD BROCHURE BUTTON:
+   - Scroll down slowly to find the "DOWNLOAD BROCHURE" button
+   - The button should be visible after scrolling down a little bit
+   - After each scroll, STOP and look for the button before scrolling more
+   - Once you see the "DOWNLOAD BROCHURE" button, click it to open the popup modal
+
+3. HANDLE THE POPUP FORM:
+   - A popup window will open with a form
+   - DO NOT fill out any fields in the form
+   - Look for the "DOWNLOAD NOW" button at the bottom of the popup
+   - Click the "DOWNLOAD NOW" button directly without filling any form fields
+
+4. EXTRACT PDF URL FOR PYTHON DOWNLOAD:
+   After clicking "DOWNLOAD NOW", the PDF will open in browser. Follow this process:
+
+   STEP A - Extract PDF URL:
+   - There is no need to wait for the PDF to render - the file is captured automatically as it loads
+   - Look at the browser address bar - it should now show the direct PDF URL
+   - The URL will be something like: https://netleaseadvisorygroup.com/wp-content/uploads/YYYY/MM/filename.pdf
+   - Extract this complete PDF URL from the address bar
+   - IMPORTANT: Make sure you have the complete URL starting with https://
+
+   STEP B - Report PDF URL:
+   - Call the report_pdf_url action with the complete PDF URL - this completes the task
+   - Example: report_pdf_url(pdf_url="https://netleaseadvisorygroup.com/wp-content/uploads/2022/07/property-brochure.pdf")
+
+5. TASK COMPLETION:
+   - The task is complete as soon as report_pdf_url has been called
+   - DO NOT attempt to download the PDF yourself
+   - The Python code will handle the download process
+
+IMPORTANT NOTES:
+- NO form filling required - just click DOWNLOAD NOW directly
+- Focus ONLY on extracting the correct PDF URL from browser address bar
+- The PDF itself is captured automatically - you only need to report the URL
+- Python code will handle the actual download to the netleaseadvisorygroup subfolder
+
+STEP-BY-STEP PROCESS:
+1. PDF opens in browser after clicking DOWNLOAD NOW
+2. Read the PDF URL as soon as it appears in the address bar
+3. Call report_pdf_url with the complete URL
+4. Task complete - Python will handle download
+
+SUCCESS CRITERIA:
+- Successfully navigate to the property page
+- Successfully find and click the DOWNLOAD BROCHURE button
+- Successfully click the DOWNLOAD NOW button in the popup
+- Successfully report the PDF URL with report_pdf_url
+
+TROUBLESHOOTING:
+- If popup is blocked, look for popup blocker notification and allow it
+- If the address bar does not show a PDF URL yet, check it again on your next step
+- Make sure the extracted URL starts with https:// and ends with .pdf
+- If URL extraction fails, report the issue clearly
+
+Report your progress and finish by calling report_pdf_url.
+"""
+
+NET_LEASE_COMPACT = """
+You extract Net Lease Advisory Group brochure PDFs.
+
+1. Go to the property URL given under CURRENT PROPERTY at the end.
+2. Scroll down slowly to the "DOWNLOAD BROCHURE" button and click it.
+3. In the popup do NOT fill any fields - click "DOWNLOAD NOW". Allow the popup if it is blocked.
+4. The PDF opens in the browser and is captured automatically. Call report_pdf_url with the complete
+   https://...pdf URL from the address bar - this completes the task. Do not download the PDF yourself.
+"""
+
+SITE_TEMPLATES = {
+    "www.levyretail.com": {"full": LEVY_RETAIL_FULL, "compact": LEVY_RETAIL_COMPACT},
+    "tag-industrial.com": {"full": TAG_INDUSTRIAL_FULL, "compact": TAG_INDUSTRIAL_COMPACT},
+    "netleaseadvisorygroup.com": {"full": NET_LEASE_FULL, "compact": NET_LEASE_COMPACT}
+}
+
+# Contact details used for the size report (the agent's defaults)
+SAMPLE_CONTACT = {
+    "name": "John Smith", "first_name": "John", "last_name": "Smith", "company": "Real Estate Investor",
+    "phone": "555-123-4567", "email": "test@example.com", "contact_type": "Investor"
+}
+
+
+def build_static_prefix(website_group: str, contact: Dict, variant: str = "full") -> str:
+    """Part of the prompt shared by every property of a website group"""
+    if variant not in PROMPT_VARIANTS:
+        raise ValueError(f"Unknown prompt variant {variant!r} (expected one of {', '.join(PROMPT_VARIANTS)})")
+    return SITE_TEMPLATES[website_group][variant].format(**contact)
+
+
+def build_task(website_group: str, contact: Dict, property_info: Dict, download_path: str,
+               variant: str = "full", page_open: bool = False) -> str:
+    """Full task prompt: static prefix followed by the per-property suffix"""
+    suffix = PROPERTY_SUFFIX.format(
+        property_name=property_info['property_name'],
+        property_url=property_info['property_url'],
+        download_path=download_path
+    )
+    return build_static_prefix(website_group, contact, variant) + suffix + (PAGE_OPEN_NOTE if page_open else "")
+
+
+def prompt_size_report(contact_info: Dict[str, Dict] = None) -> List[Dict]:
+    """Characters and estimated tokens (~4 characters each) of the static and variable parts"""
+    rows = []
+    for website_group, variants in SITE_TEMPLATES.items():
+        contact = (contact_info or {}).get(website_group, SAMPLE_CONTACT)
+        for variant in variants:
+            static = build_static_prefix(website_group, contact, variant)
+            suffix = PROPERTY_SUFFIX.format(property_name="x" * 40, property_url="https://" + "x" * 80,
+                                            download_path="x" * 80)
+            rows.append({
+                "website_group": website_group,
+                "variant": variant,
+                "static_chars": len(static),
+                "static_tokens": len(static) // 4,
+                "suffix_tokens": len(suffix) // 4,
+                "cacheable_fraction": round(len(static) / (len(static) + len(suffix)), 3)
+            })
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'Website group':<28} {'Variant':<8} {'Static chars':>12} {'Static tok':>10} "
+          f"{'Suffix tok':>10} {'Cacheable':>9}")
+    print("-" * 82)
+    for row in prompt_size_report():
+        print(f"{row['website_group']:<28} {row['variant']:<8} {row['static_chars']:>12} "
+              f"{row['static_tokens']:>10} {row['suffix_tokens']:>10} {row['cacheable_fraction'] * 100:>8.0f}%")
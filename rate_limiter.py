@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Adaptive Host Rate Limiter
+Token bucket per website host, shared by every worker in the agent process.
+
+Each host starts at a conservative rate and adapts AIMD-style: the rate is
+halved on 429/5xx responses or slow page loads and increased additively while
+responses stay healthy. Hosts are independent, so a throttled site never
+holds up work on the others. Buckets are shared between the event loop
+(acquire) and the HTTP client's worker threads (acquire_blocking).
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """Bucket refilled at `rate` tokens per second, holding at most `capacity` tokens"""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def seconds_until_available(self) -> float:
+        """Time until one token can be taken"""
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def take(self) -> bool:
+        """Take a token if one is available"""
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class HostRateLimiter:
+    def __init__(self, initial_rate: float = 0.5, min_rate: float = 0.02, max_rate: float = 2.0,
+                 burst: float = 1.0, increase_step: float = 0.05, decrease_factor: float = 0.5,
+                 slow_response_seconds: float = 15.0):
+        """Per-host token buckets with automatic backoff and ramp-up (rates in requests per second)"""
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.slow_response_seconds = slow_response_seconds
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def get_host(url_or_host: str) -> str:
+        """Normalize a URL or bare host name to a bucket key"""
+        if '://' in url_or_host:
+            return urlparse(url_or_host).netloc.lower()
+        return url_or_host.lower()
+
+    def _get_bucket(self, host: str) -> TokenBucket:
+        host = self.get_host(host)
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.initial_rate, self.burst)
+            self.locks[host] = asyncio.Lock()
+        return self.buckets[host]
+
+    def get_rate(self, host: str) -> float:
+        """Current rate for a host in requests per second"""
+        return self._get_bucket(host).rate
+
+    def get_rates(self) -> Dict[str, float]:
+        """Current rate of every host seen so far"""
+        return {host: bucket.rate for host, bucket in self.buckets.items()}
+
+    def set_rate(self, host: str, rate: float):
+        """Override a host's rate (pool workers follow the parent's adaptive rates this way)"""
+        self._get_bucket(host).rate = rate
+
+    def seconds_until_ready(self, host: str) -> float:
+        """How long acquire() would currently wait for a host"""
+        return self._get_bucket(host).seconds_until_available()
+
+    async def acquire(self, host: str) -> float:
+        """Wait for a token for the host and return the time spent waiting"""
+        bucket = self._get_bucket(host)
+        started = time.monotonic()
+        # Waiters for the same host queue up; other hosts are unaffected
+        async with self.locks[self.get_host(host)]:
+            while not bucket.take():
+                await asyncio.sleep(bucket.seconds_until_available())
+        return time.monotonic() - started
+
+    def acquire_blocking(self, host: str) -> float:
+        """acquire() for worker threads: sleep until the host has a token and return the time spent waiting"""
+        bucket = self._get_bucket(host)
+        started = time.monotonic()
+        while not bucket.take():
+            time.sleep(bucket.seconds_until_available())
+        return time.monotonic() - started
+
+    def record_response(self, host: str, status: Optional[int] = None, elapsed: Optional[float] = None):
+        """Feed a response back into the limiter so the host's rate adapts"""
+        bucket = self._get_bucket(host)
+        throttled = status is not None and (status == 429 or status >= 500)
+        slow = elapsed is not None and elapsed > self.slow_response_seconds
+
+        if throttled or slow:
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease_factor)
+            reason = f"HTTP {status}" if throttled else f"slow response ({elapsed:.1f}s)"
+            print(f"🐢 Rate limit for {self.get_host(host)} reduced to {bucket.rate:.3f} req/s ({reason})")
+        else:
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase_step)
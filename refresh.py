@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Refresh Runs
+Re-crawl of already downloaded properties without the browser agent.
+
+The first successful visit stores the resolved PDF URL (NLAG's
+wp-content/uploads link, Levy Retail's direct download link) with its ETag
+and Last-Modified headers. A refresh run requests each cached URL
+conditionally through the pooled HTTP client:
+- UNCHANGED: 304 Not Modified - nothing is downloaded
+- UPDATED:   a new, verified PDF replaces the stored one
+- FAILED:    link expired or no longer a PDF - the property goes back to the
+             browser agent
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+from browser_downloads import is_valid_pdf
+from http_client import cache_validators, download_file
+
+
+def conditional_headers(source: Dict) -> Dict:
+    headers = {}
+    if source.get("etag"):
+        headers["If-None-Match"] = source["etag"]
+    if source.get("last_modified"):
+        headers["If-Modified-Since"] = source["last_modified"]
+    return headers
+
+
+def refresh_cached_pdf(session: requests.Session, source: Dict, staging_dir: str, timeout: float = 60) -> Dict:
+    """Conditional GET of one cached PDF URL into staging_dir"""
+    try:
+        path, response = download_file(session, source["url"], staging_dir, timeout=timeout,
+                                        headers=conditional_headers(source))
+    except requests.RequestException as e:
+        return {"result": "FAILED", "error": str(e)}
+    if path is None:
+        return {"result": "UNCHANGED"}
+    if not is_valid_pdf(path):
+        return {"result": "FAILED", "error": f"{source['url']} no longer returns a PDF"}
+    return {"result": "UPDATED", "path": path, "source": {"url": response.url, **cache_validators(response.headers)}}
+
+
+def refresh_cached_pdfs(session: requests.Session, jobs: List[Dict], concurrency: int = 10) -> List[Dict]:
+    """Refresh many cached PDFs concurrently; `jobs` hold a source and a staging_dir each"""
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(lambda job: refresh_cached_pdf(session, job["source"], job["staging_dir"]), jobs))
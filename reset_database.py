@@ -11,8 +11,17 @@ This script will:
 - Clear notes
 - Clear last_attempt timestamp
 - Clear error_message
+- Reset attempt_count and next_attempt_at retry scheduling
+- Clear the listing preflight stamp (listing_checked_at)
+- Clear the resolved PDF URL and its validators (pdf_url, pdf_etag, pdf_last_modified)
+- Clear the listing page snapshot (page_hash, page_etag, page_last_modified)
+- Delete the captured documents in marketing_files
 - Update updated_at timestamp
 
+sitemap_lastmod is kept on purpose: it is the discovery watermark, and
+clearing it would make the next --discover run re-read every sitemap.
+Circuit breaker state lives in the running agent, not in the database.
+
 @file purpose: Resets the Railway PostgreSQL database to initial state
 """
 
@@ -21,6 +30,8 @@ from datetime import datetime
 from dotenv import load_dotenv
 import os
 
+from create_supabase_table import apply_migrations
+
 def reset_database():
     """Reset the marketing_checklist table to initial state"""
     
@@ -41,6 +52,9 @@ def reset_database():
         conn = psycopg2.connect(database_url)
         cursor = conn.cursor()
         
+        # Older tables may predate the retry, refresh and document columns reset below
+        apply_migrations(cursor)
+        
         # Get current stats before reset
         print("📊 Getting current database statistics...")
         
@@ -79,6 +93,15 @@ def reset_database():
             notes = NULL,
             last_attempt = NULL,
             error_message = NULL,
+            attempt_count = 0,
+            next_attempt_at = NULL,
+            listing_checked_at = NULL,
+            pdf_url = NULL,
+            pdf_etag = NULL,
+            pdf_last_modified = NULL,
+            page_hash = NULL,
+            page_etag = NULL,
+            page_last_modified = NULL,
             updated_at = CURRENT_TIMESTAMP
         WHERE 
             visited != 'NO' OR 
@@ -87,7 +110,16 @@ def reset_database():
             download_status != 'PENDING' OR 
             notes IS NOT NULL OR 
             last_attempt IS NOT NULL OR 
-            error_message IS NOT NULL;
+            error_message IS NOT NULL OR 
+            COALESCE(attempt_count, 0) != 0 OR 
+            next_attempt_at IS NOT NULL OR 
+            listing_checked_at IS NOT NULL OR 
+            pdf_url IS NOT NULL OR 
+            pdf_etag IS NOT NULL OR 
+            pdf_last_modified IS NOT NULL OR 
+            page_hash IS NOT NULL OR 
+            page_etag IS NOT NULL OR 
+            page_last_modified IS NOT NULL;
         """
         
         print("🔄 Resetting database to initial state...")
@@ -96,10 +128,15 @@ def reset_database():
         # Get the number of rows that were updated
         updated_rows = cursor.rowcount
         
+        # Captured documents belong to the downloads being reset
+        cursor.execute("DELETE FROM marketing_files;")
+        deleted_files = cursor.rowcount
+        
         # Commit the changes
         conn.commit()
         
         print(f"✅ Successfully reset {updated_rows} properties to initial state!")
+        print(f"🗑️  Removed {deleted_files} marketing_files rows")
         
         # Display final stats
         cursor.execute("SELECT COUNT(*) FROM marketing_checklist WHERE download_status = 'PENDING';")
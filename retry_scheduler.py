@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Retry Scheduler
+Exponential backoff for failed properties and a per-website-group circuit breaker.
+
+Failed rows (TIMEOUT, ERROR, DOWNLOAD_FAILED, URL_EXTRACTION_FAILED) get an
+attempt count and a next_attempt_at timestamp so get_next_property can
+re-queue them automatically. The circuit breaker pauses a website group after
+consecutive failures so we stop spending LLM budget on a site that is down.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+# Statuses written by process_property that are worth another attempt
+RETRYABLE_STATUSES = ("TIMEOUT", "ERROR", "DOWNLOAD_FAILED", "URL_EXTRACTION_FAILED")
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 3, base_delay_seconds: int = 300,
+                 max_delay_seconds: int = 6 * 3600, jitter: float = 0.1):
+        """Exponential backoff: base * 2^(attempt-1), capped and jittered"""
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.jitter = jitter
+
+    def is_retryable(self, status: str) -> bool:
+        """Check whether a failure status should be re-queued"""
+        return (status or "").upper() in RETRYABLE_STATUSES
+
+    def get_delay_seconds(self, attempt_count: int) -> float:
+        """Backoff delay after the given number of failed attempts"""
+        delay = self.base_delay_seconds * (2 ** max(attempt_count - 1, 0))
+        delay = min(delay, self.max_delay_seconds)
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def get_next_attempt_at(self, attempt_count: int, status: str,
+                            now: Optional[datetime] = None) -> Optional[datetime]:
+        """Return when the row may be retried, or None if we should give up"""
+        if not self.is_retryable(status) or attempt_count >= self.max_attempts:
+            return None
+        now = now or datetime.now()
+        return now + timedelta(seconds=self.get_delay_seconds(attempt_count))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, cooldown_seconds: int = 900):
+        """Per-website-group breaker: closed -> open after N consecutive failures -> half-open after cooldown"""
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.consecutive_failures: Dict[str, int] = {}
+        self.opened_at: Dict[str, float] = {}
+        self.probe_started_at: Dict[str, float] = {}  # Half-open groups with a probe in flight
+
+    def _probe_in_flight(self, website_group: str, now: float) -> bool:
+        # A probe whose result never arrives stops blocking the group after another cooldown
+        started_at = self.probe_started_at.get(website_group)
+        return started_at is not None and now - started_at < self.cooldown_seconds
+
+    def is_paused(self, website_group: str) -> bool:
+        """Open, or half-open with its probe still running (does not claim the probe)"""
+        opened_at = self.opened_at.get(website_group)
+        if opened_at is None:
+            return False
+        now = time.monotonic()
+        return now - opened_at < self.cooldown_seconds or self._probe_in_flight(website_group, now)
+
+    def allow(self, website_group: str) -> bool:
+        """Closed groups may be processed; a half-open group lets exactly one probe through,
+        which this call claims until its result is recorded"""
+        if self.opened_at.get(website_group) is None:
+            return True
+        if self.is_paused(website_group):
+            return False
+        self.probe_started_at[website_group] = time.monotonic()
+        return True
+
+    def is_probe(self, website_group: str) -> bool:
+        """Whether the group is half-open, i.e. a property claimed through allow() is its probe"""
+        return website_group in self.probe_started_at
+
+    def release_probe(self, website_group: str):
+        """Give back a claimed probe that was never processed"""
+        self.probe_started_at.pop(website_group, None)
+
+    def record_success(self, website_group: str):
+        """Close the breaker for a group"""
+        self.consecutive_failures[website_group] = 0
+        self.probe_started_at.pop(website_group, None)
+        if self.opened_at.pop(website_group, None) is not None:
+            print(f"🟢 Circuit closed for {website_group}")
+
+    def record_failure(self, website_group: str):
+        """Count a failure and open the breaker when the threshold is reached"""
+        failures = self.consecutive_failures.get(website_group, 0) + 1
+        self.consecutive_failures[website_group] = failures
+        self.probe_started_at.pop(website_group, None)
+        if failures >= self.failure_threshold:
+            # Re-arm the cooldown (also when a half-open probe fails)
+            self.opened_at[website_group] = time.monotonic()
+            print(f"🔴 Circuit open for {website_group} after {failures} consecutive failures "
+                  f"- pausing for {self.cooldown_seconds} seconds")
+
+    def open_groups(self) -> List[str]:
+        """Website groups that are currently paused"""
+        return [group for group in self.opened_at if self.is_paused(group)]
+
+    def probes_in_flight(self) -> List[str]:
+        """Half-open groups waiting for their probe's result"""
+        now = time.monotonic()
+        return [group for group in self.probe_started_at if self._probe_in_flight(group, now)]
+
+    def seconds_until_retry(self) -> float:
+        """Time until the earliest paused group can be probed"""
+        now = time.monotonic()
+        remaining = []
+        for group, opened_at in self.opened_at.items():
+            seconds = self.cooldown_seconds - (now - opened_at)
+            if self._probe_in_flight(group, now):
+                seconds = max(seconds, self.cooldown_seconds - (now - self.probe_started_at[group]))
+            remaining.append(seconds)
+        remaining = [seconds for seconds in remaining if seconds > 0]
+        return min(remaining) if remaining else 0.0
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Browser Engine Tests
+Checks which Playwright engine the agent's browsers actually launch, through
+browser-use's own launch path (a stand-in Playwright records the launch call).
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("browser_use")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_use.browser.browser import BrowserConfig  # noqa: E402
+
+from browser_engines import BROWSER_ENGINES, engine_config  # noqa: E402
+from marketing_package_agent import MarketingPackageAgent  # noqa: E402
+
+
+class RecordingEngine:
+    def __init__(self, name: str, launches: list):
+        self.name = name
+        self.launches = launches
+
+    async def launch(self, **kwargs):
+        self.launches.append((self.name, kwargs))
+        return object()
+
+
+class RecordingPlaywright:
+    """Playwright stand-in whose engines record launch() instead of starting a browser"""
+
+    def __init__(self):
+        self.launches = []
+        for name in BROWSER_ENGINES:
+            setattr(self, name, RecordingEngine(name, self.launches))
+
+
+def launched_engine(website_group: str, engines: dict, config: BrowserConfig):
+    agent = MarketingPackageAgent.__new__(MarketingPackageAgent)
+    agent.browser_engines = engines
+    agent.reuse_browsers = False
+    agent.browser_pool = {}
+    browser = agent._get_browser(website_group, config)
+    playwright = RecordingPlaywright()
+    asyncio.run(browser._setup_browser(playwright))
+    assert len(playwright.launches) == 1
+    return playwright.launches[0]
+
+
+@pytest.mark.parametrize("engine", BROWSER_ENGINES)
+def test_group_engine_is_launched(engine):
+    name, _ = launched_engine("www.levyretail.com", {"www.levyretail.com": engine}, BrowserConfig(headless=True))
+    assert name == engine
+
+
+def test_unconfigured_group_launches_chromium():
+    name, _ = launched_engine("example.com", {}, BrowserConfig(headless=True))
+    assert name == "chromium"
+
+
+def test_chromium_switches_are_kept_only_for_chromium():
+    config = BrowserConfig(headless=True, extra_browser_args=["--no-pdf-header-footer"])
+    _, kwargs = launched_engine("netleaseadvisorygroup.com", {"netleaseadvisorygroup.com": "chromium"}, config)
+    assert "--no-pdf-header-footer" in kwargs["args"]
+    _, kwargs = launched_engine("netleaseadvisorygroup.com", {"netleaseadvisorygroup.com": "firefox"}, config)
+    assert "--no-pdf-header-footer" not in kwargs["args"]
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        engine_config(BrowserConfig(), "safari")
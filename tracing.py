@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Tracing
+Lightweight OpenTelemetry-style spans from /api/submit_job through the agent subprocess.
+
+Trace context travels to child processes in the W3C TRACEPARENT environment
+variable, so one dashboard job shows up as a single trace. Finished spans
+are posted to an OTLP/HTTP collector (e.g. Jaeger or Tempo) when
+OTEL_EXPORTER_OTLP_ENDPOINT is set, and appended as JSON lines to
+TRACE_EXPORT_FILE when that is set. The file is rotated once it reaches
+TRACE_MAX_MB, keeping TRACE_BACKUP_COUNT old files.
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import requests
+
+TRACEPARENT_ENV = "TRACEPARENT"
+SPAWNED_AT_ENV = "TRACE_SPAWNED_AT_NS"  # Lets a child process report its own startup time
+
+DEFAULT_TRACE_FILE = os.path.join("traces", "spans.jsonl")  # Read by print_trace when no file is given
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str], attributes: Dict = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = "OK"
+        self.error = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value for this span"""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+            "pid": os.getpid()
+        }
+
+    def to_otlp(self) -> Dict:
+        def otlp_value(value):
+            if isinstance(value, bool):
+                return {"boolValue": value}
+            if isinstance(value, int):
+                return {"intValue": str(value)}
+            if isinstance(value, float):
+                return {"doubleValue": value}
+            return {"stringValue": str(value)}
+
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error or ""} if self.status == "ERROR" else {"code": 1}
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+def parse_traceparent(value: Optional[str]):
+    """Return (trace_id, parent_span_id) from a W3C traceparent, or (None, None)"""
+    try:
+        version, trace_id, span_id, flags = (value or "").split("-")
+        if len(trace_id) == 32 and len(span_id) == 16:
+            return trace_id, span_id
+    except ValueError:
+        pass
+    return None, None
+
+
+class Tracer:
+    def __init__(self, service_name: str, export_file: str = None, otlp_endpoint: str = None):
+        """Spans are exported to an OTLP/HTTP collector and/or a size-capped JSONL file (both opt-in)"""
+        self.service_name = service_name
+        self.export_file = export_file or os.getenv("TRACE_EXPORT_FILE") or None
+        self.max_file_bytes = int(float(os.getenv("TRACE_MAX_MB", 50)) * 1024 * 1024)
+        self.backup_count = int(os.getenv("TRACE_BACKUP_COUNT", 3))
+        self.otlp_endpoint = otlp_endpoint or os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+        self.enabled = os.getenv("TRACING_ENABLED", "true").lower() != "false"
+        self.lock = threading.Lock()
+        self.otlp_queue = None
+        # Parent for root spans in a child process (set by the dashboard through the environment)
+        self.remote_trace_id, self.remote_parent_id = parse_traceparent(os.getenv(TRACEPARENT_ENV))
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def _new_span(self, name: str, traceparent: str = None, attributes: Dict = None) -> Span:
+        """Span parented on `traceparent`, the current span or the inherited TRACEPARENT"""
+        parent = _current_span.get()
+        if traceparent:
+            trace_id, parent_id = parse_traceparent(traceparent)
+        elif parent:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        elif self.remote_trace_id:
+            trace_id, parent_id = self.remote_trace_id, self.remote_parent_id
+        else:
+            trace_id, parent_id = None, None
+        return Span(name, trace_id or secrets.token_hex(16), parent_id, attributes)
+
+    @contextmanager
+    def span(self, name: str, traceparent: str = None, **attributes):
+        """Start a child of `traceparent`, the current span or the inherited TRACEPARENT"""
+        span = self._new_span(name, traceparent, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "ERROR"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            self.export(span)
+
+    def record_span(self, name: str, start_ns: int, end_ns: int = None, **attributes) -> Span:
+        """Export a span for work that was timed outside a `span()` block (e.g. process startup);
+        it ends now unless `end_ns` is given"""
+        span = self._new_span(name, attributes=attributes)
+        span.start_ns = start_ns
+        span.end_ns = end_ns or time.time_ns()
+        self.export(span)
+        return span
+
+    def child_env(self, env: Dict = None) -> Dict:
+        """Environment for a subprocess that continues the current trace"""
+        env = dict(env if env is not None else os.environ)
+        span = _current_span.get()
+        if span:
+            env[TRACEPARENT_ENV] = span.traceparent
+        env[SPAWNED_AT_ENV] = str(time.time_ns())
+        return env
+
+    def export(self, span: Span):
+        if not self.enabled:
+            return
+        if self.export_file:
+            self._write_span(span)
+        if self.otlp_endpoint:
+            self._enqueue_otlp(span)
+
+    def _write_span(self, span: Span):
+        record = span.to_dict()
+        record["service"] = self.service_name
+        try:
+            with self.lock:
+                os.makedirs(os.path.dirname(self.export_file) or ".", exist_ok=True)
+                self._rotate_if_full()
+                with open(self.export_file, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"⚠️  Could not write span {span.name}: {e}")
+
+    def _rotate_if_full(self):
+        # spans.jsonl -> spans.jsonl.1 -> ... -> spans.jsonl.N (the oldest is dropped)
+        try:
+            if os.path.getsize(self.export_file) < self.max_file_bytes:
+                return
+        except FileNotFoundError:
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.export_file}.{index}"):
+                os.replace(f"{self.export_file}.{index}", f"{self.export_file}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.export_file, f"{self.export_file}.1")
+        else:
+            os.remove(self.export_file)
+
+    def _enqueue_otlp(self, span: Span):
+        """Hand the span to a background exporter so callers never block on the collector"""
+        with self.lock:
+            if self.otlp_queue is None:
+                self.otlp_queue = queue.Queue()
+                threading.Thread(target=self._otlp_worker, daemon=True).start()
+                atexit.register(self.flush)
+        self.otlp_queue.put(span)
+
+    def _otlp_worker(self):
+        while True:
+            spans = [self.otlp_queue.get()]
+            # Batch whatever else is already waiting
+            while not self.otlp_queue.empty() and len(spans) < 100:
+                spans.append(self.otlp_queue.get_nowait())
+            payload = {"resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "marketing-agent"}, "spans": [span.to_otlp() for span in spans]}]
+            }]}
+            try:
+                requests.post(f"{self.otlp_endpoint.rstrip('/')}/v1/traces", json=payload, timeout=5)
+            except requests.RequestException as e:
+                print(f"⚠️  Could not export {len(spans)} spans to collector: {e}")
+            finally:
+                for _ in spans:
+                    self.otlp_queue.task_done()
+
+    def flush(self):
+        """Wait for queued spans to reach the collector"""
+        if self.otlp_queue is not None:
+            self.otlp_queue.join()
+
+
+def print_trace(trace_id: str, export_file: str = None):
+    """Print one trace from the JSONL export as an indented timeline"""
+    export_file = export_file or os.getenv("TRACE_EXPORT_FILE") or DEFAULT_TRACE_FILE
+    with open(export_file) as f:
+        spans = [span for span in map(json.loads, f) if span["trace_id"].startswith(trace_id)]
+    if not spans:
+        print(f"❌ No spans found for trace {trace_id}")
+        return
+
+    children = {}
+    for span in spans:
+        children.setdefault(span["parent_span_id"], []).append(span)
+    span_ids = {span["span_id"] for span in spans}
+    trace_start = min(span["start_time_unix_nano"] for span in spans)
+
+    def show(span, depth):
+        offset_ms = (span["start_time_unix_nano"] - trace_start) / 1e6
+        status = "❌" if span["status"] == "ERROR" else "  "
+        print(f"{status} {offset_ms:>10.1f}ms {span['duration_ms']:>10.1f}ms  {'  ' * depth}{span['name']} "
+              f"[{span['service']}]")
+        for child in sorted(children.get(span["span_id"], []), key=lambda s: s["start_time_unix_nano"]):
+            show(child, depth + 1)
+
+    print(f"🧵 Trace {spans[0]['trace_id']}  (offset, duration, span)")
+    roots = [span for span in spans if span["parent_span_id"] not in span_ids]
+    for root in sorted(roots, key=lambda s: s["start_time_unix_nano"]):
+        show(root, 0)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python3 tracing.py <trace_id> [spans.jsonl]")
+        sys.exit(1)
+    print_trace(sys.argv[1], sys.argv[2] if len(sys.argv) >= 3 else None)
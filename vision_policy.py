@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Vision Policy
+Decides which screenshots reach GPT-4o for each agent step.
+
+Most steps in the site workflows (typing into "Your Name", clicking Submit)
+only need browser-use's DOM element list, so screenshots are stripped from
+the prompt by default. When the agent cannot find its target it calls the
+request_screenshot action and the next step includes the screenshot at
+detail="low" (downscaled by the API to 512px, a flat 85 tokens). Once attached
+to an agent, the policy also switches browser-use's use_vision, so DOM-only
+steps don't capture a screenshot in the first place.
+
+Modes per website group (VISION_MODE_LR / _TI / _NLAG):
+- dom:  no screenshots, low-detail screenshot on request (default)
+- low:  every screenshot at detail="low"
+- full: original behaviour, full-resolution screenshots on every step
+"""
+
+from typing import Any, List, Optional
+
+from llm_governor import IMAGE_TOKEN_ESTIMATE, LOW_DETAIL_IMAGE_TOKENS
+from metrics import LLM_IMAGE_TOKENS_SAVED
+
+VISION_MODES = ("dom", "low", "full")
+
+
+class VisionPolicy:
+    def __init__(self, mode: str = "dom"):
+        """Per-agent screenshot policy with counters for the token savings"""
+        if mode not in VISION_MODES:
+            raise ValueError(f"Unknown vision mode {mode!r} (expected one of {', '.join(VISION_MODES)})")
+        self.mode = mode
+        self.screenshot_requested = False
+        self.images_dropped = 0
+        self.images_low_detail = 0
+        self.images_full = 0
+        self.agent_settings: Optional[Any] = None
+
+    @property
+    def use_vision(self) -> bool:
+        """Whether the next step needs a screenshot at all"""
+        return self.mode != "dom" or self.screenshot_requested
+
+    def attach(self, agent_settings):
+        """Drive an agent's use_vision setting (browser-use AgentSettings) from this policy"""
+        self.agent_settings = agent_settings
+        self._sync_agent()
+
+    def _sync_agent(self):
+        if self.agent_settings is not None:
+            self.agent_settings.use_vision = self.use_vision
+
+    def request_screenshot(self):
+        """Include a low-detail screenshot in the next step (used by the request_screenshot action)"""
+        self.screenshot_requested = True
+        self._sync_agent()
+
+    @property
+    def estimated_tokens_saved(self) -> int:
+        return (self.images_dropped * IMAGE_TOKEN_ESTIMATE +
+                self.images_low_detail * (IMAGE_TOKEN_ESTIMATE - LOW_DETAIL_IMAGE_TOKENS))
+
+    def apply(self, messages: List[Any]) -> List[Any]:
+        """Return the messages with screenshots dropped or downgraded according to the mode"""
+        if self.mode == "full":
+            self.images_full += sum(len(self._image_parts(message)) for message in messages)
+            return messages
+
+        send_low_detail = self.mode == "low" or self.screenshot_requested
+        self.screenshot_requested = False
+        self._sync_agent()
+        saved_before = self.estimated_tokens_saved
+
+        result = []
+        for message in messages:
+            if not self._image_parts(message):
+                result.append(message)
+                continue
+            content = []
+            for part in message.content:
+                if not (isinstance(part, dict) and part.get("type") == "image_url"):
+                    content.append(part)
+                elif send_low_detail:
+                    content.append({**part, "image_url": {**part["image_url"], "detail": "low"}})
+                    self.images_low_detail += 1
+                else:
+                    self.images_dropped += 1
+            result.append(message.model_copy(update={"content": content}))
+
+        LLM_IMAGE_TOKENS_SAVED.inc(self.estimated_tokens_saved - saved_before)
+        return result
+
+    @staticmethod
+    def _image_parts(message) -> list:
+        if isinstance(message.content, str):
+            return []
+        return [part for part in message.content if isinstance(part, dict) and part.get("type") == "image_url"]
+
+    def get_summary(self) -> str:
+        return (f"{self.images_dropped} screenshots dropped, {self.images_low_detail} low-detail, "
+                f"{self.images_full} full, ~{self.estimated_tokens_saved:,} image tokens saved")